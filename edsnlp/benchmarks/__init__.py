@@ -0,0 +1,3 @@
+from .benchmark import benchmark, compare_results, run_benchmarks
+from .notes import generate_notes, read_notes
+from .pipelines import PIPELINES, make_pipeline
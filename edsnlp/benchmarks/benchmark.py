@@ -0,0 +1,246 @@
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import spacy
+from spacy.language import Language
+
+import edsnlp
+
+from .pipelines import PIPELINES, make_pipeline
+
+
+def peak_rss() -> Optional[float]:
+    """
+    Peak resident set size of the current process, in megabytes.
+
+    Returns
+    -------
+    Optional[float]
+        The peak RSS, or None if it is not available on the platform
+    """
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+def benchmark(
+    nlp: Language,
+    texts: Sequence[str],
+    n_repeats: int = 3,
+    batch_size: int = 32,
+) -> Dict[str, Any]:
+    """
+    Measures the throughput of a pipeline on a list of texts, and the latency
+    of each of its components.
+
+    The pipeline is run once to warm it up, then `n_repeats` times with
+    `nlp.pipe`: the fastest run is kept. The components are then timed one
+    by one, on the same documents, with their `pipe` method if they have one.
+
+    Parameters
+    ----------
+    nlp : Language
+        The pipeline
+    texts : Sequence[str]
+        The texts to process
+    n_repeats : int
+        Number of timed runs of the whole pipeline
+    batch_size : int
+        Batch size of `nlp.pipe`
+
+    Returns
+    -------
+    Dict[str, Any]
+        Number of documents, characters and tokens, duration of the fastest
+        run, documents and tokens per second, peak RSS of the process in
+        megabytes, and duration and milliseconds per document of each component
+    """
+    list(nlp.pipe(texts[:batch_size], batch_size=batch_size))
+
+    seconds = float("inf")
+    for _ in range(n_repeats):
+        start = time.perf_counter()
+        docs = list(nlp.pipe(texts, batch_size=batch_size))
+        seconds = min(seconds, time.perf_counter() - start)
+
+    n_docs = len(texts)
+    n_tokens = sum(len(doc) for doc in docs)
+
+    components = {}
+
+    start = time.perf_counter()
+    docs = [nlp.make_doc(text) for text in texts]
+    components["tokenizer"] = time.perf_counter() - start
+
+    for name, proc in nlp.pipeline:
+        start = time.perf_counter()
+        if hasattr(proc, "pipe"):
+            docs = list(proc.pipe(docs, batch_size=batch_size))
+        else:
+            docs = [proc(doc) for doc in docs]
+        components[name] = time.perf_counter() - start
+
+    return dict(
+        n_docs=n_docs,
+        n_chars=sum(len(text) for text in texts),
+        n_tokens=n_tokens,
+        seconds=seconds,
+        docs_per_sec=n_docs / seconds,
+        tokens_per_sec=n_tokens / seconds,
+        peak_rss_mb=peak_rss(),
+        components={
+            name: dict(seconds=duration, ms_per_doc=1000 * duration / n_docs)
+            for name, duration in components.items()
+        },
+    )
+
+
+def benchmark_pipeline(
+    name: str,
+    texts: Sequence[str],
+    n_repeats: int = 3,
+    batch_size: int = 32,
+    lang: str = "eds",
+) -> Dict[str, Any]:
+    """
+    Creates one of the reference pipelines and benchmarks it,
+    see [`benchmark`][edsnlp.benchmarks.benchmark.benchmark].
+
+    Parameters
+    ----------
+    name : str
+        Name of the pipeline, one of `PIPELINES`
+    texts : Sequence[str]
+        The texts to process
+    n_repeats : int
+        Number of timed runs of the whole pipeline
+    batch_size : int
+        Batch size of `nlp.pipe`
+    lang : str
+        Language of the pipeline
+
+    Returns
+    -------
+    Dict[str, Any]
+        The results of `benchmark`, and the time it took to create the pipeline
+    """
+    start = time.perf_counter()
+    nlp = make_pipeline(name, lang=lang)
+    load_seconds = time.perf_counter() - start
+
+    results = benchmark(nlp, texts, n_repeats=n_repeats, batch_size=batch_size)
+    return dict(load_seconds=load_seconds, **results)
+
+
+def run_benchmarks(
+    texts: Sequence[str],
+    pipelines: Optional[List[str]] = None,
+    n_repeats: int = 3,
+    batch_size: int = 32,
+    lang: str = "eds",
+    isolate: bool = True,
+    output: Optional[Union[str, Path]] = None,
+) -> Dict[str, Any]:
+    """
+    Benchmarks several reference pipelines on the same texts.
+
+    Parameters
+    ----------
+    texts : Sequence[str]
+        The texts to process, see
+        [`generate_notes`][edsnlp.benchmarks.notes.generate_notes]
+    pipelines : Optional[List[str]]
+        Names of the pipelines to benchmark, all of `PIPELINES` by default
+    n_repeats : int
+        Number of timed runs of each pipeline
+    batch_size : int
+        Batch size of `nlp.pipe`
+    lang : str
+        Language of the pipelines
+    isolate : bool
+        Whether to benchmark each pipeline in a new process, so that the
+        peak RSS of a pipeline does not include the memory of the previous ones
+    output : Optional[Union[str, Path]]
+        Path of a JSON file to write the results to
+
+    Returns
+    -------
+    Dict[str, Any]
+        The versions of the environment, and the results of each pipeline
+    """
+    pipelines = list(PIPELINES) if pipelines is None else pipelines
+
+    results = {}
+    for name in pipelines:
+        args = (name, texts, n_repeats, batch_size, lang)
+        if isolate:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                results[name] = pool.submit(benchmark_pipeline, *args).result()
+        else:
+            results[name] = benchmark_pipeline(*args)
+
+    report = dict(
+        date=datetime.now().isoformat(timespec="seconds"),
+        edsnlp=edsnlp.__version__,
+        spacy=spacy.__version__,
+        python=platform.python_version(),
+        platform=platform.platform(),
+        n_repeats=n_repeats,
+        batch_size=batch_size,
+        pipelines=results,
+    )
+
+    if output is not None:
+        Path(output).write_text(json.dumps(report, indent=2))
+
+    return report
+
+
+def compare_results(
+    reference: Dict[str, Any],
+    results: Dict[str, Any],
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compares two benchmark reports on the same texts, for instance
+    of two versions of EDS-NLP.
+
+    Parameters
+    ----------
+    reference : Dict[str, Any]
+        The reference report, as returned by `run_benchmarks`
+    results : Dict[str, Any]
+        The new report
+
+    Returns
+    -------
+    Dict[str, Dict[str, float]]
+        For each pipeline of both reports, the ratio of the new throughput
+        (`docs_per_sec`) and peak RSS (`peak_rss_mb`) to the reference ones,
+        and the ratio of the new latency of each component to its reference
+    """
+    ratios = {}
+    for name, new in results["pipelines"].items():
+        old = reference["pipelines"].get(name)
+        if old is None:
+            continue
+        ratio = dict(docs_per_sec=new["docs_per_sec"] / old["docs_per_sec"])
+        if new["peak_rss_mb"] and old["peak_rss_mb"]:
+            ratio["peak_rss_mb"] = new["peak_rss_mb"] / old["peak_rss_mb"]
+        for component, timing in new["components"].items():
+            old_timing = old["components"].get(component)
+            if old_timing and old_timing["seconds"]:
+                ratio[component] = timing["seconds"] / old_timing["seconds"]
+        ratios[name] = ratio
+    return ratios
@@ -0,0 +1,104 @@
+import random
+from pathlib import Path
+from typing import List, Optional, Union
+
+SECTIONS = [
+    "Motif d'hospitalisation :",
+    "Antécédents :",
+    "Histoire de la maladie :",
+    "Examen clinique :",
+    "Examens complémentaires :",
+    "Traitement de sortie :",
+    "Conclusion :",
+]
+
+SENTENCES = [
+    "Patient de 67 ans admis le 12/03/2021 pour une dyspnée d'aggravation progressive.",
+    "Il est hospitalisé depuis le 3 janvier 2020 dans le service de pneumologie.",
+    "Pas de fièvre, pas de toux, pas de douleur thoracique.",
+    "La patiente ne présente pas de signe de décompensation cardiaque.",
+    "Antécédents de diabète de type 2 sous metformine 1000 mg deux fois par jour.",
+    "Hypertension artérielle traitée par amlodipine 5 mg.",
+    "Insuffisance rénale chronique stade 3, créatinine à 145 µmol/l.",
+    "Infarctus du myocarde en 2015, pose d'un stent sur l'IVA.",
+    "Cancer du sein traité en 2012 par chimiothérapie, sans récidive.",
+    "Sa mère est décédée d'un AVC, son père est diabétique.",
+    "Le patient rapporte une consommation d'alcool occasionnelle.",
+    "Tabagisme actif à 30 paquets-années.",
+    "Une pneumopathie est suspectée devant l'opacité basale droite.",
+    "Probable embolie pulmonaire, à confirmer par un angioscanner.",
+    "Poids 82 kg, taille 1m75, IMC à 26,8 kg/m2.",
+    "Tension artérielle à 135/85 mmHg, fréquence cardiaque à 88 bpm.",
+    "Le nodule mesure 12 mm de grand axe, contre 9 mm en mars 2019.",
+    "Hémoglobine à 11,2 g/dl, plaquettes à 250 000/mm3.",
+    "Traitement par doliprane 1 g si douleur, amoxicilline pendant 7 jours.",
+    "Sortie prévue dans 3 jours, à revoir en consultation dans 2 mois.",
+    "Il dit avoir arrêté le traitement par paracétamol la semaine dernière.",
+    "Cirrhose hépatique d'origine alcoolique, sans ascite.",
+    "BPCO stade 2, pas d'exacerbation récente.",
+    "Hémiplégie gauche séquellaire d'un accident vasculaire cérébral.",
+    "Compte rendu validé par le Dr. Dupont le 14/05/2021.",
+]
+
+
+def generate_notes(
+    n_notes: int = 100,
+    n_chars: int = 3000,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Generates synthetic French clinical notes, made of section titles and
+    sentences drawn from a fixed bank, so that the reference pipelines find
+    entities, dates, measurements and qualifiers in them.
+
+    Parameters
+    ----------
+    n_notes : int
+        Number of notes
+    n_chars : int
+        Minimum length of each note, in characters
+    seed : int
+        Seed of the random generator, for the notes to be reproducible
+
+    Returns
+    -------
+    List[str]
+    """
+    rng = random.Random(seed)
+    notes = []
+    for _ in range(n_notes):
+        parts = []
+        length = 0
+        while length < n_chars:
+            part = rng.choice(SECTIONS) if rng.random() < 0.1 else None
+            if part is not None:
+                part = "\n\n" + part + "\n"
+            else:
+                part = rng.choice(SENTENCES) + rng.choice([" ", " ", "\n"])
+            parts.append(part)
+            length += len(part)
+        notes.append("".join(parts).strip())
+    return notes
+
+
+def read_notes(
+    path: Union[str, Path],
+    limit: Optional[int] = None,
+) -> List[str]:
+    """
+    Reads the text files of a directory (for instance a BRAT dataset)
+    to benchmark the pipelines on real notes.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Directory containing the `.txt` files, possibly in subfolders
+    limit : Optional[int]
+        Maximum number of notes to read
+
+    Returns
+    -------
+    List[str]
+    """
+    files = sorted(Path(path).rglob("*.txt"))[:limit]
+    return [file.read_text(encoding="utf-8") for file in files]
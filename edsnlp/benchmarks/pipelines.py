@@ -0,0 +1,108 @@
+from typing import Callable, Dict
+
+import spacy
+from spacy.language import Language
+
+
+def core(nlp: Language) -> None:
+    """
+    Sentences, normalisation, matching on the norms and the qualifiers.
+    """
+    nlp.add_pipe("eds.sentences")
+    nlp.add_pipe("eds.normalizer")
+    nlp.add_pipe(
+        "eds.matcher",
+        config=dict(
+            terms=dict(
+                respiratoire=["dyspnée", "toux", "pneumopathie", "embolie pulmonaire"],
+                douleur=["douleur", "douleur thoracique"],
+                fievre=["fièvre"],
+            ),
+            regex=dict(imc=r"imc\s*(?:a|de)?\s*\d+"),
+            attr="NORM",
+        ),
+    )
+    nlp.add_pipe("eds.negation")
+    nlp.add_pipe("eds.hypothesis")
+    nlp.add_pipe("eds.family")
+    nlp.add_pipe("eds.reported_speech")
+
+
+def dates_measurements(nlp: Language) -> None:
+    """
+    Dates, durations and measurements.
+    """
+    nlp.add_pipe("eds.sentences")
+    nlp.add_pipe("eds.normalizer")
+    nlp.add_pipe("eds.dates")
+    nlp.add_pipe("eds.measurements")
+
+
+def disorders(nlp: Language) -> None:
+    """
+    The comorbidities of the Charlson index, and the Charlson score itself.
+    """
+    nlp.add_pipe("eds.sentences")
+    nlp.add_pipe("eds.normalizer")
+    for name in [
+        "eds.aids",
+        "eds.cerebrovascular_accident",
+        "eds.ckd",
+        "eds.congestive_heart_failure",
+        "eds.connective_tissue_disease",
+        "eds.copd",
+        "eds.dementia",
+        "eds.diabetes",
+        "eds.hemiplegia",
+        "eds.leukemia",
+        "eds.liver_disease",
+        "eds.lymphoma",
+        "eds.myocardial_infarction",
+        "eds.peptic_ulcer_disease",
+        "eds.peripheral_vascular_disease",
+        "eds.solid_tumor",
+    ]:
+        nlp.add_pipe(name)
+    nlp.add_pipe("eds.charlson")
+
+
+def terminologies(nlp: Language) -> None:
+    """
+    The CIM10 and drugs terminologies.
+    """
+    nlp.add_pipe("eds.sentences")
+    nlp.add_pipe("eds.normalizer")
+    nlp.add_pipe("eds.cim10")
+    nlp.add_pipe("eds.drugs")
+
+
+PIPELINES: Dict[str, Callable[[Language], None]] = dict(
+    core=core,
+    dates_measurements=dates_measurements,
+    disorders=disorders,
+    terminologies=terminologies,
+)
+
+
+def make_pipeline(name: str, lang: str = "eds") -> Language:
+    """
+    Creates one of the reference pipelines of the benchmarks.
+
+    Parameters
+    ----------
+    name : str
+        Name of the pipeline, one of `PIPELINES`
+    lang : str
+        Language of the pipeline
+
+    Returns
+    -------
+    Language
+    """
+    if name not in PIPELINES:
+        raise ValueError(
+            f"Unknown pipeline {name!r}, expected one of {', '.join(PIPELINES)}"
+        )
+    nlp = spacy.blank(lang)
+    PIPELINES[name](nlp)
+    return nlp
@@ -0,0 +1,10 @@
+from spacy.tokens.doc cimport Doc
+from spacy.vocab cimport Vocab
+
+
+cdef class LexemeCache:
+    cdef readonly Vocab vocab
+    cdef readonly int max_size
+    cdef dict lexemes
+
+    cdef Doc c_make_doc(self, list words)
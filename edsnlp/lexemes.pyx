@@ -0,0 +1,71 @@
+from typing import List, Tuple
+
+from spacy.structs cimport LexemeC
+from spacy.tokens.doc cimport Doc
+from spacy.vocab cimport Vocab
+
+
+cdef class LexemeCache:
+    """
+    Builds `Doc` objects from the words found by a tokenizer, looking up
+    the lexeme of each word in a cache keyed by the word itself, rather than
+    hashing and looking it up in the vocabulary for every token.
+
+    The cached lexemes are added to the vocabulary, and live as long as it does.
+    Once the cache is full, the lexemes of the new words are looked up
+    in the vocabulary as spaCy does, without being cached.
+
+    Parameters
+    ----------
+    vocab : Vocab
+        The vocabulary of the documents
+    max_size : int
+        Maximum number of cached words
+    """
+
+    def __init__(self, Vocab vocab, int max_size = 10_000):
+        self.vocab = vocab
+        self.max_size = max_size
+        self.lexemes = {}
+
+    def __reduce__(self):
+        return LexemeCache, (self.vocab, self.max_size)
+
+    def __len__(self):
+        return len(self.lexemes)
+
+    def make_doc(self, words: List[Tuple[str, str]]) -> Doc:
+        """
+        Builds a `Doc` from its words.
+
+        Parameters
+        ----------
+        words : List[Tuple[str, str]]
+            Each word, followed by its trailing space (empty if there is none)
+
+        Returns
+        -------
+        Doc
+        """
+        return self.c_make_doc(words)
+
+    cdef Doc c_make_doc(self, list words):
+        cdef Doc doc = Doc(self.vocab)
+        cdef const LexemeC* lex
+        cdef dict lexemes = self.lexemes
+        cdef str word
+        cdef str space
+
+        for word, space in words:
+            address = lexemes.get(word)
+            if address is None:
+                if len(lexemes) >= self.max_size:
+                    lex = self.vocab.get(doc.mem, word)
+                else:
+                    lex = self.vocab.get(self.vocab.mem, word)
+                    lexemes[word] = <size_t> lex
+            else:
+                lex = <const LexemeC*> <size_t> address
+            doc.push_back(lex, len(space) > 0)
+
+        return doc
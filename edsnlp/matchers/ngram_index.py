@@ -0,0 +1,297 @@
+import json
+import os
+from collections import Counter
+from math import ceil, floor
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, Union
+
+import numpy as np
+
+NGRAM_INDEX_VERSION = 1
+
+# Appended to the strings shorter than n, as simstring does
+MARK = "\x01"
+
+
+def ngram_features(text: str, n: int = 3) -> List[str]:
+    """
+    The n-grams of a string. As in the databases written by pysimstring, a
+    repeated n-gram is counted as many times as it appears, both in the size of
+    the string and in its overlap with another string.
+
+    Parameters
+    ----------
+    text : str
+        The string
+    n : int
+        Length of the n-grams
+
+    Returns
+    -------
+    List[str]
+    """
+    if len(text) < n:
+        text = text + MARK * (n - len(text))
+    return [text[i : i + n] for i in range(len(text) - n + 1)]
+
+
+# For each measure, the bounds on the number of n-grams of the strings that can
+# be similar to a query of `q` n-grams, and the minimum number of n-grams that
+# a string of `r` n-grams must share with the query, as in pysimstring (whose
+# dice measure does not filter out the shorter strings)
+MEASURES: Dict[str, Tuple[Callable, Callable, Callable]] = dict(
+    dice=(
+        lambda q, a: 1,
+        lambda q, a: floor((2.0 - a) * q / a),
+        lambda q, r, a: np.ceil(0.5 * a * (q + r)),
+    ),
+    jaccard=(
+        lambda q, a: ceil(a * q),
+        lambda q, a: floor(q / a),
+        lambda q, r, a: np.ceil(a * (q + r) / (1.0 + a)),
+    ),
+    cosine=(
+        lambda q, a: ceil(a * a * q),
+        lambda q, a: floor(q / (a * a)),
+        lambda q, r, a: np.ceil(a * np.sqrt(q * r)),
+    ),
+    overlap=(
+        lambda q, a: 1,
+        lambda q, a: 2**31 - 1,
+        lambda q, r, a: np.ceil(a * np.minimum(q, r)),
+    ),
+)
+
+
+class NgramIndexWriter:
+    def __init__(self, path: Union[str, Path], n: int = 3):
+        """
+        A context class to write an n-gram index, with the same interface
+        as the `SimstringWriter`.
+
+        Parameters
+        ----------
+        path: Union[str, Path]
+            Directory of the index
+        n: int
+            Length of the n-grams
+        """
+        self.path = Path(path)
+        self.n = n
+        self.strings = []
+
+    def __enter__(self):
+        self.strings = []
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.write()
+
+    def insert(self, term: str):
+        self.strings.append(term)
+
+    def write(self):
+        """
+        Writes the index. The strings are numbered by increasing number of
+        n-grams, so that the strings of a given size are a range of ids, and
+        the postings of each n-gram are sorted by id.
+        """
+        ngrams = [ngram_features(string, self.n) for string in self.strings]
+        sizes = np.array(
+            [len(string_ngrams) for string_ngrams in ngrams], dtype=np.int64
+        )
+        order = np.argsort(sizes, kind="stable")
+        sizes = sizes[order]
+        ngrams = [set(ngrams[i]) for i in order]
+        strings = [self.strings[i].encode("utf-8") for i in order]
+
+        vocabulary = sorted(set().union(*ngrams))
+        ngram_ids = {ngram: i for i, ngram in enumerate(vocabulary)}
+
+        n_distinct = np.array([len(string_ngrams) for string_ngrams in ngrams])
+        entries = np.fromiter(
+            (ngram_ids[ngram] for string_ngrams in ngrams for ngram in string_ngrams),
+            dtype=np.int64,
+            count=int(n_distinct.sum()),
+        )
+        ids = np.repeat(np.arange(len(strings), dtype=np.int32), n_distinct)
+        entries_order = np.lexsort((ids, entries))
+
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(np.bincount(entries, minlength=len(vocabulary)))
+
+        string_offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+        string_offsets[1:] = np.cumsum([len(string) for string in strings])
+
+        max_size = int(sizes[-1]) if len(sizes) else 0
+        size_offsets = np.searchsorted(sizes, np.arange(max_size + 2))
+
+        os.makedirs(self.path, exist_ok=True)
+        (self.path / "index.json").write_text(
+            json.dumps(dict(version=NGRAM_INDEX_VERSION, n=self.n))
+        )
+        np.save(self.path / "ngrams.npy", np.array(vocabulary, dtype=str))
+        np.save(self.path / "indptr.npy", indptr)
+        np.save(self.path / "postings.npy", ids[entries_order])
+        np.save(self.path / "size_offsets.npy", size_offsets.astype(np.int64))
+        np.save(
+            self.path / "strings.npy",
+            np.frombuffer(b"".join(strings), dtype=np.uint8),
+        )
+        np.save(self.path / "string_offsets.npy", string_offsets)
+
+
+class NgramIndex:
+    """
+    Approximate string retrieval on an n-gram inverted index stored in NumPy
+    arrays, that retrieves the same strings as a `pysimstring` database (in
+    another order), with the same algorithm:
+
+    - the postings of each n-gram are stored in CSR format (`indptr`, `postings`)
+      and are memory-mapped, so the processes that use the same index share it
+    - only the strings whose number of n-grams is compatible with the measure
+      and the threshold are considered (length filtering)
+    - the candidates are taken from the shortest postings of the query, and
+      pruned when they can no longer share enough n-grams with it
+      (τ-overlap pruning)
+
+    Pickling the index only pickles its path.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Directory of the index, written by `NgramIndexWriter`
+    measure : str
+        Similarity measure, one of `dice`, `jaccard`, `cosine` or `overlap`
+    threshold : float
+        Minimum similarity of the retrieved strings
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        measure: str = "dice",
+        threshold: float = 0.75,
+    ):
+        self.path = Path(path)
+        self.measure = getattr(measure, "value", measure)
+        self.threshold = threshold
+
+        if self.measure not in MEASURES:
+            raise ValueError(
+                f"Unknown measure {self.measure!r}, expected one of "
+                f"{', '.join(MEASURES)}"
+            )
+
+        meta = json.loads((self.path / "index.json").read_text())
+        if meta["version"] != NGRAM_INDEX_VERSION:
+            raise ValueError(
+                f"{self.path} was written by an incompatible version of EDS-NLP"
+            )
+        self.n = meta["n"]
+
+        def load(name):
+            # Plain views of the memory maps, which are faster to slice
+            return np.asarray(np.load(self.path / f"{name}.npy", mmap_mode="r"))
+
+        self.ngrams = load("ngrams")
+        self.indptr = load("indptr")
+        self.postings = load("postings")
+        self.size_offsets = load("size_offsets")
+        self.strings = load("strings")
+        self.string_offsets = load("string_offsets")
+        self.max_size = len(self.size_offsets) - 2
+
+    def __reduce__(self):
+        return self.__class__, (str(self.path), self.measure, self.threshold)
+
+    def retrieve(self, text: str) -> List[str]:
+        """
+        Retrieves the strings of the index whose similarity with a query is
+        above the threshold.
+
+        Parameters
+        ----------
+        text : str
+            The query
+
+        Returns
+        -------
+        List[str]
+            The similar strings, by increasing number of n-grams
+            and in insertion order
+        """
+        min_size, max_size, min_match = MEASURES[self.measure]
+        alpha = self.threshold
+
+        ngrams = Counter(ngram_features(text, self.n))
+        n_ngrams = sum(ngrams.values())
+
+        low = max(min_size(n_ngrams, alpha), 1)
+        high = min(max_size(n_ngrams, alpha), self.max_size)
+        if low > high:
+            return []
+        start_id, end_id = self.size_offsets[low], self.size_offsets[high + 1]
+
+        # The minimum overlap increases with the size of the strings
+        tau = int(min_match(n_ngrams, low, alpha))
+
+        # Postings of the n-grams of the query, restricted to the strings of
+        # the right size, with the number of times each n-gram appears in it
+        queried = np.array(list(ngrams))
+        indices = np.minimum(
+            np.searchsorted(self.ngrams, queried), len(self.ngrams) - 1
+        )
+        found = (self.ngrams[indices] == queried).tolist()
+        starts = self.indptr[indices].tolist()
+        ends = self.indptr[indices + 1].tolist()
+
+        postings = []
+        for ngram, is_found, start, end in zip(queried.tolist(), found, starts, ends):
+            if is_found:
+                ngram_postings = self.postings[start:end]
+                start, end = ngram_postings.searchsorted((start_id, end_id))
+                if end > start:
+                    postings.append((ngrams[ngram], ngram_postings[start:end]))
+        postings.sort(key=lambda item: len(item[1]))
+
+        # A string that shares at least tau n-grams with the query is in at least
+        # one of the postings of any n_ngrams - tau + 1 of them: the candidates
+        # are taken from the shortest ones, the missing n-grams (whose postings
+        # are empty) being the first
+        n_signatures = sum(weight for weight, _ in postings) - tau + 1
+        n_candidates_postings = 0
+        while n_signatures > 0 and n_candidates_postings < len(postings):
+            n_signatures -= postings[n_candidates_postings][0]
+            n_candidates_postings += 1
+        if n_candidates_postings == 0:
+            return []
+
+        weights, arrays = zip(*postings[:n_candidates_postings])
+        candidates, inverse = np.unique(np.concatenate(arrays), return_inverse=True)
+        counts = np.bincount(
+            inverse,
+            weights=np.repeat(weights, [len(array) for array in arrays]),
+        ).astype(np.int64)
+        sizes = np.searchsorted(self.size_offsets, candidates, side="right") - 1
+        taus = min_match(n_ngrams, sizes, alpha)
+
+        # The other postings are searched for the candidates, which are dropped
+        # as soon as they can no longer share enough n-grams with the query
+        remaining = sum(weight for weight, _ in postings[n_candidates_postings:])
+        for weight, ngram_postings in postings[n_candidates_postings:]:
+            keep = counts + remaining >= taus
+            candidates, counts, taus = candidates[keep], counts[keep], taus[keep]
+            if not len(candidates):
+                return []
+            positions = ngram_postings.searchsorted(candidates)
+            positions = np.minimum(positions, len(ngram_postings) - 1)
+            counts += weight * (ngram_postings[positions] == candidates)
+            remaining -= weight
+
+        offsets = self.string_offsets
+        return [
+            self.strings[offsets[i] : offsets[i + 1]].tobytes().decode("utf-8")
+            for i in candidates[counts >= taus].tolist()
+        ]
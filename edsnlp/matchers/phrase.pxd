@@ -1,3 +1,4 @@
+from libc.stdint cimport int64_t
 from libcpp.vector cimport vector
 from spacy.matcher.phrasematcher cimport PhraseMatcher
 from spacy.structs cimport SpanC
@@ -9,5 +10,10 @@ from spacy.typedefs cimport attr_t
 cdef class EDSPhraseMatcher(PhraseMatcher):
     cdef attr_t space_hash
     cdef attr_t excluded_hash
+    cdef public object cache
+    cdef public int n_process
+    cdef list _compiled
+
+    cdef void insert_keyword(self, const attr_t* keyword, int64_t length, attr_t key)
 
     cdef void find_matches(self, Doc doc, int start_idx, int end_idx, vector[SpanC] *matches) nogil
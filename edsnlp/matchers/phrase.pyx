@@ -1,10 +1,22 @@
 # cython: infer_types=True, profile=True
+import hashlib
+import json
+import os
 import re
+import shutil
+from itertools import chain
+from pathlib import Path
+from typing import List, Tuple, Union
 
+import numpy as np
+
+from libc.stdint cimport int64_t
 from preshed.maps cimport map_clear, map_get, map_init, map_iter, map_set
 
+import spacy
+from loguru import logger
 from spacy import Language
-from tqdm import tqdm
+from spacy.attrs import NAMES
 
 from preshed.maps cimport MapStruct, key_t
 from spacy.matcher.phrasematcher cimport PhraseMatcher
@@ -13,6 +25,7 @@ from spacy.typedefs cimport attr_t
 from spacy.vocab cimport Vocab
 
 from edsnlp.matchers.utils import Patterns
+from edsnlp.matchers.utils.terms import get_token_pipelines, pipe_terms
 
 
 def get_normalized_variant(doclike) -> str:
@@ -23,6 +36,68 @@ def get_normalized_variant(doclike) -> str:
     return variant
 
 
+# Version of the format of the compiled patterns, see `write_compiled_patterns`
+COMPILED_PATTERNS_VERSION = 1
+
+CompiledPatterns = Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]
+
+
+def write_compiled_patterns(path: Union[str, Path], patterns: CompiledPatterns):
+    """
+    Writes compiled patterns in a directory: the labels in a JSON file, and the
+    token hashes of the keywords and their offsets in NumPy files.
+    The directory is written at once, so that concurrent processes never read
+    a partially written one.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        The directory
+    patterns : CompiledPatterns
+        The labels, the token hashes of all the keywords, the offsets of the
+        keywords in the hashes, and the offsets of the labels in the keywords
+    """
+    labels, tokens, offsets, label_offsets = patterns
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.mkdir(parents=True, exist_ok=True)
+    (tmp / "labels.json").write_text(
+        json.dumps(dict(version=COMPILED_PATTERNS_VERSION, labels=labels))
+    )
+    np.save(tmp / "tokens.npy", tokens)
+    np.save(tmp / "offsets.npy", offsets)
+    np.save(tmp / "label_offsets.npy", label_offsets)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Another process wrote the same patterns in the meantime
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def read_compiled_patterns(path: Union[str, Path]) -> CompiledPatterns:
+    """
+    Reads the compiled patterns written by `write_compiled_patterns`.
+    The arrays are memory-mapped rather than loaded.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        The directory
+
+    Returns
+    -------
+    CompiledPatterns
+    """
+    path = Path(path)
+    labels = json.loads((path / "labels.json").read_text())["labels"]
+    return (
+        labels,
+        np.load(path / "tokens.npy", mmap_mode="r"),
+        np.load(path / "offsets.npy", mmap_mode="r"),
+        np.load(path / "label_offsets.npy", mmap_mode="r"),
+    )
+
+
 cdef class EDSPhraseMatcher(PhraseMatcher):
     """
     PhraseMatcher that allows to skip excluded tokens.
@@ -40,9 +115,17 @@ cdef class EDSPhraseMatcher(PhraseMatcher):
         Whether to ignore excluded tokens, by default True
     ignore_space_tokens : bool, optional
         Whether to exclude tokens that have a "SPACE" tag, by default False
+    cache : Union[bool, str, Path], optional
+        Where to cache the patterns compiled by `build_patterns`, so that they are
+        not computed again by the next pipelines built from the same terms:
+        a directory, True for the default EDS-NLP data directory, or False
+        to disable the cache (default)
+    n_process : int, optional
+        Number of processes used by `build_patterns` to tokenize and normalize
+        the terms, by default 1
     """
 
-    def __init__(self, Vocab vocab, attr="ORTH", ignore_excluded=True, ignore_space_tokens=False, validate=False):
+    def __init__(self, Vocab vocab, attr="ORTH", ignore_excluded=True, ignore_space_tokens=False, validate=False, cache=False, n_process=1):
         """Initialize the PhraseMatcher.
 
         vocab (Vocab): The shared vocabulary.
@@ -63,8 +146,38 @@ cdef class EDSPhraseMatcher(PhraseMatcher):
         else:
             self.space_hash = 0
 
+        self.cache = cache
+        self.n_process = n_process
+        self._compiled = []
+
         self.set_extensions()
 
+    def __reduce__(self):
+        data = (
+            self.vocab,
+            self.attr,
+            self.excluded_hash != 0,
+            self.space_hash != 0,
+            self.cache,
+            self.n_process,
+            self._docs,
+            self._callbacks,
+            self._compiled,
+        )
+        return unpickle_matcher, data
+
+    def remove(self, key):
+        """
+        Removes a label from the matcher.
+
+        Parameters
+        ----------
+        key : str
+            The label
+        """
+        self._load_compiled_keywords()
+        super().remove(key)
+
     @staticmethod
     def set_extensions():
         if not Span.has_extension("normalized_variant"):
@@ -75,6 +188,10 @@ cdef class EDSPhraseMatcher(PhraseMatcher):
         Build patterns and adds them for matching.
         Helper function for pipelines using this matcher.
 
+        When the matcher has a `cache`, the compiled patterns are looked up
+        in it, by a hash of the terms and of the configuration of the tokenizer
+        and the token components of the pipeline, and written to it otherwise.
+
         Parameters
         ----------
         nlp : Language
@@ -88,28 +205,198 @@ cdef class EDSPhraseMatcher(PhraseMatcher):
         if not terms:
             terms = dict()
 
-        token_pipelines = [
-            name
-            for name, pipe in nlp.pipeline
-            if any(
-                "token" in assign and not assign == "token.is_sent_start"
-                for assign in nlp.get_pipe_meta(name).assigns
+        path = None
+        if self.cache:
+            path = self.get_cache_path(nlp, terms)
+            if path.exists():
+                self.add_compiled(read_compiled_patterns(path))
+                return
+
+        patterns = self.compile_patterns(nlp, terms, progress=progress)
+
+        if path is not None:
+            try:
+                write_compiled_patterns(path, patterns)
+            except OSError as e:
+                logger.warning(f"Could not cache the compiled patterns: {e}")
+
+        self.add_compiled(patterns)
+
+    def compile_patterns(
+        self,
+        nlp: Language,
+        terms: Patterns,
+        progress: bool = False,
+    ) -> CompiledPatterns:
+        """
+        Applies the tokenizer, and the components of the pipeline that assign the
+        matched attribute, to the distinct terms of all the labels in a single
+        stream, and collects the hashes of the matched attribute of their tokens.
+
+        Parameters
+        ----------
+        nlp : Language
+            The instance of the spaCy language class.
+        terms : Patterns
+            Dictionary of label/terms, or label/dictionary of terms/attribute.
+        progress: bool
+            Whether to track progress when preprocessing terms
+
+        Returns
+        -------
+        CompiledPatterns
+            The labels, the token hashes of all the keywords, the offsets of the
+            keywords in the hashes, and the offsets of the labels in the keywords
+        """
+        labels = []
+        expressions = []
+        for key, patterns in terms.items():
+            if isinstance(patterns, dict):
+                patterns = patterns.get("patterns")
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            labels.append(key)
+            expressions.append(patterns)
+
+        term_keywords = {
+            term: tuple(self._convert_to_array(doc))
+            for term, doc in pipe_terms(
+                nlp,
+                expressions,
+                attrs=[NAMES[self.attr]],
+                n_process=self.n_process,
+                progress=progress,
             )
-        ]
-        with nlp.select_pipes(enable=token_pipelines):
-            for key, expressions in (tqdm(
-                terms.items(),
-                desc="Adding terms into the pipeline"
-            ) if progress else terms.items()):
-                if isinstance(expressions, dict):
-                    attr = expressions.get("attr")
-                    expressions = expressions.get("patterns")
-                else:
-                    attr = None
-                if isinstance(expressions, str):
-                    expressions = [expressions]
-                patterns = list(nlp.pipe(expressions))
-                self.add(key, patterns, attr)
+        }
+
+        # Identical keywords of a label are only inserted once
+        keywords = []
+        label_offsets = [0]
+        for patterns in expressions:
+            keywords.extend(
+                dict.fromkeys(
+                    term_keywords[term] for term in patterns if term_keywords[term]
+                )
+            )
+            label_offsets.append(len(keywords))
+
+        offsets = np.zeros(len(keywords) + 1, dtype=np.int64)
+        np.cumsum([len(keyword) for keyword in keywords], out=offsets[1:])
+        tokens = np.fromiter(chain.from_iterable(keywords), dtype=np.uint64)
+
+        return labels, tokens, offsets, np.asarray(label_offsets, dtype=np.int64)
+
+    def get_cache_path(self, nlp: Language, terms: Patterns) -> Path:
+        """
+        Path of the compiled patterns in the cache, named after a hash of
+        everything they depend on.
+
+        Parameters
+        ----------
+        nlp : Language
+            The instance of the spaCy language class.
+        terms : Patterns
+            Dictionary of label/terms, or label/dictionary of terms/attribute.
+
+        Returns
+        -------
+        Path
+        """
+        from edsnlp import __version__
+
+        if self.cache is True:
+            import pystow
+
+            directory = pystow.join("edsnlp", "phrase_matcher")
+        else:
+            directory = Path(self.cache)
+
+        content = dict(
+            version=COMPILED_PATTERNS_VERSION,
+            edsnlp=__version__,
+            spacy=spacy.__version__,
+            lang=nlp.lang,
+            tokenizer=nlp.config["nlp"]["tokenizer"],
+            pipes={
+                name: nlp.get_pipe_config(name)
+                for name in get_token_pipelines(nlp, [NAMES[self.attr]])
+            },
+            attr=self.attr,
+            terms=terms,
+        )
+        digest = hashlib.sha256(
+            json.dumps(content, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return directory / digest
+
+    def add_compiled(self, patterns: CompiledPatterns):
+        """
+        Adds compiled patterns to the matcher, inserting the keywords
+        directly in the trie.
+
+        Parameters
+        ----------
+        patterns : CompiledPatterns
+            The patterns, as returned by `compile_patterns`
+            or `read_compiled_patterns`
+        """
+        labels, tokens, offsets, label_offsets = patterns
+
+        cdef const attr_t[:] c_tokens = tokens
+        cdef const int64_t[:] c_offsets = offsets
+        cdef const int64_t[:] c_label_offsets = label_offsets
+        cdef int64_t i, k
+        cdef attr_t key_hash
+
+        # The arrays are kept as is (possibly memory-mapped): the keywords are
+        # only converted to tuples, as `add` stores them, to remove a label
+        self._compiled.append(patterns)
+
+        for i, key in enumerate(labels):
+            key_hash = self.vocab.strings.add(key)
+            self._callbacks[key] = None
+            for k in range(c_label_offsets[i], c_label_offsets[i + 1]):
+                self.insert_keyword(
+                    &c_tokens[c_offsets[k]],
+                    c_offsets[k + 1] - c_offsets[k],
+                    key_hash,
+                )
+
+    def _load_compiled_keywords(self):
+        """
+        Stores the keywords of the compiled patterns as tuples of hashes,
+        like `add` does.
+        """
+        for labels, tokens, offsets, label_offsets in self._compiled:
+            hashes = np.asarray(tokens).tolist()
+            offsets = np.asarray(offsets).tolist()
+            for i, key in enumerate(labels):
+                keywords = self._docs.setdefault(key, set())
+                for k in range(label_offsets[i], label_offsets[i + 1]):
+                    keywords.add(tuple(hashes[offsets[k] : offsets[k + 1]]))
+        self._compiled = []
+
+    cdef void insert_keyword(self, const attr_t* keyword, int64_t length, attr_t key):
+        cdef:
+            MapStruct * current_node = self.c_map
+            MapStruct * internal_node
+            void * result
+            int64_t i
+        for i in range(length):
+            result = map_get(current_node, keyword[i])
+            if not result:
+                internal_node = <MapStruct *> self.mem.alloc(1, sizeof(MapStruct))
+                map_init(self.mem, internal_node, 8)
+                map_set(self.mem, current_node, keyword[i], internal_node)
+                result = internal_node
+            current_node = <MapStruct *> result
+        result = map_get(current_node, self._terminal_hash)
+        if not result:
+            internal_node = <MapStruct *> self.mem.alloc(1, sizeof(MapStruct))
+            map_init(self.mem, internal_node, 8)
+            map_set(self.mem, current_node, self._terminal_hash, internal_node)
+            result = internal_node
+        map_set(self.mem, <MapStruct *> result, key, NULL)
 
     cdef void find_matches(self, Doc doc, int start_idx, int end_idx, vector[SpanC] *matches) nogil:
         cdef:
@@ -168,6 +455,32 @@ cdef class EDSPhraseMatcher(PhraseMatcher):
             current_node = self.c_map
             idx += 1
 
+def unpickle_matcher(
+    vocab,
+    attr,
+    ignore_excluded,
+    ignore_space_tokens,
+    cache,
+    n_process,
+    docs,
+    callbacks,
+    compiled,
+):
+    matcher = EDSPhraseMatcher(
+        vocab,
+        attr=attr,
+        ignore_excluded=ignore_excluded,
+        ignore_space_tokens=ignore_space_tokens,
+        cache=cache,
+        n_process=n_process,
+    )
+    for key, specs in docs.items():
+        matcher.add(key, specs, on_match=callbacks.get(key))
+    for patterns in compiled:
+        matcher.add_compiled(patterns)
+    return matcher
+
+
 cdef SpanC make_spanstruct(attr_t label, int start, int end) nogil:
     cdef SpanC spanc
     spanc.label = label
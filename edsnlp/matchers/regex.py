@@ -1,22 +1,32 @@
 import re
-from bisect import bisect_left
-from functools import lru_cache
-from typing import Any, Dict, List, Optional, Tuple, Union
-
+from collections import defaultdict
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 from loguru import logger
-from spacy.tokens import Doc, Span, Token
-
-from edsnlp.utils.regex import compile_regex
+from spacy.tokens import Doc, Span
 
-from .utils import Patterns, alignment, get_text, offset
+from edsnlp.utils.regex import (
+    compile_regex,
+    get_mergeable_source,
+    get_required_literals,
+    make_lookahead_union,
+)
 
+from .utils import Patterns, get_text
+from .utils.views import TokenBounds, get_text_view, get_token_bounds
 
-@lru_cache(32)
-def get_first_included(doclike: Union[Doc, Span]) -> Token:
-    for token in doclike:
-        if token.tag_ != "EXCLUDED":
-            return token
-    raise IndexError("The provided Span does not include any token")
+ALIGNMENT_MODES = ("strict", "contract", "expand")
 
 
 def get_normalized_variant(doclike) -> str:
@@ -73,29 +83,102 @@ def span_from_match(
     return start_char, end_char
 
 
-def create_span(
+def finditer_from_positions(
+    pattern: re.Pattern,
+    text: str,
+    positions: Iterable[int],
+) -> Iterator[re.Match]:
+    """
+    Equivalent of `pattern.finditer(text)` that only tries to match
+    at the given candidate positions.
+
+    The positions must be sorted and contain every position where the pattern
+    could start a match, for instance the positions yielded by a lookahead
+    union of several patterns (see `make_lookahead_union`).
+
+    Parameters
+    ----------
+    pattern : re.Pattern
+        The compiled pattern
+    text : str
+        The text to match on
+    positions : Iterable[int]
+        Sorted candidate start positions
+
+    Yields
+    ------
+    re.Match
+        The same matches as `pattern.finditer(text)`
+    """
+    end = 0
+    for pos in positions:
+        if pos < end:
+            continue
+        match = pattern.match(text, pos)
+        if match is None:
+            continue
+        if match.end() == pos:
+            # Empty matches have subtle continuation rules: let the regex
+            # engine handle the remainder of the text itself
+            yield from pattern.finditer(text, pos)
+            return
+        yield match
+        end = match.end()
+
+
+def token_by_char(bounds: TokenBounds, chars: np.ndarray) -> np.ndarray:
+    """
+    Vectorized lookup of the tokens that contain each character offset,
+    trailing whitespace included, like spaCy does in `Doc.char_span`.
+
+    Parameters
+    ----------
+    bounds : TokenBounds
+        Character boundaries of the tokens of the `Doc`
+    chars : np.ndarray
+        Character offsets in the `Doc` text
+
+    Returns
+    -------
+    np.ndarray
+        Index of the token containing each offset, or -1 if there is none
+    """
+    tokens = np.searchsorted(bounds.starts, chars, side="right") - 1
+    inside = (tokens >= 0) & (chars < bounds.stops[np.maximum(tokens, 0)])
+    return np.where(inside, tokens, -1)
+
+
+def create_spans(
     doclike: Union[Doc, Span],
-    start_char: int,
-    end_char: int,
-    key: str,
+    starts: Sequence[int],
+    ends: Sequence[int],
+    key: Union[str, Sequence[str]],
     attr: str,
     alignment_mode: str,
     ignore_excluded: bool,
     ignore_space_tokens: bool,
-) -> Span:
+) -> List[Optional[Span]]:
     """
-    spaCy only allows strict alignment mode for char_span on Spans.
-    This method circumvents this.
+    Creates the spans of several matches on the same text representation
+    of a Doc-like object at once.
+
+    The character offsets are mapped back to the original text with
+    `np.searchsorted` on the cached alignment of the `Doc`, and the spans are
+    built from token indices directly, with the same results as
+    `Doc.char_span` (in any alignment mode, even on a `Span`).
+
     Parameters
     ----------
     doclike : Union[Doc, Span]
         `Doc` or `Span`.
-    start_char : int
-        Character index within the Doc-like object.
-    end_char : int
-        Character index of the end, within the Doc-like object.
-    key : str
-        The key used to match.
+    starts : Sequence[int]
+        Character indices of the starts, within the Doc-like object.
+    ends : Sequence[int]
+        Character indices of the ends, within the Doc-like object.
+    key : Union[str, Sequence[str]]
+        The key used to match, or the key of each match.
+    attr : str
+        The attribute of the text representation.
     alignment_mode : str
         The alignment mode.
     ignore_excluded : bool
@@ -105,71 +188,126 @@ def create_span(
 
     Returns
     -------
-    span:
-        A span matched on the Doc-like object.
+    List[Optional[Span]]
+        The span of each match, or `None` if it could not be aligned.
     """
+    if alignment_mode not in ALIGNMENT_MODES:
+        raise ValueError(
+            f"Unknown alignment mode `{alignment_mode}`, "
+            f"expected one of {', '.join(ALIGNMENT_MODES)}."
+        )
 
     doc = doclike if isinstance(doclike, Doc) else doclike.doc
 
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    keys = [key] * len(starts) if isinstance(key, str) else key
+
+    if not len(starts) or not len(doc):
+        return [None] * len(starts)
+
     # Handle the simple case immediately
     if attr in {"TEXT", "LOWER"} and not ignore_excluded and not ignore_space_tokens:
         off = doclike[0].idx
-        return doc.char_span(
-            start_char + off,
-            end_char + off,
-            label=key,
-            alignment_mode=alignment_mode,
-        )
+        starts = starts + off
+        ends = ends + off
 
-    # If doclike is a Span, we need to get the clean
-    # index of the first included token
-    if ignore_excluded or ignore_space_tokens:
-        original, clean = alignment(
-            doc=doc,
+    else:
+        view = get_text_view(
+            doc,
             attr=attr,
             ignore_excluded=ignore_excluded,
             ignore_space_tokens=ignore_space_tokens,
         )
 
-        first_included = get_first_included(doclike)
-        i = bisect_left(original, first_included.idx)
-        first = clean[i]
-
+        # If doclike is a Span, we need to get the clean
+        # index of its first kept token
+        if ignore_excluded or ignore_space_tokens:
+            i = np.searchsorted(view.indices, doclike[0].i)
+            first = view.starts[i]
+        else:
+            first = doclike[0].idx
+
+        # Offset of each index, from the rightmost-lower token of the view
+        starts = first + starts
+        ends = first + ends
+        last = len(view.starts) - 1
+        i = np.minimum(np.searchsorted(view.starts, starts), last)
+        starts = starts + view.original[i] - view.starts[i]
+        i = np.minimum(np.searchsorted(view.starts, ends), last)
+        ends = ends + view.original[i] - view.starts[i]
+
+    bounds = get_token_bounds(doc)
+
+    # Same logic as `Doc.char_span`
+    begin = token_by_char(bounds, starts)
+    end = token_by_char(bounds, ends - 1)
+    valid = (begin >= 0) & (end >= 0)
+
+    token_starts = bounds.starts[np.maximum(begin, 0)]
+    token_ends = bounds.ends[np.maximum(end, 0)]
+
+    if alignment_mode == "strict":
+        valid &= (starts == token_starts) & (ends == token_ends)
+    elif alignment_mode == "contract":
+        begin = begin + (token_starts < starts)
+        end = end - (ends < token_ends)
+        valid &= end >= begin
     else:
-        first = doclike[0].idx
+        # Don't consider the trailing whitespace to be part of the previous token
+        begin = begin + (starts == bounds.ends[np.maximum(begin, 0)])
 
-    start_char = (
-        first
-        + start_char
-        + offset(
-            doc,
-            attr=attr,
-            ignore_excluded=ignore_excluded,
-            ignore_space_tokens=ignore_space_tokens,
-            index=first + start_char,
-        )
-    )
+    return [
+        Span(doc, b, e + 1, label=k) if v else None
+        for b, e, v, k in zip(begin.tolist(), end.tolist(), valid.tolist(), keys)
+    ]
 
-    end_char = (
-        first
-        + end_char
-        + offset(
-            doc,
-            attr=attr,
-            ignore_excluded=ignore_excluded,
-            ignore_space_tokens=ignore_space_tokens,
-            index=first + end_char,
-        )
-    )
 
-    span = doc.char_span(
-        start_char,
-        end_char,
-        label=key,
-        alignment_mode=alignment_mode,
-    )
+def create_span(
+    doclike: Union[Doc, Span],
+    start_char: int,
+    end_char: int,
+    key: str,
+    attr: str,
+    alignment_mode: str,
+    ignore_excluded: bool,
+    ignore_space_tokens: bool,
+) -> Optional[Span]:
+    """
+    spaCy only allows strict alignment mode for char_span on Spans.
+    This method circumvents this.
+    Parameters
+    ----------
+    doclike : Union[Doc, Span]
+        `Doc` or `Span`.
+    start_char : int
+        Character index within the Doc-like object.
+    end_char : int
+        Character index of the end, within the Doc-like object.
+    key : str
+        The key used to match.
+    alignment_mode : str
+        The alignment mode.
+    ignore_excluded : bool
+        Whether to skip excluded tokens.
+    ignore_space_tokens : bool
+        Whether to skip space tokens.
 
-    return span
+    Returns
+    -------
+    span:
+        A span matched on the Doc-like object.
+    """
+    return create_spans(
+        doclike=doclike,
+        starts=[start_char],
+        ends=[end_char],
+        key=key,
+        attr=attr,
+        alignment_mode=alignment_mode,
+        ignore_excluded=ignore_excluded,
+        ignore_space_tokens=ignore_space_tokens,
+    )[0]
 
 
 class RegexMatcher(object):
@@ -202,6 +340,16 @@ class RegexMatcher(object):
         If set to `False`, will create spans basede on the regex's full match.
         If set to `True`, will use the first matching capturing group as a span
         (and fall back to using the full match if no capturing group is matching)
+    combine : bool
+        Whether to merge the patterns that match on the same text representation
+        into a single automaton, that is run once per text to find the positions
+        where a match may start. Each pattern is then only tried at these
+        positions, which avoids scanning the text once per pattern.
+        The matches are the same as without this option.
+    prefilter : bool
+        Whether to look, when adding the patterns, for literals that any of their
+        matches must contain, and skip the patterns whose literals do not occur
+        in the text to match on.
     """
 
     def __init__(
@@ -212,6 +360,8 @@ class RegexMatcher(object):
         ignore_space_tokens: bool = False,
         flags: Union[re.RegexFlag, int] = 0,  # No additional flags
         span_from_group: bool = False,
+        combine: bool = False,
+        prefilter: bool = True,
     ):
         self.alignment_mode = alignment_mode
         self.regex = []
@@ -224,6 +374,11 @@ class RegexMatcher(object):
         self.ignore_excluded = ignore_excluded
         self.ignore_space_tokens = ignore_space_tokens
 
+        self.combine = combine
+        self.combined = None
+
+        self.prefilter = prefilter
+
         self.set_extensions()
 
     @classmethod
@@ -316,6 +471,10 @@ class RegexMatcher(object):
             flags = self.flags
 
         patterns = [compile_regex(pattern, flags) for pattern in patterns]
+        literals = [
+            get_required_literals(pattern) if self.prefilter else None
+            for pattern in patterns
+        ]
 
         self.regex.append(
             (
@@ -325,8 +484,10 @@ class RegexMatcher(object):
                 ignore_excluded,
                 ignore_space_tokens,
                 alignment_mode,
+                literals,
             )
         )
+        self.combined = None
 
     def remove(
         self,
@@ -349,16 +510,56 @@ class RegexMatcher(object):
         self.regex = [pat for pat in self.regex if pat[0] != key]
         if len(self.regex) == n:
             raise ValueError(f"`{key}` is not referenced in the matcher")
+        self.combined = None
+
+    def compile(self) -> Tuple[List[re.Pattern], Dict[Tuple[int, int], int]]:
+        """
+        Merges the patterns that share the same text representation
+        (`attr`, `ignore_excluded`, `ignore_space_tokens`) and flags into
+        lookahead unions. Patterns that cannot be merged (back-references,
+        patterns that require the `regex` module, ...) are left out and
+        matched independently.
+
+        Returns
+        -------
+        Tuple[List[re.Pattern], Dict[Tuple[int, int], int]]
+            The unions, and the index of the union that covers each
+            `(entry, pattern)` couple of `self.regex`
+        """
+        groups = defaultdict(list)
+
+        for entry_idx, entry in enumerate(self.regex):
+            _, patterns, attr, ignore_excluded, ignore_space_tokens, *_ = entry
+            for pattern_idx, pattern in enumerate(patterns):
+                source = get_mergeable_source(pattern)
+                if source is None:
+                    continue
+                view = (attr, ignore_excluded, ignore_space_tokens, pattern.flags)
+                groups[view].append(((entry_idx, pattern_idx), source))
+
+        unions = []
+        union_index = {}
+        for view, group in groups.items():
+            for indices, _ in group:
+                union_index[indices] = len(unions)
+            unions.append(
+                make_lookahead_union([source for _, source in group], flags=view[3])
+            )
+
+        self.combined = (unions, union_index)
+
+        return self.combined
 
     def __len__(self):
         return len(set([regex[0] for regex in self.regex]))
 
-    def match(
+    def iter_matches(
         self,
         doclike: Union[Doc, Span],
-    ) -> Tuple[Span, re.Match]:
+    ) -> Iterator[Tuple[str, str, bool, bool, str, re.Match]]:
         """
-        Iterates on the matches.
+        Iterates on the raw regex matches, pattern by pattern, in the order
+        in which the patterns were added.
 
         Parameters
         ----------
@@ -367,44 +568,160 @@ class RegexMatcher(object):
 
         Yields
         -------
-        span:
-            A match.
+        Tuple[str, str, bool, bool, str, re.Match]
+            The key, attr, ignore_excluded, ignore_space_tokens and alignment_mode
+            of the pattern, and the match on the corresponding text.
         """
 
-        for (
+        unions, union_index = [], {}
+        if self.combine:
+            if self.combined is None:
+                self.compile()
+            unions, union_index = self.combined
+        positions = [None] * len(unions)
+
+        # Literal lookups are shared between the patterns of the matcher
+        found = {}
+        lowered = {}
+
+        def lookup(view, text, literal):
+            try:
+                return found[view, literal]
+            except KeyError:
+                string, is_lower = literal
+                if is_lower:
+                    if view not in lowered:
+                        lowered[view] = text.lower()
+                    text = lowered[view]
+                found[view, literal] = res = string in text
+                return res
+
+        for entry_idx, (
             key,
             patterns,
             attr,
             ignore_excluded,
             ignore_space_tokens,
             alignment_mode,
-        ) in self.regex:
+            literals,
+        ) in enumerate(self.regex):
             text = get_text(doclike, attr, ignore_excluded, ignore_space_tokens)
+            view = (attr, ignore_excluded, ignore_space_tokens)
+
+            for pattern_idx, pattern in enumerate(patterns):
+                if literals[pattern_idx] is not None and not any(
+                    lookup(view, text, literal) for literal in literals[pattern_idx]
+                ):
+                    continue
+
+                union_idx = union_index.get((entry_idx, pattern_idx))
+                if union_idx is None:
+                    matches = pattern.finditer(text)
+                else:
+                    # The union is run once per text, and only tells
+                    # where each of its patterns may start a match
+                    if positions[union_idx] is None:
+                        positions[union_idx] = [
+                            m.start() for m in unions[union_idx].finditer(text)
+                        ]
+                    matches = finditer_from_positions(
+                        pattern, text, positions[union_idx]
+                    )
 
-            for pattern in patterns:
-                for match in pattern.finditer(text):
+                for match in matches:
                     logger.trace(f"Matched a regex from {key}: {repr(match.group())}")
-
-                    start_char, end_char = span_from_match(
-                        match=match,
-                        span_from_group=self.span_from_group,
+                    yield (
+                        key,
+                        attr,
+                        ignore_excluded,
+                        ignore_space_tokens,
+                        alignment_mode,
+                        match,
                     )
 
-                    span = create_span(
-                        doclike=doclike,
-                        start_char=start_char,
-                        end_char=end_char,
-                        key=key,
-                        attr=attr,
-                        alignment_mode=alignment_mode,
-                        ignore_excluded=ignore_excluded,
-                        ignore_space_tokens=ignore_space_tokens,
-                    )
+    def spans_from_offsets(
+        self,
+        doclike: Union[Doc, Span],
+        offsets: List[Tuple[str, str, bool, bool, str, int, int]],
+    ) -> List[Optional[Span]]:
+        """
+        Creates the spans of several matches, batching the matches
+        that share the same text representation and alignment mode
+        (see [`create_spans`][edsnlp.matchers.regex.create_spans]).
 
-                    if span is None:
-                        continue
+        Parameters
+        ----------
+        doclike:
+            spaCy Doc or Span object the matches were found on.
+        offsets:
+            The key, attr, ignore_excluded, ignore_space_tokens and alignment_mode
+            of each match, followed by its start and end characters.
 
-                    yield span, match
+        Returns
+        -------
+        List[Optional[Span]]
+            The span of each match, in the same order.
+        """
+        groups = defaultdict(list)
+        for idx, (_, attr, ignore_excluded, ignore_space_tokens, mode, *_) in enumerate(
+            offsets
+        ):
+            groups[attr, ignore_excluded, ignore_space_tokens, mode].append(idx)
+
+        spans = [None] * len(offsets)
+        for (
+            attr,
+            ignore_excluded,
+            ignore_space_tokens,
+            mode,
+        ), indices in groups.items():
+            group_spans = create_spans(
+                doclike=doclike,
+                starts=[offsets[idx][5] for idx in indices],
+                ends=[offsets[idx][6] for idx in indices],
+                key=[offsets[idx][0] for idx in indices],
+                attr=attr,
+                alignment_mode=mode,
+                ignore_excluded=ignore_excluded,
+                ignore_space_tokens=ignore_space_tokens,
+            )
+            for idx, span in zip(indices, group_spans):
+                spans[idx] = span
+
+        return spans
+
+    def match(
+        self,
+        doclike: Union[Doc, Span],
+    ) -> Tuple[Span, re.Match]:
+        """
+        Iterates on the matches.
+
+        Parameters
+        ----------
+        doclike:
+            spaCy Doc or Span object to match on.
+
+        Yields
+        -------
+        span:
+            A match.
+        """
+
+        matches = list(self.iter_matches(doclike))
+        spans = self.spans_from_offsets(
+            doclike,
+            [
+                (*entry, *span_from_match(match, self.span_from_group))
+                for *entry, match in matches
+            ],
+        )
+
+        for span, (*_, match) in zip(spans, matches):
+            if span is None:
+                continue
+
+            yield span, match
 
     def match_with_groupdict_as_spans(
         self,
@@ -424,50 +741,33 @@ class RegexMatcher(object):
             A match.
         """
 
-        for (
-            key,
-            patterns,
-            attr,
-            ignore_excluded,
-            ignore_space_tokens,
-            alignment_mode,
-        ) in self.regex:
-            text = get_text(doclike, attr, ignore_excluded, ignore_space_tokens)
+        matches = list(self.iter_matches(doclike))
+
+        offsets = []
+        for *entry, match in matches:
+            offsets.append((*entry, *span_from_match(match, self.span_from_group)))
+            key, *entry = entry
+            for group_key, group_string in match.groupdict().items():
+                if group_string:
+                    offsets.append(
+                        (
+                            group_key,
+                            *entry,
+                            match.start(group_key),
+                            match.end(group_key),
+                        )
+                    )
 
-            for pattern in patterns:
-                for match in pattern.finditer(text):
-                    logger.trace(f"Matched a regex from {key}: {repr(match.group())}")
+        spans = iter(self.spans_from_offsets(doclike, offsets))
 
-                    start_char, end_char = span_from_match(
-                        match=match,
-                        span_from_group=self.span_from_group,
-                    )
+        for *_, match in matches:
+            span = next(spans)
+            group_spans = {}
+            for group_key, group_string in match.groupdict().items():
+                if group_string:
+                    group_spans[group_key] = next(spans)
 
-                    span = create_span(
-                        doclike=doclike,
-                        start_char=start_char,
-                        end_char=end_char,
-                        key=key,
-                        attr=attr,
-                        alignment_mode=alignment_mode,
-                        ignore_excluded=ignore_excluded,
-                        ignore_space_tokens=ignore_space_tokens,
-                    )
-                    group_spans = {}
-                    for group_key, group_string in match.groupdict().items():
-                        if group_string:
-                            group_spans[group_key] = create_span(
-                                doclike=doclike,
-                                start_char=match.start(group_key),
-                                end_char=match.end(group_key),
-                                key=group_key,
-                                attr=attr,
-                                alignment_mode=alignment_mode,
-                                ignore_excluded=ignore_excluded,
-                                ignore_space_tokens=ignore_space_tokens,
-                            )
-
-                    yield span, group_spans
+            yield span, group_spans
 
     def __call__(
         self,
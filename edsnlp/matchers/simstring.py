@@ -1,19 +1,33 @@
 import os
 import pickle
 import tempfile
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from enum import Enum
 from functools import lru_cache
 from math import sqrt
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple, Union
-
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 import pysimstring.simstring as simstring
 from spacy import Language, Vocab
 from spacy.tokens import Doc, Span
-from tqdm import tqdm
+from typing_extensions import Literal
 
-from edsnlp.matchers.utils import ATTRIBUTES, get_text
+from edsnlp.matchers.ngram_index import NgramIndex, NgramIndexWriter
+from edsnlp.matchers.utils import get_text
+from edsnlp.matchers.utils.terms import pipe_terms
+from edsnlp.matchers.utils.views import get_text_view
+from edsnlp.utils.memmap import MemoryMappedDict
 
 
 class SimstringWriter:
@@ -48,6 +62,40 @@ class SimilarityMeasure(str, Enum):
     cosine = "cosine"
 
 
+class RetrievalCache:
+    def __init__(self, size: int):
+        """
+        A bounded mapping of candidate strings to their retrieved synonyms and
+        similarities, that evicts the least recently used entries.
+
+        Parameters
+        ----------
+        size: int
+            Maximum number of entries, 0 to disable the cache
+        """
+        self.size = size
+        self.data = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[Tuple[str, float], ...]]:
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Tuple[Tuple[str, float], ...]) -> None:
+        if self.size <= 0:
+            return
+        self.data[key] = value
+        if len(self.data) > self.size:
+            self.data.popitem(last=False)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+
 class SimstringMatcher:
     def __init__(
         self,
@@ -59,6 +107,9 @@ class SimstringMatcher:
         ignore_excluded: bool = False,
         ignore_space_tokens: bool = False,
         attr: str = "NORM",
+        n_process: int = 1,
+        cache_size: int = 100_000,
+        backend: Literal["simstring", "numpy"] = "simstring",
     ):
         """
         PhraseMatcher that allows to skip excluded tokens.
@@ -85,6 +136,19 @@ class SimstringMatcher:
             Default attribute to match on, by default "TEXT".
             Can be overridden in the `add` method.
             To match on a custom attribute, prepend the attribute name with `_`.
+        n_process : int
+            Number of processes used by `build_patterns` to tokenize and normalize
+            the terms
+        cache_size : int
+            Maximum number of candidate strings whose retrieved synonyms are
+            kept in memory, since the same windows of text are often found in
+            several places of a document, or in several documents. Set to 0 to
+            disable the cache.
+        backend : Literal["simstring", "numpy"]
+            Index of the synonyms: a `pysimstring` database, or an n-gram index
+            stored in NumPy arrays (see
+            [`NgramIndex`][edsnlp.matchers.ngram_index.NgramIndex]) that retrieves
+            the same synonyms and is memory-mapped, to be shared between processes
         """
 
         assert measure in (
@@ -101,6 +165,14 @@ class SimstringMatcher:
         self.ignore_excluded = ignore_excluded
         self.ignore_space_tokens = ignore_space_tokens
         self.attr = attr
+        self.n_process = n_process
+
+        if backend not in ("simstring", "numpy"):
+            raise ValueError(
+                f"Backend {repr(backend)} does not belong to"
+                f" known backends [simstring, numpy]."
+            )
+        self.backend = backend
 
         if path is None:
             path = tempfile.mkdtemp()
@@ -108,6 +180,7 @@ class SimstringMatcher:
 
         self.ss_reader = None
         self.syn2cuis = None
+        self.cache = RetrievalCache(cache_size)
 
     def build_patterns(
         self, nlp: Language, terms: Dict[str, Iterable[str]], progress: bool = False
@@ -127,55 +200,110 @@ class SimstringMatcher:
 
         self.ss_reader = None
         self.syn2cuis = None
+        self.cache.clear()
 
-        syn2cuis = defaultdict(lambda: [])
-        token_pipelines = [
-            name
-            for name, pipe in nlp.pipeline
-            if any(
-                "token" in assign and not assign == "token.is_sent_start"
-                for assign in nlp.get_pipe_meta(name).assigns
+        # The excluded and space tokens are marked by their tag
+        attrs = [self.attr]
+        if self.ignore_excluded or self.ignore_space_tokens:
+            attrs.append("TAG")
+
+        norm_texts = {
+            term: get_text(
+                doc,
+                self.attr,
+                ignore_excluded=self.ignore_excluded,
+                ignore_space_tokens=self.ignore_space_tokens,
             )
-        ]
-        with nlp.select_pipes(enable=token_pipelines):
-            with SimstringWriter(self.path) as ss_db:
-                for cui, synset in tqdm(terms.items()) if progress else terms.items():
-                    for term in nlp.pipe(synset):
-                        norm_text = get_text(
-                            term,
-                            self.attr,
-                            ignore_excluded=self.ignore_excluded,
-                            ignore_space_tokens=self.ignore_space_tokens,
-                        )
-                        term = "##" + norm_text + "##"
+            for term, doc in pipe_terms(
+                nlp,
+                terms.values(),
+                attrs=attrs,
+                n_process=self.n_process,
+                progress=progress,
+            )
+        }
+
+        # Identical normalized terms are only inserted once
+        syn2cuis = defaultdict(lambda: [])
+        if self.backend == "numpy":
+            writer = NgramIndexWriter(self.path / "ngrams")
+        else:
+            writer = SimstringWriter(self.path)
+        with writer as ss_db:
+            for cui, synset in terms.items():
+                for term in synset:
+                    term = "##" + norm_texts[term] + "##"
+                    if term not in syn2cuis:
                         ss_db.insert(term)
-                        syn2cuis[term].append(cui)
+                    syn2cuis[term].append(cui)
         syn2cuis = {term: tuple(sorted(set(cuis))) for term, cuis in syn2cuis.items()}
-        with open(self.path / "cui-db.pkl", "wb") as f:
-            pickle.dump(syn2cuis, f)
+        # The synonyms are memory-mapped rather than loaded, to be shared by
+        # every process that uses the matcher
+        MemoryMappedDict.write(self.path / "cui-db.bin", syn2cuis)
 
     def load(self):
         if self.ss_reader is None:
-            self.ss_reader = simstring.reader(
-                os.path.join(self.path, "terms.simstring")
-            )
-            self.ss_reader.measure = getattr(simstring, self.measure)
-            self.ss_reader.threshold = self.threshold
+            if self.backend == "numpy":
+                self.ss_reader = NgramIndex(
+                    self.path / "ngrams",
+                    measure=self.measure,
+                    threshold=self.threshold,
+                )
+            else:
+                self.ss_reader = simstring.reader(
+                    os.path.join(self.path, "terms.simstring")
+                )
+                self.ss_reader.measure = getattr(simstring, self.measure)
+                self.ss_reader.threshold = self.threshold
+
+            if (self.path / "cui-db.bin").exists():
+                self.syn2cuis = MemoryMappedDict(self.path / "cui-db.bin")
+            else:
+                # Databases built by previous versions
+                with open(os.path.join(self.path, "cui-db.pkl"), "rb") as f:
+                    self.syn2cuis = pickle.load(f)
 
-            with open(os.path.join(self.path, "cui-db.pkl"), "rb") as f:
-                self.syn2cuis = pickle.load(f)
+    def lookup(self, texts: Iterable[str]) -> Dict[str, Tuple[Tuple[str, float], ...]]:
+        """
+        Retrieves the synonyms that are similar to each candidate string, and
+        their similarities. Each distinct string is only looked up once, and
+        the results are kept in the cache of the matcher.
 
-    def __call__(self, doc, as_spans=False):
+        Parameters
+        ----------
+        texts: Iterable[str]
+            Candidate strings, surrounded by `##`
+
+        Returns
+        -------
+        Dict[str, Tuple[Tuple[str, float], ...]]
+            For each distinct candidate, the synonyms and their similarities
+        """
         self.load()
 
-        root = getattr(doc, "doc", doc)
+        results = {}
+        for text in texts:
+            if text in results:
+                continue
+            matches = self.cache.get(text)
+            if matches is None:
+                ngrams = _ngrams(text)
+                matches = tuple(
+                    (res, _ngrams_similarity(ngrams, _term_ngrams(res), self.measure))
+                    for res in self.ss_reader.retrieve(text)
+                )
+                self.cache.put(text, matches)
+            results[text] = matches
+        return results
+
+    def _candidates(self, doclike) -> List[Tuple[str, int, int]]:
+        root = getattr(doclike, "doc", doclike)
         if root.has_annotation("IS_SENT_START"):
-            sents = tuple(doc.sents)
+            sents = tuple(doclike.sents)
         else:
-            sents = (doc,)
-
-        ents: List[Tuple[str, int, int, float]] = []
+            sents = (doclike,)
 
+        candidates = []
         for sent in sents:
             text, offsets = get_text_and_offsets(
                 doclike=sent,
@@ -187,14 +315,49 @@ class SimstringMatcher:
                 for i in range(0, len(offsets) - size):
                     begin_char, _, begin_i, _ = offsets[i]
                     _, end_char, _, end_i = offsets[i + size]
-                    span_text = "##" + text[begin_char:end_char] + "##"
-                    matches = self.ss_reader.retrieve(span_text)
-                    for res in matches:
-                        sim = _similarity(span_text, res, measure=self.measure)
-                        for cui in self.syn2cuis[res]:
-                            ents.append(
-                                (cui, begin_i + sent_start, end_i + sent_start, sim)
-                            )
+                    candidates.append(
+                        (
+                            "##" + text[begin_char:end_char] + "##",
+                            begin_i + sent_start,
+                            end_i + sent_start,
+                        )
+                    )
+        return candidates
+
+    def match_batch(self, doclikes: Sequence[Union[Doc, Span]], as_spans=False):
+        """
+        Matches a batch of documents (or spans). The candidate windows of text
+        of all the documents are deduplicated, then looked up together.
+
+        Parameters
+        ----------
+        doclikes: Sequence[Union[Doc, Span]]
+            The documents or spans to match on
+        as_spans: bool
+            Whether to return spaCy spans, or `(label, start, end)` tuples
+
+        Returns
+        -------
+        List[Union[List[Span], List[Tuple[str, int, int]]]]
+            The matches of each document
+        """
+        candidates = [self._candidates(doclike) for doclike in doclikes]
+        matches = self.lookup(
+            span_text
+            for doc_candidates in candidates
+            for span_text, _, _ in doc_candidates
+        )
+        return [
+            self._resolve(doclike, doc_candidates, matches, as_spans)
+            for doclike, doc_candidates in zip(doclikes, candidates)
+        ]
+
+    def _resolve(self, doclike, candidates, matches, as_spans):
+        ents: List[Tuple[str, int, int, float]] = []
+        for span_text, begin, end in candidates:
+            for res, sim in matches[span_text]:
+                for cui in self.syn2cuis[res]:
+                    ents.append((cui, begin, end, sim))
 
         sorted_spans = sorted(ents, key=simstring_sort_key, reverse=True)
         results = []
@@ -207,6 +370,7 @@ class SimstringMatcher:
                 seen_tokens.update(span_tokens)
         results = sorted(results, key=lambda span: span[1])
         if as_spans:
+            root = getattr(doclike, "doc", doclike)
             spans = [
                 Span(root, span_data[1], span_data[2], span_data[0])
                 for span_data in results
@@ -215,12 +379,23 @@ class SimstringMatcher:
         else:
             return [(self.vocab.strings[span[0]], span[1], span[2]) for span in results]
 
+    def __call__(self, doc, as_spans=False):
+        return self.match_batch([doc], as_spans=as_spans)[0]
 
-def _similarity(x: str, y: str, measure: SimilarityMeasure = SimilarityMeasure.dice):
 
-    x_ngrams = {x[i : i + 3] for i in range(0, len(x) - 3)}
-    y_ngrams = {y[i : i + 3] for i in range(0, len(y) - 3)}
+def _ngrams(text: str) -> FrozenSet[str]:
+    return frozenset(text[i : i + 3] for i in range(0, len(text) - 3))
 
+
+# The trigrams of the synonyms are reused for every candidate that retrieves them
+_term_ngrams = lru_cache(maxsize=2**16)(_ngrams)
+
+
+def _ngrams_similarity(
+    x_ngrams: FrozenSet[str],
+    y_ngrams: FrozenSet[str],
+    measure: SimilarityMeasure = SimilarityMeasure.dice,
+):
     if measure == SimilarityMeasure.jaccard:
         return len(x_ngrams & y_ngrams) / (len(x_ngrams | y_ngrams))
 
@@ -234,11 +409,14 @@ def _similarity(x: str, y: str, measure: SimilarityMeasure = SimilarityMeasure.d
         return len(x_ngrams & y_ngrams)
 
 
+def _similarity(x: str, y: str, measure: SimilarityMeasure = SimilarityMeasure.dice):
+    return _ngrams_similarity(_ngrams(x), _ngrams(y), measure=measure)
+
+
 def simstring_sort_key(span_data: Tuple[str, int, int, float]):
     return span_data[3], span_data[2] - span_data[1], -span_data[1]
 
 
-@lru_cache(maxsize=128)
 def get_text_and_offsets(
     doclike: Union[Span, Doc],
     attr: str = "TEXT",
@@ -267,46 +445,37 @@ def get_text_and_offsets(
         of the word in the new text, the end char indice of its preceding word and the
         begin / end indices of the word in the original document
     """
-    attr = attr.upper()
-    attr = ATTRIBUTES.get(attr, attr)
+    doc = getattr(doclike, "doc", doclike)
+    span_start = getattr(doclike, "start", 0)
+    view = get_text_view(
+        doc,
+        attr=attr,
+        ignore_excluded=ignore_excluded,
+        ignore_space_tokens=ignore_space_tokens,
+    )
 
-    custom = attr.startswith("_")
+    first, last = np.searchsorted(view.indices, [span_start, span_start + len(doclike)])
+    last -= 1
 
-    if custom:
-        attr = attr[1:].lower()
-
-    offsets = []
+    if first > last:
+        return "", [(0, 0, len(doclike), 1)]
 
-    cursor = 0
+    base = int(view.starts[first])
+    # The view text contains the whitespace following each token
+    end = int(view.starts[last + 1]) if last + 1 < len(view.starts) else len(view.text)
 
-    text = []
+    starts = (view.starts[first : last + 1] - base).tolist()
+    ends = (view.ends[first : last + 1] - base).tolist()
+    indices = (view.indices[first : last + 1] - span_start).tolist()
 
-    last = cursor
+    offsets = []
+    last_end = 0
     last_i = 0
-    for i, token in enumerate(doclike):
-
-        if (not ignore_excluded or token.tag_ != "EXCLUDED") and (
-            not ignore_space_tokens or token.tag_ != "SPACE"
-        ):
-            if custom:
-                token_text = getattr(token._, attr)
-            else:
-                token_text = getattr(token, attr)
-
-            # We add the cursor
-            end = cursor + len(token_text)
-            offsets.append((cursor, last, i, last_i + 1))
-
-            cursor = end
-            last = end
-            last_i = i
-
-            text.append(token_text)
-
-            if token.whitespace_:
-                cursor += 1
-                text.append(" ")
+    for start, token_end, i in zip(starts, ends, indices):
+        offsets.append((start, last_end, i, last_i + 1))
+        last_end = token_end
+        last_i = i
 
-    offsets.append((cursor, last, len(doclike), last_i + 1))
+    offsets.append((end - base, last_end, len(doclike), last_i + 1))
 
-    return "".join(text), offsets
+    return view.text[base:end], offsets
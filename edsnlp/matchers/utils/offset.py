@@ -1,30 +1,23 @@
-from bisect import bisect_left
-from functools import lru_cache, partial
-from typing import List, Tuple
+from typing import Tuple
 
-from spacy.tokens import Doc, Token
+import numpy as np
+from spacy.tokens import Doc
 
-from . import ATTRIBUTES
+from .views import get_text_view
 
 
-def token_length(token: Token, custom: bool, attr: str):
-    if custom:
-        text = getattr(token._, attr)
-    else:
-        text = getattr(token, attr)
-    return len(text)
-
-
-@lru_cache(maxsize=32)
 def alignment(
     doc: Doc,
     attr: str = "TEXT",
     ignore_excluded: bool = True,
     ignore_space_tokens: bool = True,
-) -> Tuple[List[int], List[int]]:
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Align different representations of a `Doc` or `Span` object.
 
+    The alignment is computed once per `Doc` and cached on it
+    (see [`get_text_view`][edsnlp.matchers.utils.views.get_text_view]).
+
     Parameters
     ----------
     doc : Doc
@@ -38,44 +31,19 @@ def alignment(
 
     Returns
     -------
-    Tuple[List[int], List[int]]
-        An alignment tuple: original and clean lists.
+    Tuple[np.ndarray, np.ndarray]
+        An alignment tuple: original and clean arrays.
     """
     assert isinstance(doc, Doc)
 
-    attr = attr.upper()
-    attr = ATTRIBUTES.get(attr, attr)
-
-    custom = attr.startswith("_")
-
-    if custom:
-        attr = attr[1:].lower()
-
-    # Define the length function
-    length = partial(token_length, custom=custom, attr=attr)
-
-    original = []
-    clean = []
-
-    cursor = 0
-
-    for token in doc:
-
-        if (not ignore_excluded or token.tag_ != "EXCLUDED") and (
-            not ignore_space_tokens or not token.tag_ == "SPACE"
-        ):
-
-            # The token is not excluded, we add its extremities to the list
-            original.append(token.idx)
-
-            # We add the cursor
-            clean.append(cursor)
-            cursor += length(token)
-
-            if token.whitespace_:
-                cursor += 1
+    view = get_text_view(
+        doc,
+        attr=attr,
+        ignore_excluded=ignore_excluded,
+        ignore_space_tokens=ignore_space_tokens,
+    )
 
-    return original, clean
+    return view.original, view.starts
 
 
 def offset(
@@ -119,8 +87,8 @@ def offset(
         ignore_space_tokens=ignore_space_tokens,
     )
 
-    # We use bisect to efficiently find the correct rightmost-lower index
-    i = bisect_left(clean, index)
+    # We use a binary search to efficiently find the correct rightmost-lower index
+    i = np.searchsorted(clean, index)
     i = min(i, len(original) - 1)
 
-    return original[i] - clean[i]
+    return int(original[i] - clean[i])
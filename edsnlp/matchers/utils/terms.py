@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from spacy.language import Language
+from spacy.tokens import Doc
+from tqdm import tqdm
+
+
+def get_token_pipelines(
+    nlp: Language,
+    attrs: Optional[Iterable[str]] = None,
+) -> List[str]:
+    """
+    Names of the components of a pipeline that modify the tokens,
+    which are applied to the terms before adding them to a matcher.
+
+    Parameters
+    ----------
+    nlp : Language
+        The pipeline
+    attrs : Optional[Iterable[str]]
+        Token attributes that the matcher reads, eg `["NORM"]`. If given, only the
+        components that assign one of them, or that change the tokenization,
+        are kept: with `["TEXT"]`, the terms are only tokenized.
+
+    Returns
+    -------
+    List[str]
+    """
+    if attrs is None:
+        return [
+            name
+            for name in nlp.pipe_names
+            if any(
+                "token" in assign and not assign == "token.is_sent_start"
+                for assign in nlp.get_pipe_meta(name).assigns
+            )
+        ]
+
+    assigned = set()
+    for attr in attrs:
+        attr = attr.lower()
+        if attr in ("text", "orth"):
+            assigned.update(("token.text", "token.orth"))
+        assigned.add(f"token.{attr}")
+
+    return [
+        name
+        for name in nlp.pipe_names
+        if nlp.get_pipe_meta(name).retokenizes
+        or any(
+            assign.rstrip("_") in assigned for assign in nlp.get_pipe_meta(name).assigns
+        )
+    ]
+
+
+@contextmanager
+def select_token_pipelines(nlp: Language, names: Iterable[str]) -> Iterator[None]:
+    """
+    Enables the given components of a pipeline, even those that are currently
+    disabled (for instance by `nlp.select_pipes`), and disables the others for
+    the duration of the context, so that the terms added to a matcher are
+    processed by the same components whatever the pipeline is doing.
+
+    Parameters
+    ----------
+    nlp : Language
+        The pipeline
+    names : Iterable[str]
+        Names of the components, eg given by `get_token_pipelines`
+    """
+    names = list(names)
+    disabled = [name for name in names if name in nlp.disabled]
+    for name in disabled:
+        nlp.enable_pipe(name)
+    try:
+        with nlp.select_pipes(enable=names):
+            yield
+    finally:
+        for name in disabled:
+            nlp.disable_pipe(name)
+
+
+def pipe_terms(
+    nlp: Language,
+    terms: Iterable[Iterable[str]],
+    attrs: Iterable[str],
+    n_process: int = 1,
+    progress: bool = False,
+) -> Iterator[Tuple[str, Doc]]:
+    """
+    Applies the tokenizer, and the components that assign the given attributes,
+    to every distinct term of a terminology, in a single stream of documents.
+
+    Parameters
+    ----------
+    nlp : Language
+        The pipeline
+    terms : Iterable[Iterable[str]]
+        The synonyms of each concept
+    attrs : Iterable[str]
+        Token attributes that the matcher reads, see `get_token_pipelines`
+    n_process : int
+        Number of processes to apply the pipeline with
+    progress : bool
+        Whether to track progress
+
+    Returns
+    -------
+    Iterator[Tuple[str, Doc]]
+        Each distinct term, and its document
+    """
+    unique = list(dict.fromkeys(chain.from_iterable(terms)))
+
+    with nlp.select_pipes(enable=get_token_pipelines(nlp, attrs)):
+        docs = nlp.pipe(unique, n_process=n_process)
+        if progress:
+            docs = tqdm(docs, total=len(unique), desc="Adding terms into the pipeline")
+        yield from zip(unique, docs)
@@ -1,12 +1,11 @@
-from functools import lru_cache
 from typing import Union
 
+import numpy as np
 from spacy.tokens import Doc, Span
 
-from . import ATTRIBUTES
+from .views import get_raw_text, get_text_view
 
 
-@lru_cache(32)
 def get_text(
     doclike: Union[Doc, Span],
     attr: str,
@@ -16,6 +15,10 @@ def get_text(
     """
     Get text using a custom attribute, possibly ignoring excluded tokens.
 
+    The text is extracted from the text view of the whole `Doc`, which
+    is computed once and cached on the `Doc`
+    (see [`get_text_view`][edsnlp.matchers.utils.views.get_text_view]).
+
     Parameters
     ----------
     doclike : Union[Doc, Span]
@@ -34,31 +37,25 @@ def get_text(
     """
 
     attr = attr.upper()
+    is_doc = isinstance(doclike, Doc)
+    doc = doclike if is_doc else doclike.doc
+
+    if not ignore_excluded and not ignore_space_tokens and attr in ("TEXT", "LOWER"):
+        if is_doc:
+            return get_raw_text(doc, lower=attr == "LOWER")
+        # Lowercasing can change the length of the text, and so the offsets
+        text = get_raw_text(doc)[doclike.start_char : doclike.end_char]
+        return text.lower() if attr == "LOWER" else text
+
+    view = get_text_view(doc, attr, ignore_excluded, ignore_space_tokens)
 
-    if not ignore_excluded and not ignore_space_tokens:
-        if attr == "TEXT":
-            return doclike.text
-        elif attr == "LOWER":
-            return doclike.text.lower()
-        else:
-            tokens = doclike
+    if is_doc:
+        first, last = 0, len(view.indices) - 1
     else:
-        if not ignore_space_tokens:
-            tokens = [t for t in doclike if t.tag_ != "EXCLUDED"]
-        else:
-            tokens = [t for t in doclike if t.tag_ not in ("EXCLUDED", "SPACE")]
+        first, last = np.searchsorted(view.indices, [doclike.start, doclike.end])
+        last -= 1
 
-    if not tokens:
+    if first > last:
         return ""
 
-    attr = ATTRIBUTES.get(attr, attr)
-
-    if attr.startswith("_"):
-        attr = attr[1:].lower()
-        return "".join(
-            [getattr(t._, attr) + t.whitespace_ for t in tokens[:-1]]
-        ) + getattr(tokens[-1], attr)
-    else:
-        return "".join(
-            [getattr(t, attr) + t.whitespace_ for t in tokens[:-1]]
-        ) + getattr(tokens[-1], attr)
+    return view.text[view.starts[first] : view.ends[last]]
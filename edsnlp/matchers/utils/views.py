@@ -0,0 +1,324 @@
+import weakref
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from spacy.attrs import IDX, LENGTH, SPACY, TAG
+from spacy.tokens import Doc
+
+from . import ATTRIBUTES
+
+
+class TextView(NamedTuple):
+    """
+    Text representation of a `Doc`, built from a given token attribute and
+    possibly skipping excluded/space tokens, along with the offsets that
+    align it with the original text.
+    """
+
+    text: str
+    """Concatenated attribute of the kept tokens, with their whitespaces"""
+    indices: np.ndarray
+    """Index of each kept token in the `Doc`"""
+    original: np.ndarray
+    """Character offset of each kept token in the `Doc` text"""
+    starts: np.ndarray
+    """Character offset of each kept token in the view text"""
+    ends: np.ndarray
+    """Character offset of the end of each kept token in the view text"""
+
+
+class TokenBounds(NamedTuple):
+    """
+    Character boundaries of the tokens of a `Doc`, used to map character
+    offsets to tokens without calling `Doc.char_span`.
+    """
+
+    starts: np.ndarray
+    """Character offset of each token"""
+    ends: np.ndarray
+    """Character offset of the end of each token"""
+    stops: np.ndarray
+    """Character offset of the end of each token, including its whitespace"""
+
+
+class TextViewCache:
+    """
+    Holds the text views of a `Doc`, for each `(attr, ignore_excluded,
+    ignore_space_tokens)` combination.
+
+    The views are only valid as long as the tokens norms and tags are unchanged:
+    components that modify them must call
+    [`clear_cache`][edsnlp.matchers.utils.views.clear_cache] on the `Doc`.
+    Comparing these arrays on every access would cost more than most lookups.
+    The raw text and the token boundaries only depend on the tokenization,
+    and are kept until the `Doc` is retokenized.
+    """
+
+    def __init__(self, doc: Doc):
+        self.length = len(doc)
+        self.views: Dict[Tuple[str, bool, bool], TextView] = {}
+        self.raw: Dict[bool, str] = {}
+        self.bounds: Optional[TokenBounds] = None
+
+
+# The caches are attached to the documents themselves (and freed with them)
+# rather than stored in `doc.user_data`, which must remain serializable
+_caches: "weakref.WeakKeyDictionary[Doc, TextViewCache]" = weakref.WeakKeyDictionary()
+
+
+def get_cache(doc: Doc) -> TextViewCache:
+    """
+    Returns the text view cache of a `Doc`, creating it if needed.
+
+    Parameters
+    ----------
+    doc : Doc
+        spaCy `Doc` object
+
+    Returns
+    -------
+    TextViewCache
+    """
+    cache = _caches.get(doc)
+    # The length check guards against retokenization
+    if cache is None or cache.length != len(doc):
+        cache = _caches[doc] = TextViewCache(doc)
+    return cache
+
+
+def clear_cache(doc: Doc) -> None:
+    """
+    Forgets the text views computed for a `Doc`. Must be called by the
+    components that modify the `NORM` or `TAG` attributes of the tokens.
+
+    Parameters
+    ----------
+    doc : Doc
+        spaCy `Doc` object
+    """
+    cache = _caches.get(doc)
+    if cache is not None:
+        cache.views.clear()
+
+
+def set_raw_text(doc: Doc, text: str) -> None:
+    """
+    Registers the text of a `Doc`, as known by the tokenizer that created it,
+    so that it is not rebuilt from the tokens.
+
+    Parameters
+    ----------
+    doc : Doc
+        spaCy `Doc` object
+    text : str
+        The text of the `Doc`, which must be equal to `doc.text`
+    """
+    get_cache(doc).raw[False] = text
+
+
+def get_raw_text(doc: Doc, lower: bool = False) -> str:
+    """
+    Returns the (possibly lowercased) text of a `Doc`, computed once per `Doc`.
+
+    Parameters
+    ----------
+    doc : Doc
+        spaCy `Doc` object
+    lower : bool
+        Whether to lowercase the text
+
+    Returns
+    -------
+    str
+    """
+    cache = get_cache(doc)
+    text = cache.raw.get(lower)
+    if text is None:
+        text = cache.raw[lower] = doc.text.lower() if lower else doc.text
+    return text
+
+
+def get_token_bounds(doc: Doc) -> TokenBounds:
+    """
+    Returns the character boundaries of the tokens of a `Doc`,
+    computed once per `Doc`.
+
+    Parameters
+    ----------
+    doc : Doc
+        spaCy `Doc` object
+
+    Returns
+    -------
+    TokenBounds
+    """
+    cache = get_cache(doc)
+    if cache.bounds is None:
+        array = doc.to_array([IDX, LENGTH, SPACY]).astype(np.int64).reshape(-1, 3)
+        starts = array[:, 0]
+        ends = starts + array[:, 1]
+        cache.bounds = TokenBounds(starts, ends, ends + array[:, 2])
+    return cache.bounds
+
+
+def is_cacheable(attr: str) -> bool:
+    """
+    Whether the views built from the attribute can be cached: custom
+    attributes may change without the cache noticing.
+
+    Parameters
+    ----------
+    attr : str
+        Attribute name
+
+    Returns
+    -------
+    bool
+    """
+    return not ATTRIBUTES.get(attr.upper(), attr).startswith("_")
+
+
+def get_text_view(
+    doc: Doc,
+    attr: str = "TEXT",
+    ignore_excluded: bool = True,
+    ignore_space_tokens: bool = True,
+) -> TextView:
+    """
+    Returns the text view of a `Doc` for a given attribute, computing it
+    if needed. Views of standard attributes are cached on the `Doc`
+    and shared between every matcher of the pipeline.
+
+    Parameters
+    ----------
+    doc : Doc
+        spaCy `Doc` object
+    attr : str, optional
+        Attribute to use, by default `"TEXT"`
+    ignore_excluded : bool, optional
+        Whether to remove excluded tokens, by default True
+    ignore_space_tokens : bool, optional
+        Whether to remove space tokens, by default True
+
+    Returns
+    -------
+    TextView
+    """
+    attr = attr.upper()
+
+    if not is_cacheable(attr):
+        return make_text_view(doc, attr, ignore_excluded, ignore_space_tokens)
+
+    cache = get_cache(doc)
+    key = (attr, ignore_excluded, ignore_space_tokens)
+    view = cache.views.get(key)
+    if view is None:
+        view = cache.views[key] = make_text_view(
+            doc, attr, ignore_excluded, ignore_space_tokens
+        )
+    return view
+
+
+def make_text_view(
+    doc: Doc,
+    attr: str,
+    ignore_excluded: bool,
+    ignore_space_tokens: bool,
+) -> TextView:
+    """
+    Computes the text view of a `Doc`, see
+    [`get_text_view`][edsnlp.matchers.utils.views.get_text_view].
+    """
+    if attr == "TEXT":
+        return make_raw_text_view(doc, ignore_excluded, ignore_space_tokens)
+
+    attr = ATTRIBUTES.get(attr, attr)
+
+    custom = attr.startswith("_")
+
+    if custom:
+        attr = attr[1:].lower()
+
+    excluded_hash = doc.vocab.strings["EXCLUDED"]
+    space_hash = doc.vocab.strings["SPACE"]
+
+    text = []
+    indices = []
+    original = []
+    starts = []
+    ends = []
+
+    cursor = 0
+
+    for token in doc:
+        tag = token.tag
+        if (not ignore_excluded or tag != excluded_hash) and (
+            not ignore_space_tokens or tag != space_hash
+        ):
+            token_text = getattr(token._, attr) if custom else getattr(token, attr)
+
+            indices.append(token.i)
+            original.append(token.idx)
+            starts.append(cursor)
+
+            cursor += len(token_text)
+            ends.append(cursor)
+            text.append(token_text)
+
+            if token.whitespace_:
+                cursor += 1
+                text.append(" ")
+
+    return TextView(
+        "".join(text),
+        np.array(indices, dtype=np.int64),
+        np.array(original, dtype=np.int64),
+        np.array(starts, dtype=np.int64),
+        np.array(ends, dtype=np.int64),
+    )
+
+
+def make_raw_text_view(
+    doc: Doc,
+    ignore_excluded: bool,
+    ignore_space_tokens: bool,
+) -> TextView:
+    """
+    Computes the `TEXT` view of a `Doc` from the raw text and the tags of its
+    tokens, with the same result as
+    [`make_text_view`][edsnlp.matchers.utils.views.make_text_view]: the view
+    is made of the slices of the raw text covered by the runs of kept tokens.
+    """
+    bounds = get_token_bounds(doc)
+    text = get_raw_text(doc)
+
+    keep = np.ones(len(doc), dtype=bool)
+    if ignore_excluded or ignore_space_tokens:
+        tags = doc.to_array(TAG).reshape(-1)
+        if ignore_excluded:
+            keep &= tags != doc.vocab.strings["EXCLUDED"]
+        if ignore_space_tokens:
+            keep &= tags != doc.vocab.strings["SPACE"]
+
+    indices = np.flatnonzero(keep).astype(np.int64)
+    original = bounds.starts[indices]
+    if not len(indices):
+        return TextView("", indices, original, original, original)
+
+    # Each token contributes its text and its whitespace
+    lengths = bounds.stops[indices] - original
+    starts = np.cumsum(lengths) - lengths
+    ends = starts + bounds.ends[indices] - original
+
+    # Consecutive kept tokens are contiguous in the raw text
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    firsts = indices[np.concatenate([[0], breaks])]
+    lasts = indices[np.concatenate([breaks - 1, [len(indices) - 1]])]
+    view = "".join(
+        text[begin:end]
+        for begin, end in zip(
+            bounds.starts[firsts].tolist(), bounds.stops[lasts].tolist()
+        )
+    )
+
+    return TextView(view, indices, original, starts, ends)
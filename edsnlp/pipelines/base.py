@@ -28,14 +28,57 @@ class BaseComponent:
     the creation of extensions, and is particularly usefull when
     distributing EDSNLP on a cluster, since the serialisation mechanism
     imposes that the extensions be reset.
+
+    Components can also defer the creation of their most expensive resources,
+    such as the matchers of large terminologies: the attributes listed in
+    `lazy_attributes` are created by `build`, when they are first accessed
+    or when `warmup` (or `edsnlp.language.warmup(nlp)`) is called.
     """
 
+    lazy_attributes: Tuple[str, ...] = ()
+
     def __init__(self, nlp: Language = None, name: str = None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.nlp = nlp
         self.name = name
         self.set_extensions()
 
+    def __getattr__(self, name: str) -> Any:
+        # Only called for the attributes that are not set (yet)
+        if name in type(self).lazy_attributes:
+            try:
+                self.build()
+            except AttributeError as e:
+                # Otherwise, Python would report that `name` does not exist
+                raise RuntimeError(
+                    f"Could not build the {name!r} attribute "
+                    f"of the {type(self).__name__!r} component"
+                ) from e
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
+    def __getstate__(self):
+        # Components sent to other processes are built beforehand,
+        # rather than by each process
+        self.warmup()
+        return self.__dict__
+
+    def build(self) -> None:
+        """
+        Creates the attributes listed in `lazy_attributes`.
+        """
+
+    def warmup(self) -> None:
+        """
+        Creates the deferred resources of the component,
+        if they were not created yet.
+        """
+        if any(name not in self.__dict__ for name in self.lazy_attributes):
+            self.build()
+
     def set_extensions(self):
         """
         Set `Doc`, `Span` and `Token` extensions.
@@ -12,6 +12,7 @@ from spacy.tokens import Doc, Span
 from edsnlp.matchers.phrase import EDSPhraseMatcher
 from edsnlp.matchers.regex import RegexMatcher, create_span
 from edsnlp.matchers.utils import get_text
+from edsnlp.matchers.utils.terms import get_token_pipelines, select_token_pipelines
 from edsnlp.pipelines.base import BaseNERComponent, SpanSetterArg
 from edsnlp.utils.lists import flatten
 
@@ -68,6 +69,8 @@ class ContextualMatcher(BaseNERComponent):
         How to set matches on the doc
     """
 
+    lazy_attributes = ("phrase_matcher",)
+
     def __init__(
         self,
         nlp: Optional[Language],
@@ -109,13 +112,9 @@ class ContextualMatcher(BaseNERComponent):
         patterns = models.FullConfig.parse_obj(patterns).__root__
         self.patterns = {pattern.source: pattern for pattern in patterns}
 
-        # Matchers for the anchors
-        self.phrase_matcher = EDSPhraseMatcher(
-            self.nlp.vocab,
-            attr=attr,
-            ignore_excluded=ignore_excluded,
-            ignore_space_tokens=ignore_space_tokens,
-        )
+        # Matchers for the anchors: the terms are only added to the phrase matcher
+        # when it is first used, see `build`
+        self._token_pipelines = get_token_pipelines(nlp)
         self.regex_matcher = RegexMatcher(
             attr=attr,
             flags=regex_flags,
@@ -124,15 +123,6 @@ class ContextualMatcher(BaseNERComponent):
             alignment_mode=alignment_mode,
         )
 
-        self.phrase_matcher.build_patterns(
-            nlp=nlp,
-            terms={
-                source: {
-                    "patterns": p.terms,
-                }
-                for source, p in self.patterns.items()
-            },
-        )
         self.regex_matcher.build_patterns(
             regex={
                 source: {
@@ -221,6 +211,30 @@ class ContextualMatcher(BaseNERComponent):
 
         self.set_extensions()
 
+    def build(self) -> None:
+        """
+        Creates the phrase matcher of the anchors, applying the token components that
+        precede this one in the pipeline to the terms. This is done on the first call
+        to the component, or by `warmup`.
+        """
+        phrase_matcher = EDSPhraseMatcher(
+            self.nlp.vocab,
+            attr=self.attr,
+            ignore_excluded=self.ignore_excluded,
+            ignore_space_tokens=self.ignore_space_tokens,
+        )
+        with select_token_pipelines(self.nlp, self._token_pipelines):
+            phrase_matcher.build_patterns(
+                nlp=self.nlp,
+                terms={
+                    source: {
+                        "patterns": p.terms,
+                    }
+                    for source, p in self.patterns.items()
+                },
+            )
+        self.phrase_matcher = phrase_matcher
+
     def set_extensions(self) -> None:
         super().set_extensions()
         if not Span.has_extension("assigned"):
@@ -1,16 +1,19 @@
 import pickle
-from typing import List, Optional, Union
+from typing import Iterable, Iterator, List, Optional, Union
 
 import numpy as np
 import pandas as pd
 from spacy.language import Language
 from spacy.tokens import Doc, Span, Token
+from spacy.util import minibatch
 
+from edsnlp.matchers.utils.views import clear_cache
 from edsnlp.pipelines.core.matcher.matcher import GenericMatcher
 from edsnlp.utils.filter import get_spans
 
 from .functional import build_path
 from .model import EndLinesModel
+from .predictor import EndLinesPredictor
 
 
 class EndLinesMatcher(GenericMatcher):
@@ -164,6 +167,8 @@ class EndLinesMatcher(GenericMatcher):
                 "type(`end_lines_model`) should be one of {None, str, EndLinesModel}"
             )
 
+        self.predictor = EndLinesPredictor(self.model)
+
     @classmethod
     def _spacy_compute_a3a4(cls, token: Token) -> str:
         """Function to compute A3 and A4
@@ -225,7 +230,9 @@ class EndLinesMatcher(GenericMatcher):
         return length
 
     def _get_df(self, doc: Doc, new_lines: List[Span]) -> pd.DataFrame:
-        """Get a pandas DataFrame to call the classifier
+        """Get a pandas DataFrame to call the classifier. The component uses
+        the vectorized `EndLinesPredictor` instead, which computes the same
+        features without pandas.
 
         Parameters
         ----------
@@ -285,6 +292,36 @@ class EndLinesMatcher(GenericMatcher):
 
         return df
 
+    @classmethod
+    def _annotate(
+        cls,
+        doc: Doc,
+        new_lines: List[Span],
+        predictions: np.ndarray,
+    ) -> Doc:
+        """Tag the new lines of a document with their predictions
+
+        Parameters
+        ----------
+        doc : Doc
+        new_lines : List[Span]
+        predictions : np.ndarray
+
+        Returns
+        -------
+        Doc
+        """
+        if len(new_lines) > 0:
+            for span, prediction in zip(new_lines, predictions.tolist()):
+
+                for t in span:
+                    t.tag_ = "ENDLINE" if prediction else "EXCLUDED"
+                    t._.excluded = bool(prediction)
+
+            clear_cache(doc)
+
+        return doc
+
     def __call__(self, doc: Doc) -> Doc:
         """
         Predict for each new line if it's an end of line or a space.
@@ -302,14 +339,32 @@ class EndLinesMatcher(GenericMatcher):
         new_lines = get_spans(matches, "new_line")
 
         if len(new_lines) > 0:
-            df = self._get_df(doc=doc, new_lines=new_lines)
-            df = self.model.predict(df)
+            (predictions,) = self.predictor.predict([doc], [new_lines])
+            self._annotate(doc, new_lines, predictions)
 
-            for span, prediction in zip(new_lines, df.PREDICTED_END_LINE):
+        return doc
 
-                for t in span:
-                    t.tag_ = "ENDLINE" if prediction else "EXCLUDED"
-                    if prediction:
-                        t._.excluded = True
+    def pipe(self, docs: Iterable[Doc], batch_size: int = 128) -> Iterator[Doc]:
+        """
+        Predict for each new line of a stream of documents if it's an end of line
+        or a space, classifying the new lines of `batch_size` documents at once.
+        The length statistics (`B1` and `B2`) are still computed per document.
 
-        return doc
+        Parameters
+        ----------
+        docs : Iterable[Doc]
+            A stream of spaCy Doc objects
+        batch_size : int
+            Number of documents whose new lines are classified together
+
+        Yields
+        ------
+        Doc
+            spaCy Doc object, with each new line annotated
+        """
+        for batch in minibatch(docs, size=batch_size):
+            new_lines = [get_spans(self.process(doc), "new_line") for doc in batch]
+            predictions = self.predictor.predict(batch, new_lines)
+
+            for doc, spans, doc_predictions in zip(batch, new_lines, predictions):
+                yield self._annotate(doc, spans, doc_predictions)
@@ -1,5 +1,5 @@
 import pickle
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, Optional
 
 import numpy as np
 import pandas as pd
@@ -25,6 +25,13 @@ class EndLinesModel:
         spaCy nlp pipeline to use for matching.
     """
 
+    n_buckets: Optional[int] = None
+    """
+    Number of buckets the token orths (A1 and A2) are hashed into,
+    for models trained with
+    [`EndLinesTrainer`][edsnlp.pipelines.core.endlines.trainer.EndLinesTrainer]
+    """
+
     def __init__(self, nlp: Language):
         self.nlp = nlp
 
@@ -455,6 +462,9 @@ class EndLinesModel:
         -------
         np.ndarray
         """
+        if self.n_buckets:
+            A1 = A1.astype("uint64") % self.n_buckets
+            A2 = A2.astype("uint64") % self.n_buckets
         A1_enc = self._encode_series(self.encoder_A1_A2, A1)
         A2_enc = self._encode_series(self.encoder_A1_A2, A2)
         A3_enc = self._encode_series(self.encoder_A3_A4, A3)
@@ -0,0 +1,356 @@
+from typing import Dict, List, NamedTuple, Sequence
+
+import numpy as np
+from scipy.special import logsumexp
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.preprocessing import OneHotEncoder
+from spacy.attrs import IS_DIGIT, IS_PUNCT, IS_UPPER, LENGTH, ORTH, SHAPE
+from spacy.strings import StringStore, get_string_id
+from spacy.tokens import Doc, Span
+
+from .model import EndLinesModel
+
+A3A4_CATEGORIES = (
+    "UPPER",
+    "S_UPPER",
+    "LOWER",
+    "ENUMERATION",
+    "DIGIT",
+    "STRONG_PUNCT",
+    "SOFT_PUNCT",
+    "OTHER",
+)
+STRONG_PUNCT = np.array(
+    [get_string_id(p) for p in (".", ";", "..", "...")], dtype=np.uint64
+)
+
+# Kinds of token shapes, see `shape_kinds`
+SHAPE_OTHER, SHAPE_S_UPPER, SHAPE_LOWER = 0, 1, 2
+
+
+def shape_kinds(
+    strings: StringStore,
+    shapes: np.ndarray,
+    cache: Dict[int, int],
+) -> np.ndarray:
+    """
+    Whether each shape starts with "Xx" or "x", memoized by shape hash.
+
+    Parameters
+    ----------
+    strings : StringStore
+        The strings of the vocabulary
+    shapes : np.ndarray
+        Shape hashes
+    cache : Dict[int, int]
+        Kinds of the shapes already seen, updated in place
+
+    Returns
+    -------
+    np.ndarray
+        Kind of each shape (`SHAPE_OTHER`, `SHAPE_S_UPPER` or `SHAPE_LOWER`)
+    """
+    for shape in np.unique(shapes).tolist():
+        if shape not in cache:
+            shape_ = strings[shape]
+            cache[shape] = (
+                SHAPE_S_UPPER
+                if shape_.startswith("Xx")
+                else SHAPE_LOWER
+                if shape_.startswith("x")
+                else SHAPE_OTHER
+            )
+    return np.array([cache[shape] for shape in shapes.tolist()], dtype=np.int64)
+
+
+class EndLinesFeatures(NamedTuple):
+    """
+    Features of the new lines of one or more documents, as described in
+    [`EndLinesModel`][edsnlp.pipelines.core.endlines.model.EndLinesModel].
+    """
+
+    a1: np.ndarray
+    """Orth of the token before each new line"""
+    a2: np.ndarray
+    """Orth of the token after each new line"""
+    a3: np.ndarray
+    """Typographic form of the token before each new line (see `A3A4_CATEGORIES`)"""
+    a4: np.ndarray
+    """Typographic form of the token after each new line (see `A3A4_CATEGORIES`)"""
+    b1: np.ndarray
+    """Normalized length of the line ended by each new line"""
+    b2: np.ndarray
+    """Coefficient of variation of the lengths of the lines of the document"""
+    blank_line: np.ndarray
+    """Whether each new line is a blank line"""
+
+
+class _OneHotTable(NamedTuple):
+    """
+    Log-probabilities contributed by each category of a one-hot encoded feature
+    to the joint log-likelihood of each class of a naive Bayes classifier.
+    """
+
+    keys: np.ndarray
+    """Sorted categories of the feature"""
+    table: np.ndarray
+    """Contribution of each category, with shape (n_categories, n_classes)"""
+
+    def lookup(self, values: np.ndarray) -> np.ndarray:
+        # Unknown categories are encoded as zeros (`handle_unknown="ignore"`)
+        index = np.minimum(np.searchsorted(self.keys, values), len(self.keys) - 1)
+        found = self.keys[index] == values
+        return np.where(found[:, None], self.table[index], 0.0)
+
+
+def _one_hot_tables(
+    classifier: MultinomialNB,
+    encoders: Sequence[OneHotEncoder],
+) -> List[_OneHotTable]:
+    """
+    Splits the feature log-probabilities of a naive Bayes classifier trained
+    on the concatenation of one-hot encoded features, one table per feature.
+    """
+    tables = []
+    offset = 0
+    for encoder in encoders:
+        categories = encoder.categories_[0]
+        # Negative codes (-1 for missing values) wrap around like the looked up values
+        keys = np.array([int(c) % 2**64 for c in categories], dtype=np.uint64)
+        table = classifier.feature_log_prob_[:, offset : offset + len(keys)].T
+        order = np.argsort(keys)
+        tables.append(_OneHotTable(keys[order], np.ascontiguousarray(table[order])))
+        offset += len(keys)
+    return tables
+
+
+def _positive_proba(classifier: MultinomialNB, jll: np.ndarray) -> np.ndarray:
+    """
+    Probability of the second class, computed like `predict_proba`
+    from the joint log-likelihood.
+    """
+    jll = jll + classifier.class_log_prior_
+    return np.exp(jll[:, 1] - logsumexp(jll, axis=1))
+
+
+class EndLinesPredictor:
+    """
+    Inference engine of a fitted
+    [`EndLinesModel`][edsnlp.pipelines.core.endlines.model.EndLinesModel].
+
+    The one-hot encoders, the vocabularies and the naive Bayes classifiers
+    of the model are compiled into lookup tables once, so that the new lines
+    of a batch of documents are classified with a few NumPy operations,
+    without building any pandas DataFrame nor sparse matrix.
+
+    Parameters
+    ----------
+    model : EndLinesModel
+        The fitted model
+    """
+
+    def __init__(self, model: EndLinesModel):
+        self.model = model
+
+        self.m1_tables = _one_hot_tables(
+            model.m1,
+            [
+                model.encoder_A1_A2,
+                model.encoder_A1_A2,
+                model.encoder_A3_A4,
+                model.encoder_A3_A4,
+            ],
+        )
+        self.m2_tables = _one_hot_tables(
+            model.m2,
+            [model.encoder_B1, model.encoder_B2],
+        )
+
+        # Code of each typographic form in the vocabulary of the model
+        vocabulary = model.vocabulary["A3A4"]
+        self.a3a4_codes = np.array(
+            [vocabulary.get(c, vocabulary["OTHER"]) for c in A3A4_CATEGORIES],
+            dtype=np.uint64,
+        )
+
+        # Bins of B1 and B2, in the order of their codes
+        self.bins = {}
+        for col in ("B1", "B2"):
+            intervals = list(model.vocabulary[col].keys())
+            lefts = np.array([i.left for i in intervals], dtype=float)
+            rights = np.array([i.right for i in intervals], dtype=float)
+            order = np.argsort(rights)
+            self.bins[col] = (lefts[order], rights[order], order)
+
+        self._shape_kinds: Dict[int, int] = {}
+
+    def features(self, doc: Doc, new_lines: List[Span]) -> EndLinesFeatures:
+        """
+        Computes the features of the new lines of a document.
+
+        Parameters
+        ----------
+        doc : Doc
+            The document
+        new_lines : List[Span]
+            The new lines of the document, in order
+
+        Returns
+        -------
+        EndLinesFeatures
+        """
+        array = doc.to_array(
+            [ORTH, SHAPE, LENGTH, IS_UPPER, IS_DIGIT, IS_PUNCT]
+        ).reshape(-1, 6)
+        orth = array[:, 0]
+        is_upper, is_digit, is_punct = array[:, 3:].astype(bool).T
+
+        n = len(doc)
+        starts = np.array([span.start for span in new_lines], dtype=np.int64)
+        neighbours = np.concatenate(
+            [np.maximum(starts - 1, 0), np.minimum(starts + 1, n - 1)]
+        )
+
+        # Typographic form of the tokens surrounding the new lines
+        shape_kind = shape_kinds(
+            doc.vocab.strings, array[neighbours, 1], self._shape_kinds
+        )
+        punct = is_punct[neighbours]
+        digit = is_digit[neighbours]
+        strong = np.isin(orth[neighbours], STRONG_PUNCT)
+        punct_around = (
+            is_punct[np.maximum(neighbours - 1, 0)]
+            | is_punct[np.minimum(neighbours + 1, n - 1)]
+        )
+        form = np.select(
+            [
+                is_upper[neighbours],
+                shape_kind == SHAPE_S_UPPER,
+                shape_kind == SHAPE_LOWER,
+                digit & punct_around,
+                digit,
+                punct & strong,
+                punct,
+            ],
+            list(range(7)),
+            default=len(A3A4_CATEGORIES) - 1,
+        )
+
+        # Length of the text between each new line and the previous one
+        cumulated = np.concatenate([[0], np.cumsum(array[:, 2].astype(np.int64))])
+        previous = np.concatenate([[0], starts[:-1] + 1])
+        lengths = (cumulated[starts] - cumulated[previous]).astype(float)
+
+        mu = lengths.mean()
+        sigma = lengths.std(ddof=1) if len(lengths) > 1 else 1.0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            b1 = (lengths - mu) / sigma
+            b2 = np.full(len(lengths), sigma / mu)
+
+        text = doc.text
+        blank_line = np.array(
+            ["\n\n" in text[span.start_char : span.end_char] for span in new_lines],
+            dtype=bool,
+        )
+
+        return EndLinesFeatures(
+            a1=orth[neighbours[: len(starts)]],
+            a2=orth[neighbours[len(starts) :]],
+            a3=form[: len(starts)],
+            a4=form[len(starts) :],
+            b1=b1,
+            b2=b2,
+            blank_line=blank_line,
+        )
+
+    def _bin(self, col: str, values: np.ndarray) -> np.ndarray:
+        """
+        Code of the bin of each value, clipped to the first and last bins,
+        or -1 if the value falls in none of them (NaN).
+        """
+        lefts, rights, codes = self.bins[col]
+        index = np.searchsorted(rights, values, side="left")
+        clipped = np.minimum(index, len(rights) - 1)
+        inside = (index < len(rights)) & (values > lefts[clipped])
+        result = np.where(inside, codes[clipped], -1)
+        result[values >= rights.max()] = codes.max()
+        result[values <= lefts.min()] = codes.min()
+        return result
+
+    def predict_features(self, features: EndLinesFeatures) -> np.ndarray:
+        """
+        Predicts whether each new line is an actual end of line.
+
+        Parameters
+        ----------
+        features : EndLinesFeatures
+            Features of the new lines
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array, `True` for end lines, `False` for mere spaces
+        """
+        a1, a2, a3, a4 = self.m1_tables
+        orth_a1, orth_a2 = features.a1, features.a2
+        if self.model.n_buckets:
+            orth_a1 = orth_a1 % np.uint64(self.model.n_buckets)
+            orth_a2 = orth_a2 % np.uint64(self.model.n_buckets)
+        jll_m1 = (
+            a1.lookup(orth_a1)
+            + a2.lookup(orth_a2)
+            + a3.lookup(self.a3a4_codes[features.a3])
+            + a4.lookup(self.a3a4_codes[features.a4])
+        )
+
+        b1, b2 = self.m2_tables
+        # Missing values are coded as -1, like in `EndLinesModel._convert_B`
+        codes_b1 = self._bin("B1", features.b1).astype(np.uint64)
+        codes_b2 = self._bin("B2", features.b2).astype(np.uint64)
+        jll_m2 = b1.lookup(codes_b1) + b2.lookup(codes_b2)
+
+        p1 = _positive_proba(self.model.m1, jll_m1)
+        p2 = _positive_proba(self.model.m2, jll_m2)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            space = (p2 / (1 - p2)) * (p1 / (1 - p1)) > 1
+
+        return ~space | features.blank_line
+
+    def predict(
+        self,
+        docs: Sequence[Doc],
+        new_lines: Sequence[List[Span]],
+    ) -> List[np.ndarray]:
+        """
+        Predicts whether each new line of a batch of documents is an actual
+        end of line, scoring all the new lines at once.
+
+        Parameters
+        ----------
+        docs : Sequence[Doc]
+            The documents
+        new_lines : Sequence[List[Span]]
+            The new lines of each document
+
+        Returns
+        -------
+        List[np.ndarray]
+            The predictions of each document
+        """
+        features = [
+            self.features(doc, spans)
+            for doc, spans in zip(docs, new_lines)
+            if len(spans)
+        ]
+
+        if not features:
+            return [np.zeros(0, dtype=bool) for _ in docs]
+
+        predictions = self.predict_features(
+            EndLinesFeatures(*(np.concatenate(f) for f in zip(*features)))
+        )
+
+        sizes = [len(spans) for spans in new_lines]
+        return np.split(predictions, np.cumsum(sizes)[:-1])
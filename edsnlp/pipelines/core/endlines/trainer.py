@@ -0,0 +1,459 @@
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.preprocessing import OneHotEncoder
+from spacy.attrs import IDX, IS_DIGIT, IS_PUNCT, IS_UPPER, LENGTH, ORTH, SHAPE
+from spacy.tokens import Doc
+from spacy.util import minibatch
+
+from .model import EndLinesModel
+from .predictor import SHAPE_LOWER, SHAPE_S_UPPER, STRONG_PUNCT, shape_kinds
+
+# Typographic forms, in the order of the codes of the trained models
+A3A4_VOCABULARY = {
+    form: code
+    for code, form in enumerate(
+        [
+            "DIGIT",
+            "ENUMERATION",
+            "LOWER",
+            "SOFT_PUNCT",
+            "STRONG_PUNCT",
+            "S_UPPER",
+            "UPPER",
+            "OTHER",
+        ]
+    )
+}
+N_FORMS = len(A3A4_VOCABULARY)
+
+# Codes of the bins of B1 and B2, -1 standing for missing values
+N_BINS = 10
+N_CODES = N_BINS + 1
+
+
+class _NewLines(NamedTuple):
+    """
+    Features of the new lines of the training corpus, kept to train the
+    second classifier once the first one is trained.
+    """
+
+    a1: np.ndarray
+    a2: np.ndarray
+    a3: np.ndarray
+    a4: np.ndarray
+    l_norm: np.ndarray
+    cv: np.ndarray
+    blank_line: np.ndarray
+
+    @classmethod
+    def concat(cls, parts: List["_NewLines"]) -> "_NewLines":
+        return cls(*(np.concatenate(column) for column in zip(*parts)))
+
+
+def _one_hot(columns: List[Tuple[np.ndarray, int]]) -> csr_matrix:
+    """
+    One-hot encodes several columns of integer codes, each column being
+    given with its number of codes.
+    """
+    n = len(columns[0][0])
+    offset = 0
+    indices = []
+    for codes, size in columns:
+        indices.append(codes.astype(np.int64) + offset)
+        offset += size
+    indices = np.stack(indices, axis=1).ravel()
+    indptr = np.arange(0, len(indices) + 1, len(columns))
+    return csr_matrix(
+        (np.ones(len(indices)), indices, indptr),
+        shape=(n, offset),
+    )
+
+
+class _Counts:
+    """
+    Counts of a binary multinomial naive Bayes classifier over one-hot encoded
+    features. Unlike `MultinomialNB.partial_fit`, updating the counts only
+    costs the number of samples, and not the (large) number of features.
+    """
+
+    def __init__(self, n_features: int):
+        self.class_count = np.zeros(2)
+        self.feature_count = np.zeros((2, n_features))
+
+    def update(self, columns: List[Tuple[np.ndarray, int]], label: np.ndarray):
+        """
+        Adds samples, given as columns of codes (see `_one_hot`), with their label.
+        """
+        label = label.astype(np.int64)
+        self.class_count += np.bincount(label, minlength=2)
+        flat = self.feature_count.reshape(-1)
+        offset = label * self.feature_count.shape[1]
+        for codes, size in columns:
+            np.add.at(flat, offset + codes.astype(np.int64), 1)
+            offset = offset + size
+
+    def __iadd__(self, other: "_Counts") -> "_Counts":
+        self.class_count += other.class_count
+        self.feature_count += other.feature_count
+        return self
+
+    def to_classifier(self, columns: np.ndarray, alpha: float = 1) -> MultinomialNB:
+        """
+        Builds the classifier that `MultinomialNB(alpha).fit` would have trained
+        on the given feature columns only.
+        """
+        classifier = MultinomialNB(alpha=alpha)
+        classifier.classes_ = np.array([0, 1])
+        classifier.class_count_ = self.class_count.copy()
+        classifier.feature_count_ = self.feature_count[:, columns]
+        classifier.n_features_in_ = len(columns)
+
+        smoothed = classifier.feature_count_ + alpha
+        classifier.feature_log_prob_ = np.log(smoothed) - np.log(
+            smoothed.sum(axis=1, keepdims=True)
+        )
+        classifier.class_log_prior_ = np.log(classifier.class_count_) - np.log(
+            classifier.class_count_.sum()
+        )
+        return classifier
+
+
+def _fit_encoder(categories: np.ndarray) -> OneHotEncoder:
+    encoder = OneHotEncoder(handle_unknown="ignore")
+    encoder.fit(np.array(categories.tolist(), dtype="O").reshape(-1, 1))
+    return encoder
+
+
+class EndLinesTrainer:
+    """
+    Streaming trainer of an
+    [`EndLinesModel`][edsnlp.pipelines.core.endlines.model.EndLinesModel],
+    for corpora that do not fit in a pandas DataFrame.
+
+    The documents are processed by chunks: the features of their tokens are
+    computed with NumPy, and the counts of the first (naive Bayes) classifier
+    M1 are updated incrementally. The token orths (A1 and A2) are hashed into a fixed
+    number of buckets, so that the features do not depend on the vocabulary
+    of the corpus. Only the features of the new lines are kept in memory,
+    to train the second classifier (M2) on the predictions of M1 once all
+    the documents are processed.
+
+    Trainers fitted on different shards of a corpus (e.g. in different processes)
+    can be combined with
+    [`merge`][edsnlp.pipelines.core.endlines.trainer.EndLinesTrainer.merge].
+
+    The classifiers of the trained model are built from the accumulated counts,
+    restricted to the observed orths and forms: unlike the ones trained by
+    `MultinomialNB.fit`, they cannot be updated with `partial_fit`. To train on
+    more documents, keep the trainer, update it and call `finalize` again.
+
+    Parameters
+    ----------
+    n_buckets : int
+        Number of buckets the token orths are hashed into
+    batch_size : int
+        Number of documents whose features are computed at once
+    """
+
+    def __init__(self, n_buckets: int = 2**20, batch_size: int = 1000):
+        self.n_buckets = n_buckets
+        self.batch_size = batch_size
+
+        self.m1 = _Counts(2 * n_buckets + 2 * N_FORMS)
+        self.new_lines: List[_NewLines] = []
+        self.l_norm_range = (np.inf, -np.inf)
+        self.cv_range = (np.inf, -np.inf)
+
+        self._shape_kinds: Dict[int, int] = {}
+
+    def _doc_features(self, doc: Doc):
+        """
+        Features of the tokens of a document that are not new lines,
+        following `EndLinesModel._preprocess_data`.
+        """
+        array = doc.to_array(
+            [ORTH, SHAPE, LENGTH, IDX, IS_UPPER, IS_DIGIT, IS_PUNCT]
+        ).reshape(-1, 7)
+        starts = array[:, 3].astype(np.int64)
+        ends = starts + array[:, 2].astype(np.int64)
+
+        # Tokens whose text contains "\n" or "\n\n"
+        chars = np.frombuffer(doc.text.encode("utf-32-le"), dtype=np.uint32)
+        is_nl = chars == ord("\n")
+        n_nl = np.concatenate([[0], np.cumsum(is_nl)])
+        n_blank = np.concatenate([[0], np.cumsum(is_nl[:-1] & is_nl[1:])])
+        end_line = n_nl[ends] > n_nl[starts]
+        blank_line = n_blank[np.maximum(ends - 1, starts)] > n_blank[starts]
+
+        rows = np.flatnonzero(~end_line)
+        if len(rows) == 0:
+            return None
+
+        # New line after each row, the last row of the document being a line end
+        following = np.minimum(rows + 1, len(array) - 1)
+        row_end_line = end_line[following]
+        row_end_line[-1] = True
+        row_blank_line = blank_line[following]
+        row_blank_line[-1] = True
+
+        orth = array[rows, 0]
+        is_upper, is_digit, is_punct = array[rows, 4:].astype(bool).T
+        shape_kind = shape_kinds(doc.vocab.strings, array[rows, 1], self._shape_kinds)
+
+        # Neighbouring rows, the new lines being skipped
+        punct_next = np.append(is_punct[1:], False)
+        punct_previous = np.insert(is_punct[:-1], 0, False)
+
+        # The last matching form wins, as in `EndLinesModel._compute_a3`
+        forms = np.select(
+            [
+                is_digit & (punct_next | punct_previous),
+                is_punct & ~np.isin(orth, STRONG_PUNCT),
+                is_punct & np.isin(orth, STRONG_PUNCT),
+                is_digit,
+                shape_kind == SHAPE_LOWER,
+                shape_kind == SHAPE_S_UPPER,
+                is_upper,
+            ],
+            [
+                A3A4_VOCABULARY[form]
+                for form in [
+                    "ENUMERATION",
+                    "SOFT_PUNCT",
+                    "STRONG_PUNCT",
+                    "DIGIT",
+                    "LOWER",
+                    "S_UPPER",
+                    "UPPER",
+                ]
+            ],
+            default=A3A4_VOCABULARY["OTHER"],
+        )
+
+        # Length of each line, and statistics of the document
+        cumulated = np.cumsum(array[rows, 2].astype(np.int64))
+        line_ends = np.flatnonzero(row_end_line)
+        lengths = np.diff(np.concatenate([[0], cumulated[line_ends]])).astype(float)
+
+        mu = lengths.mean()
+        sigma = lengths.std(ddof=1) if len(lengths) > 1 else np.nan
+        if sigma == 0:
+            sigma = 1.0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cv = sigma / mu
+            l_norm = (lengths - mu) / sigma
+
+        return dict(
+            orth=orth,
+            forms=forms,
+            end_line=row_end_line,
+            blank_line=row_blank_line,
+            line_ends=line_ends,
+            l_norm=l_norm,
+            cv=cv,
+        )
+
+    def _update_ranges(self, l_norm: np.ndarray, cv: np.ndarray):
+        for name, values in (("l_norm_range", l_norm), ("cv_range", cv)):
+            values = values[~np.isnan(values)]
+            if len(values):
+                low, high = getattr(self, name)
+                setattr(self, name, (min(low, values.min()), max(high, values.max())))
+
+    def partial_fit(self, docs: Iterable[Doc]) -> "EndLinesTrainer":
+        """
+        Updates the counts of the first classifier with a stream of documents,
+        and keeps the features of their new lines.
+
+        Parameters
+        ----------
+        docs : Iterable[Doc]
+            A stream of documents
+
+        Returns
+        -------
+        EndLinesTrainer
+        """
+        n_buckets = np.uint64(self.n_buckets)
+
+        for batch in minibatch(docs, size=self.batch_size):
+            columns = {key: [] for key in ("a1", "a2", "a3", "a4", "space")}
+            new_lines = []
+            l_norms = []
+            cvs = []
+
+            for doc in batch:
+                features = self._doc_features(doc)
+                if features is None:
+                    continue
+
+                buckets = features["orth"] % n_buckets
+                forms = features["forms"]
+                end_line = features["end_line"]
+                line_ends = features["line_ends"]
+
+                # The last row has no following token, and is left out
+                columns["a1"].append(buckets[:-1])
+                columns["a2"].append(buckets[1:])
+                columns["a3"].append(forms[:-1])
+                columns["a4"].append(forms[1:])
+                columns["space"].append(~end_line[:-1])
+
+                n_lines = len(line_ends) - 1
+                new_lines.append(
+                    _NewLines(
+                        a1=buckets[line_ends[:-1]],
+                        a2=buckets[line_ends[:-1] + 1],
+                        a3=forms[line_ends[:-1]],
+                        a4=forms[line_ends[:-1] + 1],
+                        l_norm=features["l_norm"][:-1],
+                        cv=np.full(n_lines, features["cv"]),
+                        blank_line=features["blank_line"][line_ends[:-1]],
+                    )
+                )
+                l_norms.append(features["l_norm"])
+                cvs.append(np.array([features["cv"]]))
+
+            if not new_lines:
+                continue
+
+            columns = {key: np.concatenate(value) for key, value in columns.items()}
+            self.m1.update(
+                [
+                    (columns["a1"], self.n_buckets),
+                    (columns["a2"], self.n_buckets),
+                    (columns["a3"], N_FORMS),
+                    (columns["a4"], N_FORMS),
+                ],
+                columns["space"],
+            )
+
+            self.new_lines.append(_NewLines.concat(new_lines))
+            self._update_ranges(np.concatenate(l_norms), np.concatenate(cvs))
+
+        return self
+
+    def merge(self, other: "EndLinesTrainer") -> "EndLinesTrainer":
+        """
+        Adds the counts and the new lines of a trainer fitted on another
+        shard of the corpus to this one.
+
+        Parameters
+        ----------
+        other : EndLinesTrainer
+            The other trainer, with the same number of buckets
+
+        Returns
+        -------
+        EndLinesTrainer
+        """
+        if other.n_buckets != self.n_buckets:
+            raise ValueError("Cannot merge trainers with different numbers of buckets")
+
+        self.m1 += other.m1
+        self.new_lines.extend(other.new_lines)
+        for name in ("l_norm_range", "cv_range"):
+            low, high = getattr(self, name)
+            other_low, other_high = getattr(other, name)
+            setattr(self, name, (min(low, other_low), max(high, other_high)))
+
+        return self
+
+    @classmethod
+    def _bins(cls, value_range: Tuple[float, float]):
+        """
+        Bins of `pd.cut(values, bins=10)`, computed from the range of the values.
+        """
+        intervals, bins = pd.cut(np.array(value_range), bins=N_BINS, retbins=True)
+        return intervals.categories, bins
+
+    def finalize(self) -> EndLinesModel:
+        """
+        Trains the classifiers on the processed documents.
+
+        Returns
+        -------
+        EndLinesModel
+            The trained model
+        """
+        if not np.isfinite(self.cv_range[0]):
+            raise ValueError("The corpus must contain documents with several lines")
+
+        new_lines = _NewLines.concat(self.new_lines)
+        self.new_lines = [new_lines]
+
+        model = EndLinesModel(nlp=None)
+        model.n_buckets = self.n_buckets
+
+        # Only keep the orths and forms that occur in the corpus
+        n = self.n_buckets
+        counts = self.m1.feature_count.sum(axis=0)
+        buckets = np.flatnonzero((counts[:n] > 0) | (counts[n : 2 * n] > 0))
+        forms = np.flatnonzero(
+            (counts[2 * n : 2 * n + N_FORMS] > 0) | (counts[2 * n + N_FORMS :] > 0)
+        )
+        model.m1 = self.m1.to_classifier(
+            np.concatenate(
+                [buckets, n + buckets, 2 * n + forms, 2 * n + N_FORMS + forms]
+            ),
+        )
+        model.encoder_A1_A2 = _fit_encoder(buckets)
+        model.encoder_A3_A4 = _fit_encoder(forms)
+
+        # Predict M1 on the new lines, forcing blank lines to 0
+        X = _one_hot(
+            [
+                (np.searchsorted(buckets, new_lines.a1), len(buckets)),
+                (np.searchsorted(buckets, new_lines.a2), len(buckets)),
+                (np.searchsorted(forms, new_lines.a3), len(forms)),
+                (np.searchsorted(forms, new_lines.a4), len(forms)),
+            ]
+        )
+        label = model.m1.predict(X)
+        label[new_lines.blank_line] = 0
+
+        # Bin the length statistics
+        vocabulary = {"A3A4": dict(A3A4_VOCABULARY)}
+        codes = {}
+        for col, values, value_range in (
+            ("B1", new_lines.l_norm, self.l_norm_range),
+            ("B2", new_lines.cv, self.cv_range),
+        ):
+            categories, bins = self._bins(value_range)
+            vocabulary[col] = {interval: i for i, interval in enumerate(categories)}
+            codes[col] = pd.cut(values, bins).codes.astype(np.int64)
+
+        model.vocabulary = vocabulary
+
+        # Train M2, with one column per code (including -1 for missing values)
+        m2 = _Counts(2 * N_CODES)
+        m2.update([(codes["B1"] + 1, N_CODES), (codes["B2"] + 1, N_CODES)], label)
+        counts = m2.feature_count.sum(axis=0)
+        b1 = np.flatnonzero(counts[:N_CODES] > 0)
+        b2 = np.flatnonzero(counts[N_CODES:] > 0)
+        model.m2 = m2.to_classifier(np.concatenate([b1, N_CODES + b2]))
+        model.encoder_B1 = _fit_encoder(b1 - 1)
+        model.encoder_B2 = _fit_encoder(b2 - 1)
+
+        return model
+
+    def fit(self, docs: Iterable[Doc]) -> EndLinesModel:
+        """
+        Trains a model on a stream of documents.
+
+        Parameters
+        ----------
+        docs : Iterable[Doc]
+            A stream of documents
+
+        Returns
+        -------
+        EndLinesModel
+            The trained model
+        """
+        return self.partial_fit(docs).finalize()
@@ -1,7 +1,22 @@
 from spacy.tokens import Token
 
+
+def excluded_getter(t):
+    # The values that are set explicitly are stored where spaCy stores those of
+    # the extensions with a default, otherwise the token is excluded if its tag
+    # is EXCLUDED, as the matchers with `ignore_excluded` consider it
+    excluded = t.doc.user_data.get(("._.", "excluded", t.idx, None))
+    if excluded is None:
+        return t.tag_ == "EXCLUDED"
+    return excluded
+
+
+def excluded_setter(t, value):
+    t.doc.user_data[("._.", "excluded", t.idx, None)] = value
+
+
 if not Token.has_extension("excluded"):
-    Token.set_extension("excluded", default=False)
+    Token.set_extension("excluded", getter=excluded_getter, setter=excluded_setter)
 
 
 def excluded_or_space_getter(t):
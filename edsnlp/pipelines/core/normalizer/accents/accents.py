@@ -1,8 +1,12 @@
-from typing import List, Optional, Tuple
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
 
 from spacy import Language
 from spacy.tokens import Doc
 
+from edsnlp.matchers.utils.views import clear_cache
+
+from ..cache import NormCache, read_norms, write_norms
 from . import patterns
 
 
@@ -18,6 +22,11 @@ class AccentsConverter(object):
         The component name.
     accents : List[Tuple[str, str]]
         List of accentuated characters and their transcription.
+    cache_size : int
+        Maximum number of normalised strings kept in the cache
+    save_cache : bool
+        Whether to save the cache with the pipeline (see `nlp.to_disk`). It is
+        not saved by default, since it holds the words of the processed texts.
     """
 
     def __init__(
@@ -26,6 +35,8 @@ class AccentsConverter(object):
         name: Optional[str] = "eds.spaces",
         *,
         accents: List[Tuple[str, str]] = patterns.accents,
+        cache_size: int = 1_000_000,
+        save_cache: bool = False,
     ) -> None:
         self.nlp = nlp
         self.name = name
@@ -33,6 +44,8 @@ class AccentsConverter(object):
             "".join(accent_group for accent_group, _ in accents),
             "".join(rep * len(accent_group) for accent_group, rep in accents),
         )
+        self.cache = NormCache(max_size=cache_size)
+        self.save_cache = save_cache
 
     def __call__(self, doc: Doc) -> Doc:
         """
@@ -49,7 +62,34 @@ class AccentsConverter(object):
             The document, with accents removed in `Token.norm_`.
         """
 
+        strings = doc.vocab.strings
+        norms = self.cache.get(strings)
+        max_size = self.cache.max_size
+
         for token in doc:
-            token.norm_ = token.norm_.translate(self.translation_table)
+            norm = token.norm
+            translated = norms.get(norm)
+            if translated is None:
+                translated = strings[norm].translate(self.translation_table)
+                if len(norms) < max_size:
+                    norms[norm] = translated
+            token.norm_ = translated
+
+        clear_cache(doc)
 
         return doc
+
+    def to_disk(self, path: Union[str, Path], *, exclude=tuple()):
+        """
+        Saves the cache of the normalised strings if `save_cache` is set,
+        see `nlp.to_disk`.
+        """
+        if self.save_cache:
+            write_norms(path, self.cache.to_dict())
+
+    def from_disk(self, path: Union[str, Path], *, exclude=tuple()):
+        """
+        Loads the cache of the normalised strings, see `nlp.from_disk`.
+        """
+        self.cache.update(read_norms(path))
+        return self
@@ -0,0 +1,133 @@
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import srsly
+from spacy.strings import StringStore
+
+NORMS_FILE = "norms.msgpack"
+
+
+class NormCache:
+    """
+    Cache of a normalisation step, mapping each string the step was applied to
+    with its normalised form. The strings are looked up by their hash in a
+    `StringStore`, and the cache is kept as strings when it is serialised,
+    pickled, or used with another `StringStore`.
+
+    Once the cache is full, the new strings are normalised without being cached.
+
+    Parameters
+    ----------
+    norms : Optional[Dict[str, str]]
+        Initial content of the cache
+    max_size : int
+        Maximum number of cached strings
+    """
+
+    def __init__(
+        self,
+        norms: Optional[Dict[str, str]] = None,
+        max_size: int = 1_000_000,
+    ):
+        self.max_size = max_size
+        self.strings: Optional[StringStore] = None
+        self.hashes: Dict[int, str] = {}
+        self.pending: Dict[str, str] = {}
+        self.update(norms or {})
+
+    def __reduce__(self):
+        return self.__class__, (self.to_dict(), self.max_size)
+
+    def __len__(self):
+        return len(self.hashes) if self.strings is not None else len(self.pending)
+
+    def get(self, strings: StringStore) -> Dict[int, str]:
+        """
+        Returns the cache for a given `StringStore`, as a mapping from hashes
+        to normalised strings that can be looked up and filled in place, as long
+        as it holds less than `max_size` strings.
+
+        Parameters
+        ----------
+        strings : StringStore
+            The `StringStore` of the processed documents
+
+        Returns
+        -------
+        Dict[int, str]
+        """
+        if strings is not self.strings:
+            norms = self.to_dict()
+            self.strings = strings
+            self.hashes = {}
+            self.update(norms)
+        return self.hashes
+
+    def to_dict(self) -> Dict[str, str]:
+        """
+        Returns the content of the cache, as strings.
+
+        Returns
+        -------
+        Dict[str, str]
+        """
+        if self.strings is None:
+            return dict(self.pending)
+        strings = self.strings
+        return {strings[key]: norm for key, norm in self.hashes.items()}
+
+    def update(self, norms: Dict[str, str]) -> None:
+        """
+        Adds normalised strings to the cache, until it is full.
+
+        Parameters
+        ----------
+        norms : Dict[str, str]
+            Mapping from strings to their normalised form
+        """
+        if self.strings is None:
+            cache, add = self.pending, None
+        else:
+            cache, add = self.hashes, self.strings.add
+        for key, norm in norms.items():
+            if len(cache) >= self.max_size:
+                break
+            cache[key if add is None else add(key)] = norm
+
+
+def write_norms(path: Union[str, Path], norms: Dict[str, str]) -> None:
+    """
+    Writes the cache of a normalisation component in its directory,
+    see `nlp.to_disk`.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Directory of the component
+    norms : Dict[str, str]
+        Content of the cache
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    srsly.write_msgpack(path / NORMS_FILE, norms)
+
+
+def read_norms(path: Union[str, Path]) -> Dict[str, str]:
+    """
+    Reads the cache of a normalisation component from its directory,
+    see `nlp.from_disk`.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Directory of the component
+
+    Returns
+    -------
+    Dict[str, str]
+        Content of the cache, empty if it was not saved
+    """
+    path = Path(path) / NORMS_FILE
+    if not path.exists():
+        return {}
+    return srsly.read_msgpack(path)
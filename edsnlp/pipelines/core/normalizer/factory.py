@@ -35,6 +35,8 @@ def create_component(
     quotes: Union[bool, Dict[str, Any]] = True,
     spaces: Union[bool, Dict[str, Any]] = True,
     pollution: Union[bool, Dict[str, Any]] = True,
+    cache_size: int = 1_000_000,
+    save_cache: bool = False,
 ) -> Normalizer:
     """
     Normalisation pipeline. Modifies the `NORM` attribute,
@@ -62,6 +64,12 @@ def create_component(
         `Spaces` configuration object
     pollution : Union[bool, Dict[str, Any]]
         Optional `Pollution` configuration object.
+    cache_size : int
+        Maximum number of strings whose norm is cached.
+    save_cache : bool
+        Whether to save the cache of norms with the pipeline (see `nlp.to_disk`).
+        It is not saved by default, since it holds the words of the processed
+        texts.
     """
 
     if accents:
@@ -103,6 +111,8 @@ def create_component(
         quotes=quotes or None,
         pollution=pollution or None,
         spaces=spaces or None,
+        cache_size=cache_size,
+        save_cache=save_cache,
     )
 
     return normalizer
@@ -0,0 +1,20 @@
+from libcpp cimport bool
+from libcpp.unordered_map cimport unordered_map
+from spacy.strings cimport StringStore
+from spacy.tokens.doc cimport Doc
+from spacy.typedefs cimport attr_t
+
+
+cdef class FusedNormalizer:
+    cdef bool lowercase
+    cdef bool spaces
+    cdef object accents
+    cdef object quotes
+    cdef object strings
+    cdef dict pending
+    cdef size_t max_size
+    cdef attr_t space_hash
+    cdef unordered_map[attr_t, attr_t] norms
+
+    cdef attr_t compute_norm(self, attr_t key, StringStore strings)
+    cdef void process(self, Doc doc)
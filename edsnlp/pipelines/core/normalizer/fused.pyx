@@ -0,0 +1,174 @@
+from typing import Dict, Optional
+
+from cython.operator cimport dereference as deref
+from libcpp.unordered_map cimport unordered_map
+
+from spacy.attrs cimport IS_SPACE
+from spacy.lexeme cimport Lexeme
+from spacy.strings cimport StringStore
+from spacy.tokens.doc cimport Doc
+from spacy.tokens.token cimport TokenC
+from spacy.typedefs cimport attr_t
+
+from edsnlp.matchers.utils.views import clear_cache
+
+
+cdef class FusedNormalizer:
+    """
+    Applies the `lowercase`, `accents`, `quotes` and `spaces` steps of the
+    normalizer in a single pass over the tokens.
+
+    The final `NORM` only depends on the string the normalisation starts from
+    (the text of the token, or its default norm when `lowercase` is set): it
+    is computed once per distinct string, interned once in the `StringStore`,
+    and cached, so that the norms of the following occurrences are looked up
+    in a hash table. Once the cache is full, the norms of the new strings are
+    computed without being cached.
+
+    Parameters
+    ----------
+    lowercase : bool
+        Whether to start from the (lowercased) default `NORM` of the tokens,
+        or from their text.
+    accents : Optional[Dict[int, int]]
+        Translation table of the accents, if any
+    quotes : Optional[Dict[int, int]]
+        Translation table of the quotes, if any
+    spaces : bool
+        Whether to tag the space tokens as `SPACE`
+    norms : Optional[Dict[str, str]]
+        Initial content of the cache, as returned by `to_dict`
+    max_size : int
+        Maximum number of cached strings
+    """
+
+    def __init__(
+        self,
+        lowercase: bool,
+        accents: Optional[Dict[int, int]],
+        quotes: Optional[Dict[int, int]],
+        spaces: bool,
+        norms: Optional[Dict[str, str]] = None,
+        max_size: int = 1_000_000,
+    ):
+        self.lowercase = lowercase
+        self.accents = accents
+        self.quotes = quotes
+        self.spaces = spaces
+        self.max_size = max_size
+        self.strings = None
+        self.pending = {}
+        self.update(norms or {})
+
+    def __reduce__(self):
+        return (
+            FusedNormalizer,
+            (
+                self.lowercase,
+                self.accents,
+                self.quotes,
+                self.spaces,
+                self.to_dict(),
+                self.max_size,
+            ),
+        )
+
+    def __len__(self):
+        return self.norms.size() if self.strings is not None else len(self.pending)
+
+    def to_dict(self) -> Dict[str, str]:
+        """
+        Returns the content of the cache, as strings.
+
+        Returns
+        -------
+        Dict[str, str]
+            Mapping from the strings the normalisation started from
+            to their final `NORM`
+        """
+        if self.strings is None:
+            return dict(self.pending)
+        strings = self.strings
+        return {strings[item.first]: strings[item.second] for item in self.norms}
+
+    def update(self, norms: Dict[str, str]) -> None:
+        """
+        Adds normalised strings to the cache, until it is full.
+
+        Parameters
+        ----------
+        norms : Dict[str, str]
+            Mapping from the strings the normalisation starts from
+            to their final `NORM`
+        """
+        cdef StringStore strings = self.strings
+        for key, norm in norms.items():
+            if len(self) >= self.max_size:
+                break
+            if strings is None:
+                self.pending[key] = norm
+            else:
+                self.norms[strings.add(key)] = strings.add(norm)
+
+    def __call__(self, doc: Doc) -> Doc:
+        """
+        Normalises the tokens of a document.
+
+        Parameters
+        ----------
+        doc : Doc
+            spaCy `Doc` object
+
+        Returns
+        -------
+        Doc
+            The document, with its `NORM` (and space `TAG`) attributes set
+        """
+        self.process(doc)
+        clear_cache(doc)
+        return doc
+
+    cdef attr_t compute_norm(self, attr_t key, StringStore strings):
+        norm = strings[key]
+        if self.accents is not None:
+            norm = norm.translate(self.accents)
+        if self.quotes is not None:
+            norm = norm.translate(self.quotes)
+        cdef attr_t norm_hash = strings.add(norm)
+        if self.norms.size() < self.max_size:
+            self.norms[key] = norm_hash
+        return norm_hash
+
+    cdef void process(self, Doc doc):
+        cdef StringStore strings = doc.vocab.strings
+        cdef TokenC* token
+        cdef attr_t key
+        cdef unordered_map[attr_t, attr_t].iterator it
+        cdef int i
+
+        # The cached hashes are only valid in the StringStore they were added to
+        if strings is not self.strings:
+            norms = self.to_dict()
+            self.norms.clear()
+            self.strings = strings
+            self.space_hash = strings.add("SPACE")
+            self.update(norms)
+
+        for i in range(doc.length):
+            token = &doc.c[i]
+
+            if not self.lowercase:
+                key = token.lex.orth
+            elif token.norm != 0:
+                key = token.norm
+            else:
+                key = token.lex.norm
+
+            it = self.norms.find(key)
+            if it != self.norms.end():
+                token.norm = deref(it).second
+            else:
+                token.norm = self.compute_norm(key, strings)
+
+            if self.spaces and Lexeme.c_check_flag(token.lex, IS_SPACE):
+                token.tag = self.space_hash
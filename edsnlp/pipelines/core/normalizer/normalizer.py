@@ -1,9 +1,12 @@
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Union
 
 from spacy import Language
 from spacy.tokens import Doc
 
 from .accents.accents import AccentsConverter
+from .cache import read_norms, write_norms
+from .fused import FusedNormalizer
 from .pollution.pollution import PollutionTagger
 from .quotes.quotes import QuotesConverter
 from .remove_lowercase.factory import remove_lowercase
@@ -37,6 +40,15 @@ class Normalizer(object):
         Optional `Spaces` object.
     pollution : Optional[Pollution]
         Optional `Pollution` object.
+    cache_size : int
+        Maximum number of strings whose norm is cached.
+    save_cache : bool
+        Whether to save the cache of norms with the pipeline (see `nlp.to_disk`),
+        so that a reloaded pipeline starts with a warm cache. It is not saved by
+        default, since it holds the words of the processed texts.
+
+    The norms computed by the normalizer are cached by lexeme and shared across
+    documents.
     """
 
     def __init__(
@@ -49,6 +61,8 @@ class Normalizer(object):
         quotes: Optional[QuotesConverter] = None,
         spaces: Optional[SpacesTagger] = None,
         pollution: Optional[PollutionTagger] = None,
+        cache_size: int = 1_000_000,
+        save_cache: bool = False,
     ):
         self.nlp = nlp
         self.name = name
@@ -57,10 +71,36 @@ class Normalizer(object):
         self.quotes = quotes
         self.spaces = spaces
         self.pollution = pollution
+        self.save_cache = save_cache
+
+        self.fused = None
+        steps = [
+            (accents, AccentsConverter),
+            (quotes, QuotesConverter),
+            (spaces, SpacesTagger),
+        ]
+        if all(self._is_default(step, default) for step, default in steps):
+            self.fused = FusedNormalizer(
+                lowercase=bool(lowercase),
+                accents=accents and accents.translation_table,
+                quotes=quotes and quotes.translation_table,
+                spaces=spaces is not None,
+                max_size=cache_size,
+            )
+
+    @classmethod
+    def _is_default(cls, component: Optional[object], default: type) -> bool:
+        """
+        Whether a step is disabled or behaves like the default component,
+        in which case it can be applied by the fused normalizer.
+        """
+        return component is None or type(component).__call__ is default.__call__
 
     def __call__(self, doc: Doc) -> Doc:
         """
-        Apply the normalisation pipeline, one component at a time.
+        Apply the normalisation pipeline. The `lowercase`, `accents`, `quotes`
+        and `spaces` steps are applied in a single pass by a
+        `FusedNormalizer` (unless they are customised), the pollution last.
 
         Parameters
         ----------
@@ -72,14 +112,33 @@ class Normalizer(object):
         Doc
             Doc object with `NORM` attribute modified
         """
-        if not self.lowercase:
-            remove_lowercase(doc)
-        if self.accents is not None:
-            self.accents(doc)
-        if self.quotes is not None:
-            self.quotes(doc)
-        if self.spaces is not None:
-            self.spaces(doc)
+        if self.fused is not None:
+            self.fused(doc)
+        else:
+            if not self.lowercase:
+                remove_lowercase(doc)
+            if self.accents is not None:
+                self.accents(doc)
+            if self.quotes is not None:
+                self.quotes(doc)
+            if self.spaces is not None:
+                self.spaces(doc)
         if self.pollution is not None:
             self.pollution(doc)
         return doc
+
+    def to_disk(self, path: Union[str, Path], *, exclude=tuple()):
+        """
+        Saves the cache of norms of the normalizer if `save_cache` is set,
+        see `nlp.to_disk`.
+        """
+        if self.fused is not None and self.save_cache:
+            write_norms(path, self.fused.to_dict())
+
+    def from_disk(self, path: Union[str, Path], *, exclude=tuple()):
+        """
+        Loads the cache of norms of the normalizer, see `nlp.from_disk`.
+        """
+        if self.fused is not None:
+            self.fused.update(read_norms(path))
+        return self
@@ -1,10 +1,13 @@
 import re
 from typing import Dict, List, Optional, Union
 
+import numpy as np
+from spacy.attrs import TAG
 from spacy.language import Language
 from spacy.tokens import Doc, Span
 
 from edsnlp.matchers.regex import RegexMatcher
+from edsnlp.matchers.utils.views import clear_cache
 from edsnlp.pipelines.base import BaseComponent
 from edsnlp.utils.filter import filter_spans
 
@@ -16,6 +19,10 @@ class PollutionTagger(BaseComponent):
     """
     Tags pollution tokens.
 
+    The patterns are matched on the raw text of the document (reused from the
+    tokenizer), and the tags of the polluted tokens are set in bulk from
+    the character ranges of the matches.
+
     Populates a number of spaCy extensions :
 
     - `Token._.pollution` : indicates whether the token is a pollution
@@ -107,12 +114,18 @@ class PollutionTagger(BaseComponent):
         excluded_hash = doc.vocab.strings["EXCLUDED"]
         pollutions = self.process(doc)
 
-        for pollution in pollutions:
+        if pollutions:
+            bounds = np.zeros(len(doc) + 1, dtype=np.int64)
+            np.add.at(bounds, [p.start for p in pollutions], 1)
+            np.add.at(bounds, [p.end for p in pollutions], -1)
+            polluted = np.cumsum(bounds[:-1]) > 0
 
-            for token in pollution:
-                token._.excluded = True
-                token.tag = excluded_hash
+            tags = doc.to_array(TAG)
+            tags[polluted] = excluded_hash
+            doc.from_array([TAG], tags)
 
         doc.spans["pollutions"] = pollutions
 
+        clear_cache(doc)
+
         return doc
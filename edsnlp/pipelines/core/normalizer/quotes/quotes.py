@@ -1,8 +1,12 @@
-from typing import List, Optional, Tuple
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
 
 from spacy import Language
 from spacy.tokens import Doc
 
+from edsnlp.matchers.utils.views import clear_cache
+
+from ..cache import NormCache, read_norms, write_norms
 from .patterns import quotes_and_apostrophes
 
 
@@ -19,6 +23,11 @@ class QuotesConverter:
         The component name.
     quotes : List[Tuple[str, str]]
         List of quotation characters and their transcription.
+    cache_size : int
+        Maximum number of normalised strings kept in the cache
+    save_cache : bool
+        Whether to save the cache with the pipeline (see `nlp.to_disk`). It is
+        not saved by default, since it holds the words of the processed texts.
     """
 
     def __init__(
@@ -26,7 +35,9 @@ class QuotesConverter:
         nlp: Optional[Language] = None,
         name: Optional[str] = "eds.spaces",
         *,
-        quotes: List[Tuple[str, str]] = quotes_and_apostrophes
+        quotes: List[Tuple[str, str]] = quotes_and_apostrophes,
+        cache_size: int = 1_000_000,
+        save_cache: bool = False,
     ) -> None:
         self.nlp = nlp
         self.name = name
@@ -35,6 +46,8 @@ class QuotesConverter:
             "".join(quote_group for quote_group, _ in quotes),
             "".join(rep * len(quote_group) for quote_group, rep in quotes),
         )
+        self.cache = NormCache(max_size=cache_size)
+        self.save_cache = save_cache
 
     def __call__(self, doc: Doc) -> Doc:
         """
@@ -51,7 +64,34 @@ class QuotesConverter:
             Same document, with quotes normalised.
         """
 
+        strings = doc.vocab.strings
+        norms = self.cache.get(strings)
+        max_size = self.cache.max_size
+
         for token in doc:
-            token.norm_ = token.norm_.translate(self.translation_table)
+            norm = token.norm
+            translated = norms.get(norm)
+            if translated is None:
+                translated = strings[norm].translate(self.translation_table)
+                if len(norms) < max_size:
+                    norms[norm] = translated
+            token.norm_ = translated
+
+        clear_cache(doc)
 
         return doc
+
+    def to_disk(self, path: Union[str, Path], *, exclude=tuple()):
+        """
+        Saves the cache of the normalised strings if `save_cache` is set,
+        see `nlp.to_disk`.
+        """
+        if self.save_cache:
+            write_norms(path, self.cache.to_dict())
+
+    def from_disk(self, path: Union[str, Path], *, exclude=tuple()):
+        """
+        Loads the cache of the normalised strings, see `nlp.from_disk`.
+        """
+        self.cache.update(read_norms(path))
+        return self
@@ -1,6 +1,7 @@
 from spacy.language import Language
 from spacy.tokens import Doc
 
+from edsnlp.matchers.utils.views import clear_cache
 from edsnlp.utils.deprecation import deprecated_factory
 
 
@@ -22,6 +23,8 @@ def remove_lowercase(doc: Doc):
     for token in doc:
         token.norm_ = token.text
 
+    clear_cache(doc)
+
     return doc
 
 
@@ -3,6 +3,8 @@ from typing import Optional
 from spacy import Language
 from spacy.tokens import Doc
 
+from edsnlp.matchers.utils.views import clear_cache
+
 
 class SpacesTagger:
     """
@@ -47,4 +49,6 @@ class SpacesTagger:
             if len(token.text.strip()) == 0:
                 token.tag = space_hash
 
+        clear_cache(doc)
+
         return doc
@@ -1,14 +1,16 @@
 from itertools import chain
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from spacy.language import Language
 from spacy.tokens import Doc, Span
+from spacy.util import minibatch
 from typing_extensions import Literal
 
 from edsnlp.matchers.phrase import EDSPhraseMatcher
 from edsnlp.matchers.regex import RegexMatcher
 from edsnlp.matchers.simstring import SimstringMatcher
 from edsnlp.matchers.utils import Patterns
+from edsnlp.matchers.utils.terms import get_token_pipelines, select_token_pipelines
 from edsnlp.pipelines.base import BaseNERComponent, SpanSetterArg
 
 
@@ -88,7 +90,13 @@ class TerminologyMatcher(BaseNERComponent):
         The matcher to use for matching phrases ?
         One of (exact, simstring)
     term_matcher_config: Dict[str,Any]
-        Parameters of the matcher class
+        Parameters of the matcher class. With the `exact` matcher, `cache` can be set
+        to a directory (or to `True` for the EDS-NLP data directory) in which the
+        compiled terms are stored: the terms are then only tokenized and normalized
+        once, and the next pipelines with the same terms and token components load
+        them from this directory.
+        With the `simstring` matcher, `backend="numpy"` replaces the `pysimstring`
+        database with a memory-mapped n-gram index that retrieves the same terms.
     label: str
         Label name to use for the `Span` object and the extension
     span_setter : SpanSetterArg
@@ -98,11 +106,17 @@ class TerminologyMatcher(BaseNERComponent):
     the `kb_id_` of the extracted entities. Dictionary values are either a single
     expression or a list of expressions that match the concept (see [example](#usage)).
 
+    The terms are only added to the matcher when the first document is processed, or
+    when `edsnlp.language.warmup(nlp)` is called, so that creating the pipeline
+    stays fast.
+
     Authors and citation
     --------------------
     The `eds.terminology` pipeline was developed by AP-HP's Data Science team.
     """
 
+    lazy_attributes = ("phrase_matcher",)
+
     def __init__(
         self,
         nlp: Language,
@@ -132,8 +146,10 @@ class TerminologyMatcher(BaseNERComponent):
 
         self.attr = attr
 
+        # The phrase matcher is created now to validate its configuration, but the
+        # terms are only added to it when it is first used, see `build`
         if term_matcher == "exact":
-            self.phrase_matcher = EDSPhraseMatcher(
+            self._phrase_matcher = EDSPhraseMatcher(
                 self.nlp.vocab,
                 attr=attr,
                 ignore_excluded=ignore_excluded,
@@ -141,7 +157,7 @@ class TerminologyMatcher(BaseNERComponent):
                 **(term_matcher_config or {}),
             )
         elif term_matcher == "simstring":
-            self.phrase_matcher = SimstringMatcher(
+            self._phrase_matcher = SimstringMatcher(
                 vocab=self.nlp.vocab,
                 attr=attr,
                 ignore_excluded=ignore_excluded,
@@ -160,17 +176,31 @@ class TerminologyMatcher(BaseNERComponent):
             ignore_space_tokens=ignore_space_tokens,
         )
 
-        self.phrase_matcher.build_patterns(nlp=nlp, terms=terms, progress=True)
+        self._terms = terms
+        self._token_pipelines = get_token_pipelines(nlp)
         self.regex_matcher.build_patterns(regex=regex)
 
         self.set_extensions()
 
+    def build(self) -> None:
+        """
+        Adds the terms to the phrase matcher, applying the token components that
+        precede this one in the pipeline. This is done on the first call to the
+        component, or by `warmup`.
+        """
+        with select_token_pipelines(self.nlp, self._token_pipelines):
+            self._phrase_matcher.build_patterns(
+                nlp=self.nlp, terms=self._terms, progress=True
+            )
+        self.phrase_matcher = self._phrase_matcher
+        del self._phrase_matcher, self._terms
+
     def set_extensions(self) -> None:
         super().set_extensions()
         if not Span.has_extension(self.label):
             Span.set_extension(self.label, default=None)
 
-    def process(self, doc: Doc) -> List[Span]:
+    def process(self, doc: Doc, matches: Optional[List[Span]] = None) -> List[Span]:
         """
         Find matching spans in doc.
 
@@ -180,6 +210,8 @@ class TerminologyMatcher(BaseNERComponent):
         ----------
         doc:
             spaCy Doc object.
+        matches:
+            Matches of the phrase matcher, if they were already computed
 
         Returns
         -------
@@ -187,7 +219,8 @@ class TerminologyMatcher(BaseNERComponent):
             List of Spans returned by the matchers.
         """
 
-        matches = self.phrase_matcher(doc, as_spans=True)
+        if matches is None:
+            matches = self.phrase_matcher(doc, as_spans=True)
         regex_matches = self.regex_matcher(doc, as_spans=True)
 
         for match in chain(matches, regex_matches):
@@ -220,3 +253,31 @@ class TerminologyMatcher(BaseNERComponent):
         self.set_spans(doc, matches)
 
         return doc
+
+    def pipe(self, docs: Iterable[Doc], batch_size: int = 128) -> Iterator[Doc]:
+        """
+        Adds spans to a stream of documents. With the `simstring` matcher, the
+        candidate spans of `batch_size` documents are looked up at once.
+
+        Parameters
+        ----------
+        docs : Iterable[Doc]
+            A stream of spaCy Doc objects
+        batch_size : int
+            Number of documents matched together
+
+        Yields
+        ------
+        Doc
+            spaCy Doc object, annotated for extracted terms.
+        """
+        if not hasattr(self.phrase_matcher, "match_batch"):
+            for doc in docs:
+                yield self(doc)
+            return
+
+        for batch in minibatch(docs, size=batch_size):
+            batch_matches = self.phrase_matcher.match_batch(batch, as_spans=True)
+            for doc, matches in zip(batch, batch_matches):
+                self.set_spans(doc, self.process(doc, matches))
+                yield doc
@@ -92,7 +92,8 @@ def create_component(
         The matcher to use for matching phrases ?
         One of (exact, simstring)
     term_matcher_config: Dict[str,Any]
-        Parameters of the matcher term matcher
+        Parameters of the matcher term matcher, for instance `dict(cache=True)` to
+        store the compiled terms of the `exact` matcher (see `eds.terminology`)
     label : str
         Label name to use for the `Span` object and the extension
     span_setter : SpanSetterArg
@@ -110,7 +110,8 @@ def create_component(
     term_matcher : TerminologyTermMatcher
         The term matcher to use, either "exact" or "simstring"
     term_matcher_config : Dict[str, Any]
-        The configuration for the term matcher
+        The configuration for the term matcher, for instance `dict(cache=True)` to
+        store the compiled terms of the `exact` matcher (see `eds.terminology`)
     pattern_config : Dict[str, Any]
         The pattern retriever configuration
     label : str
@@ -1 +1,2 @@
+from .simple import stream_pipe
 from .wrapper import pipe
@@ -0,0 +1,395 @@
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from spacy import Language
+from spacy.tokens import Doc, Span
+
+from edsnlp.utils.extensions import rgetattr
+
+from .helpers import slugify
+from .simple import ExtensionSchema, _doc_generator
+
+BASE_TYPES = dict(
+    lexical_variant=pa.string(),
+    label=pa.string(),
+    span_type=pa.string(),
+    start=pa.int64(),
+    end=pa.int64(),
+)
+
+
+class ColumnBuffer:
+    """
+    Accumulates the results of the pipeline column by column, without creating
+    an intermediate Python object per entity, and converts them into an Arrow
+    `RecordBatch`.
+
+    Parameters
+    ----------
+    extensions : Optional[List[str]]
+        Spans extensions to add to the extracted results. If `None`, the buffer
+        starts without any column, to hold the output of a custom results
+        extractor (see `add_records`).
+    """
+
+    def __init__(self, extensions: Optional[List[str]] = []):
+        self.extensions = extensions or []
+        self.columns: Dict[str, Union[list, array]] = {}
+        if extensions is not None:
+            self.columns.update(
+                note_id=[],
+                lexical_variant=[],
+                label=[],
+                span_type=[],
+                start=array("q"),
+                end=array("q"),
+                **{slugify(extension): [] for extension in extensions},
+            )
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def add_spans(self, spans: Iterable[Span], span_type: str = "ents") -> None:
+        """
+        Adds the fields of each span to the columns.
+
+        Parameters
+        ----------
+        spans : Iterable[Span]
+            The spans to add
+        span_type : str
+            Name of the span group the spans belong to
+        """
+        columns = self.columns
+        note_id = columns["note_id"]
+        lexical_variant = columns["lexical_variant"]
+        label = columns["label"]
+        span_type_column = columns["span_type"]
+        start = columns["start"]
+        end = columns["end"]
+        extensions = [
+            (extension, columns[slugify(extension)]) for extension in self.extensions
+        ]
+
+        for ent in spans:
+            note_id.append(ent.doc._.note_id)
+            lexical_variant.append(ent.text)
+            label.append(ent.label_)
+            span_type_column.append(span_type)
+            start.append(ent.start_char)
+            end.append(ent.end_char)
+            for extension, column in extensions:
+                column.append(rgetattr(ent._, extension))
+            self.length += 1
+
+    def add_doc(self, doc: Doc, additional_spans: List[str] = []) -> None:
+        """
+        Adds the entities and the spans of the additional span groups of a `Doc`.
+
+        Parameters
+        ----------
+        doc : Doc
+            The processed document
+        additional_spans : List[str]
+            Names of the additional span groups to extract
+        """
+        self.add_spans(doc.ents)
+        for span_type in additional_spans:
+            self.add_spans(doc.spans[span_type], span_type=span_type)
+
+    def add_records(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Adds the output of a custom results extractor, creating the columns
+        as new keys appear.
+
+        Parameters
+        ----------
+        records : List[Dict[str, Any]]
+            The records to add
+        """
+        columns = self.columns
+        for record in records:
+            for key, value in record.items():
+                if key not in columns:
+                    columns[key] = [None] * self.length
+                columns[key].append(value)
+            self.length += 1
+            for column in columns.values():
+                if len(column) < self.length:
+                    column.append(None)
+
+    def to_record_batch(
+        self,
+        dtypes: Dict[str, pa.DataType] = {},
+    ) -> pa.RecordBatch:
+        """
+        Converts the columns into an Arrow `RecordBatch`.
+
+        Parameters
+        ----------
+        dtypes : Dict[str, pa.DataType]
+            Type of the columns. Missing types are inferred from the values.
+
+        Returns
+        -------
+        pa.RecordBatch
+        """
+        arrays = []
+        for name, values in self.columns.items():
+            if isinstance(values, array):
+                # The typed buffers are handed to Arrow without a copy
+                values = np.frombuffer(values, dtype=np.int64)
+            arrays.append(pa.array(values, type=dtypes.get(name)))
+        return pa.RecordBatch.from_arrays(arrays, names=list(self.columns))
+
+
+def pipe_batches(
+    note: pd.DataFrame,
+    nlp: Language,
+    context: List[str] = [],
+    results_extractor: Optional[Callable[[Doc], List[Dict[str, Any]]]] = None,
+    additional_spans: Union[List[str], str] = [],
+    extensions: ExtensionSchema = [],
+    dtypes: Optional[Dict[str, pa.DataType]] = None,
+    batch_size: int = 1000,
+    progress_bar: bool = True,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Applies a spaCy pipe to a pandas DataFrame note, and yields the results
+    as Arrow record batches, one batch every `batch_size` notes.
+    Only the results of the current batch are held in memory.
+
+    Parameters
+    ----------
+    note : DataFrame
+        A pandas DataFrame with a `note_id` and `note_text` column
+    nlp : Language
+        A spaCy pipe
+    context : List[str]
+        A list of column to add to the generated SpaCy document as an extension.
+        For instance, if `context=["note_datetime"], the corresponding value found
+        in the `note_datetime` column will be stored in `doc._.note_datetime`,
+        which can be useful e.g. for the `dates` pipeline.
+    results_extractor : Optional[Callable[[Doc], List[Dict[str, Any]]]]
+        Arbitrary function that takes extract serialisable results from the computed
+        spaCy `Doc` object. The output of the function must be a list of dictionaries
+        containing the extracted spans or entities.
+    additional_spans : Union[List[str], str], by default [] (empty list)
+        A name (or list of names) of SpanGroup on which to apply the pipe too:
+        SpanGroup are available as `doc.spans[spangroup_name]` and can be generated
+        by some pipes. For instance, the `date` pipe populates doc.spans['dates']
+    extensions : ExtensionSchema, by default []
+        Spans extensions to add to the extracted results:
+        For instance, if `extensions=["score_name"]`, the extracted result
+        will include, for each entity, `ent._.score_name`.
+        Extensions can be given as a dictionary, mapping each extension
+        to its Arrow type, e.g. `{"negation": pa.bool_()}`.
+    dtypes : Optional[Dict[str, pa.DataType]]
+        Arrow type of the output columns, e.g. `{"note_id": pa.int64()}`.
+        Missing types are inferred from the values of each batch: provide them
+        to make sure every batch shares the same schema.
+    batch_size : int, by default 1000
+        Number of notes per record batch, also used as batch size by spaCy's pipe
+    progress_bar: bool, by default True
+        Whether to display a progress bar or not
+
+    Yields
+    ------
+    pa.RecordBatch
+        The results of a batch of notes, with one line per extraction
+    """
+
+    if isinstance(extensions, str):
+        extensions = [extensions]
+
+    if isinstance(additional_spans, str):
+        additional_spans = [additional_spans]
+
+    types = {} if results_extractor else dict(BASE_TYPES)
+    if isinstance(extensions, dict):
+        types.update(
+            {
+                slugify(extension): dtype
+                for extension, dtype in extensions.items()
+                if isinstance(dtype, pa.DataType)
+            }
+        )
+        extensions = list(extensions.keys())
+    types.update(dtypes or {})
+
+    def new_buffer():
+        return ColumnBuffer(None if results_extractor else extensions)
+
+    buffer = new_buffer()
+    n_batches = 0
+
+    docs = _doc_generator(note, nlp, context, batch_size, progress_bar)
+    for i, doc in enumerate(docs, start=1):
+        if results_extractor:
+            buffer.add_records(results_extractor(doc))
+        else:
+            buffer.add_doc(doc, additional_spans=additional_spans)
+
+        if i % batch_size == 0 and len(buffer):
+            yield buffer.to_record_batch(types)
+            buffer = new_buffer()
+            n_batches += 1
+
+    # Always yield at least one batch, to convey the schema
+    if len(buffer) or not n_batches:
+        yield buffer.to_record_batch(types)
+
+
+def pipe(
+    note: pd.DataFrame,
+    nlp: Language,
+    context: List[str] = [],
+    results_extractor: Optional[Callable[[Doc], List[Dict[str, Any]]]] = None,
+    additional_spans: Union[List[str], str] = [],
+    extensions: ExtensionSchema = [],
+    dtypes: Optional[Dict[str, pa.DataType]] = None,
+    batch_size: int = 1000,
+    progress_bar: bool = True,
+    path: Optional[Union[str, Path]] = None,
+) -> Optional[pa.Table]:
+    """
+    Function to apply a spaCy pipe to a pandas DataFrame note, and collect the
+    results in a columnar Arrow table, or stream them to a Parquet file.
+
+    Parameters
+    ----------
+    note : DataFrame
+        A pandas DataFrame with a `note_id` and `note_text` column
+    nlp : Language
+        A spaCy pipe
+    context : List[str]
+        A list of column to add to the generated SpaCy document as an extension.
+    results_extractor : Optional[Callable[[Doc], List[Dict[str, Any]]]]
+        Arbitrary function that takes extract serialisable results from the computed
+        spaCy `Doc` object.
+    additional_spans : Union[List[str], str], by default [] (empty list)
+        A name (or list of names) of SpanGroup on which to apply the pipe too.
+    extensions : ExtensionSchema, by default []
+        Spans extensions to add to the extracted results, possibly
+        along with their Arrow type.
+    dtypes : Optional[Dict[str, pa.DataType]]
+        Arrow type of the output columns.
+    batch_size : int, by default 1000
+        Number of notes per record batch
+    progress_bar: bool, by default True
+        Whether to display a progress bar or not
+    path : Optional[Union[str, Path]]
+        If given, the record batches are written to this Parquet file as soon as
+        they are computed, and nothing is returned. The batches are held in
+        memory while a column has no value in any of them (for instance an
+        extension that is `None` for every entity), until its type is known:
+        give it with `dtypes` or a dict of `extensions` to avoid this.
+
+    Returns
+    -------
+    Optional[pa.Table]
+        An Arrow table with one line per extraction, unless `path` is given
+    """
+    batches = pipe_batches(
+        note=note,
+        nlp=nlp,
+        context=context,
+        results_extractor=results_extractor,
+        additional_spans=additional_spans,
+        extensions=extensions,
+        dtypes=dtypes,
+        batch_size=batch_size,
+        progress_bar=progress_bar,
+    )
+
+    if path is None:
+        batches = list(batches)
+        schema = unify_schemas(batches)
+        return pa.concat_tables([conform(batch, schema) for batch in batches])
+
+    # The writer needs the schema of the whole file: the batches are held until
+    # every column has a type (a column that is empty in the first batches has
+    # the null type), then the schema is fixed and the batches are streamed
+    pending = []
+    writer = None
+    try:
+        for batch in batches:
+            if writer is not None:
+                writer.write_table(conform(batch, writer.schema))
+                continue
+            pending.append(batch)
+            schema = unify_schemas(pending)
+            if any(pa.types.is_null(field.type) for field in schema):
+                continue
+            writer = pq.ParquetWriter(str(path), schema=schema)
+            for pending_batch in pending:
+                writer.write_table(conform(pending_batch, schema))
+            pending = []
+
+        if pending:
+            writer = pq.ParquetWriter(str(path), schema=unify_schemas(pending))
+            for pending_batch in pending:
+                writer.write_table(conform(pending_batch, writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def unify_schemas(batches: List[pa.RecordBatch]) -> pa.Schema:
+    """
+    Merges the schemas of record batches, promoting the types of their columns
+    if needed: for instance, a column with only null values in a batch takes
+    the type of the same column in the other batches.
+
+    Parameters
+    ----------
+    batches : List[pa.RecordBatch]
+        The record batches
+
+    Returns
+    -------
+    pa.Schema
+    """
+    schemas = [batch.schema for batch in batches]
+    try:
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except TypeError:
+        # Before pyarrow 14, there are no promotion options, and the null type
+        # is always merged with the other types
+        return pa.unify_schemas(schemas)
+
+
+def conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.Table:
+    """
+    Casts a record batch to a schema, adding the columns it lacks as nulls.
+
+    Parameters
+    ----------
+    batch : pa.RecordBatch
+        The record batch
+    schema : pa.Schema
+        The target schema, for instance given by `unify_schemas`
+
+    Returns
+    -------
+    pa.Table
+    """
+    unknown = set(batch.schema.names) - set(schema.names)
+    if unknown:
+        raise ValueError(
+            f"Columns {sorted(unknown)} are absent from the first batches of "
+            "results: give their type with the `dtypes` argument."
+        )
+    columns = [
+        batch.column(field.name).cast(field.type)
+        if field.name in batch.schema.names
+        else pa.nulls(batch.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
@@ -1,8 +1,15 @@
+import math
+import time
 from functools import partial
-from typing import Any, Callable, Dict, List, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
+import pandas as pd
 from decorator import decorator
 from loguru import logger
+from pandas.api.types import is_scalar
+from pyspark import TaskContext
+from pyspark.accumulators import Accumulator, AccumulatorParam
+from pyspark.broadcast import Broadcast
 from pyspark.sql import DataFrame, SparkSession
 from pyspark.sql import functions as F
 from pyspark.sql import types as T
@@ -33,6 +40,140 @@ def pyspark_type_finder(obj):
         raise TypeError("Cannot infer type for this object.")
 
 
+# Broadcast variable last used in the current Python worker, and its pipeline
+_executor_nlp: Optional[Tuple[Broadcast, Language]] = None
+
+
+def _get_executor_nlp(nlp_bc: Broadcast) -> Language:
+    """
+    Returns the pipeline of a broadcast variable, re-declaring the extensions
+    of its components the first time it is used in the current Python worker.
+
+    Only the pipeline of the last broadcast variable is kept, so that the
+    pipelines of the previous calls to `pipe` can be released by Spark.
+    """
+    global _executor_nlp
+
+    if _executor_nlp is None or _executor_nlp[0] is not nlp_bc:
+        nlp = nlp_bc.value
+        for _, pipe in nlp.pipeline:
+            if isinstance(pipe, BaseComponent):
+                pipe.set_extensions()
+        _executor_nlp = (nlp_bc, nlp)
+
+    return _executor_nlp[1]
+
+
+class PartitionTimingsParam(AccumulatorParam):
+    """
+    Accumulates, for each partition id, the number of processed notes,
+    their total number of characters and the processing time (in seconds).
+    """
+
+    def zero(self, value):
+        return {}
+
+    def addInPlace(self, value1, value2):
+        for partition_id, (n_notes, n_chars, duration) in value2.items():
+            total = value1.get(partition_id, (0, 0, 0.0))
+            value1[partition_id] = (
+                total[0] + n_notes,
+                total[1] + n_chars,
+                total[2] + duration,
+            )
+        return value1
+
+
+def partition_timings() -> Accumulator:
+    """
+    Creates a Spark accumulator to pass as the `timings` argument of `pipe`,
+    in `"partitions"` mode.
+    Once the results have been computed (by an action such as `count` or `write`),
+    its `value` maps each partition id to a `(n_notes, n_chars, seconds)` tuple.
+
+    Partitions that Spark computes several times (retried tasks, results
+    used by several actions without caching) are counted several times.
+
+    Returns
+    -------
+    Accumulator
+    """
+    spark = SparkSession.builder.getOrCreate()
+    return spark.sparkContext.accumulator({}, PartitionTimingsParam())
+
+
+def _record_timing(
+    timings: Optional[Accumulator],
+    n_notes: int,
+    n_chars: int,
+    duration: float,
+) -> None:
+    if timings is not None:
+        partition_id = TaskContext.get().partitionId()
+        timings.add({partition_id: (n_notes, n_chars, duration)})
+
+
+def _estimate_size(note: DataFrame) -> Optional[int]:
+    """
+    Estimated size of a DataFrame in bytes, read from the statistics of its
+    optimized query plan (table statistics when available), without running
+    any Spark job.
+    """
+    try:
+        stats = note._jdf.queryExecution().optimizedPlan().stats()
+        return int(stats.sizeInBytes().toString())
+    except Exception:  # pragma: no cover
+        return None
+
+
+def _plan_partitions(
+    note: DataFrame,
+    columns: List[str],
+    partitioning: Optional[Union[int, str]],
+    partition_size: int,
+    partition_bytes: int,
+) -> DataFrame:
+    """
+    Repartitions the notes according to the `partitioning` strategy of `pipe`.
+    Only the `columns` used by the pipeline are taken into account
+    to estimate the size of the notes.
+    """
+    if partitioning is None:
+        return note
+
+    if isinstance(partitioning, int):
+        n_partitions = partitioning
+
+    elif partitioning == "size":
+        size = _estimate_size(note.select(*columns))
+        spark = SparkSession.builder.getOrCreate()
+        default_size = int(
+            spark.conf.get("spark.sql.defaultSizeInBytes", str(2**63 - 1))
+        )
+        # Spark reports a huge default size when it cannot estimate it
+        if size is None or size >= default_size:
+            logger.warning(
+                "Could not estimate the size of the notes, "
+                "keeping the existing partitioning"
+            )
+            return note
+        n_partitions = math.ceil(size / partition_bytes)
+
+    elif partitioning == "count":
+        n_partitions = note.count() // partition_size
+
+    else:
+        raise ValueError(
+            f"Unknown partitioning {repr(partitioning)}, expected None, "
+            "a number of partitions, 'size' or 'count'"
+        )
+
+    n_partitions = max(n_partitions, 1)
+    logger.info(f"Repartitioning the notes in {n_partitions} partitions")
+
+    return note.repartition(n_partitions)
+
+
 @decorator
 def module_checker(
     func: Callable,
@@ -61,6 +202,12 @@ def pipe(
     context: List[str] = [],
     additional_spans: Union[List[str], str] = "discarded",
     extensions: Dict[str, T.DataType] = {},
+    mode: str = "udf",
+    batch_size: int = 100,
+    partitioning: Optional[Union[int, str]] = None,
+    partition_size: int = 2000,
+    partition_bytes: int = 32 * 1024 * 1024,
+    timings: Optional[Accumulator] = None,
 ) -> DataFrame:
     """
     Function to apply a spaCy pipe to a pyspark or koalas DataFrame note
@@ -85,6 +232,35 @@ def pipe(
         Spans extensions to add to the extracted results:
         For instance, if `extensions=["score_name"]`, the extracted result
         will include, for each entity, `ent._.score_name`.
+    mode : str, by default "udf"
+        How the pipeline is applied:
+
+        - `"udf"`: note by note, with a user-defined function
+        - `"partitions"`: partition by partition, with `mapInPandas`. The notes
+          are transferred to the Python workers with Arrow, and processed
+          with `nlp.pipe`.
+    batch_size : int, by default 100
+        Batch size used by spaCy's pipe, in `"partitions"` mode
+    partitioning : Optional[Union[int, str]], by default None
+        How the notes are partitioned before being processed:
+
+        - `None`: the existing partitioning is kept
+        - an integer: the notes are repartitioned into this number of partitions
+        - `"size"`: the notes are repartitioned into partitions of about
+          `partition_bytes` bytes, estimated from the statistics of the table
+          (this does not run any Spark job)
+        - `"count"`: the notes are counted (which runs a Spark job), and
+          repartitioned into partitions of `partition_size` notes
+    partition_size : int, by default 2000
+        Number of notes per partition, with `partitioning="count"`
+    partition_bytes : int, by default 32 MB
+        Size of each partition, with `partitioning="size"`
+    timings : Optional[Accumulator], by default None
+        An accumulator created by
+        [`partition_timings`][edsnlp.processing.distributed.partition_timings],
+        that collects the processing time of each partition. Only supported
+        in `"partitions"` mode, where it is updated once per batch of notes:
+        the `"udf"` mode would update it once per note.
 
     Returns
     -------
@@ -95,6 +271,14 @@ def pipe(
     if context:
         check_spacy_version_for_context()
 
+    if mode not in ("udf", "partitions"):
+        raise ValueError(
+            f"Unknown mode {repr(mode)}, expected one of 'udf' or 'partitions'"
+        )
+
+    if timings is not None and mode != "partitions":
+        raise ValueError("The `timings` accumulator requires mode='partitions'")
+
     spark = SparkSession.builder.enableHiveSupport().getOrCreate()
     sc = spark.sparkContext
 
@@ -103,6 +287,28 @@ def pipe(
 
     nlp_bc = sc.broadcast(nlp)
 
+    if isinstance(additional_spans, str):
+        additional_spans = [additional_spans]
+
+    note = _plan_partitions(
+        note,
+        columns=["note_id", "note_text", *context],
+        partitioning=partitioning,
+        partition_size=partition_size,
+        partition_bytes=partition_bytes,
+    )
+
+    if mode == "partitions":
+        return _partitions_pipe(
+            note=note,
+            nlp_bc=nlp_bc,
+            context=context,
+            additional_spans=additional_spans or [],
+            extensions=extensions,
+            batch_size=batch_size,
+            timings=timings,
+        )
+
     def _udf_factory(
         additional_spans: Union[List[str], str] = "discarded",
         extensions: Dict[str, T.DataType] = dict(),
@@ -134,11 +340,7 @@ def pipe(
             if text is None:
                 return []
 
-            nlp = nlp_bc.value
-
-            for _, pipe in nlp.pipeline:
-                if isinstance(pipe, BaseComponent):
-                    pipe.set_extensions()
+            nlp = _get_executor_nlp(nlp_bc)
 
             doc = nlp.make_doc(text)
             for context_name, context_value in zip(context, context_values):
@@ -206,9 +408,7 @@ def pipe(
         extensions=extensions,
     )
 
-    n_needed_partitions = max(note.count() // 2000, 1)  # Batch sizes of 2000
-
-    note_nlp = note.repartition(n_needed_partitions).withColumn(
+    note_nlp = note.withColumn(
         "matches", matcher(F.col("note_text"), *[F.col(c) for c in context])
     )
 
@@ -219,6 +419,94 @@ def pipe(
     return note_nlp
 
 
+def _partitions_pipe(
+    note: DataFrame,
+    nlp_bc,
+    context: List[str],
+    additional_spans: List[str],
+    extensions: Dict[str, T.DataType],
+    batch_size: int,
+    timings: Optional[Accumulator] = None,
+) -> DataFrame:
+    """
+    Applies the pipeline partition by partition with `mapInPandas`:
+    the pipeline is loaded once per Python worker, and each Arrow batch
+    of notes is processed with `nlp.pipe`.
+    """
+
+    schema = T.StructType(
+        [
+            T.StructField("note_id", note.schema["note_id"].dataType, True),
+            T.StructField("lexical_variant", T.StringType(), False),
+            T.StructField("label", T.StringType(), False),
+            T.StructField("span_type", T.StringType(), True),
+            T.StructField("start", T.IntegerType(), False),
+            T.StructField("end", T.IntegerType(), False),
+            *[
+                T.StructField(slugify(extension_name), extension_type, True)
+                for extension_name, extension_type in extensions.items()
+            ],
+        ]
+    )
+
+    def process_partition(batches: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        nlp = _get_executor_nlp(nlp_bc)
+
+        def make_docs(batch: pd.DataFrame):
+            columns = batch[["note_id", "note_text", *context]]
+            for note_id, text, *context_values in columns.itertuples(index=False):
+                if not isinstance(text, str):
+                    continue
+                doc = nlp.make_doc(text)
+                for context_name, context_value in zip(context, context_values):
+                    # Missing values are converted to NaN/NaT by pandas
+                    if is_scalar(context_value) and pd.isna(context_value):
+                        context_value = None
+                    doc._.set(context_name, context_value)
+                yield doc, note_id
+
+        for batch in batches:
+            rows = []
+            start_time = time.perf_counter()
+
+            for doc, note_id in nlp.pipe(
+                make_docs(batch), as_tuples=True, batch_size=batch_size
+            ):
+                groups = [("ents", doc.ents)] + [
+                    (spans_name, doc.spans.get(spans_name, []))
+                    for spans_name in additional_spans
+                ]
+                for span_type, spans in groups:
+                    for ent in spans:
+                        rows.append(
+                            (
+                                note_id,
+                                ent.text,
+                                ent.label_,
+                                span_type,
+                                ent.start_char,
+                                ent.end_char,
+                                *[
+                                    rgetattr(ent._, extension)
+                                    for extension in extensions.keys()
+                                ],
+                            )
+                        )
+
+            _record_timing(
+                timings,
+                len(batch),
+                int(batch["note_text"].str.len().sum()),
+                time.perf_counter() - start_time,
+            )
+
+            yield pd.DataFrame(rows, columns=schema.names)
+
+    columns = ["note_id", "note_text", *[c for c in context if c != "note_id"]]
+
+    return note.select(*columns).mapInPandas(process_partition, schema)
+
+
 @module_checker
 def custom_pipe(
     note: DataFrames,
@@ -286,11 +574,7 @@ def custom_pipe(
         if text is None:
             return []
 
-        nlp_ = nlp_bc.value
-
-        for _, pipe in nlp.pipeline:
-            if isinstance(pipe, BaseComponent):
-                pipe.set_extensions()
+        nlp_ = _get_executor_nlp(nlp_bc)
 
         doc = nlp_.make_doc(text)
         for context_name, context_value in zip(context, context_values):
@@ -1,10 +1,15 @@
-from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+import gc
+import multiprocessing
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 import spacy
 from joblib import Parallel, delayed
 from spacy import Language
 from spacy.tokens import Doc
+from tqdm import tqdm
 
 from .helpers import check_spacy_version_for_context
 from .simple import ExtensionSchema, _flatten, _pipe_generator
@@ -34,6 +39,53 @@ def _chunker(
     )
 
 
+def _length_chunker(
+    note: pd.DataFrame,
+    chunk_chars: int,
+) -> List[np.ndarray]:
+    """
+    Splits the notes into chunks of about `chunk_chars` characters, longest notes
+    first, so that the largest tasks are handed out first and the smallest ones
+    fill the gaps at the end. A note longer than `chunk_chars` is a chunk on its
+    own.
+
+    Returns
+    -------
+    List[np.ndarray]
+        The positions of the notes of each chunk
+    """
+    lengths = note["note_text"].str.len().fillna(0).to_numpy(dtype=np.int64)
+    order = np.argsort(-lengths, kind="stable")
+    sorted_lengths = lengths[order]
+    # Index of the budget slice in which each note starts
+    slices = (np.cumsum(sorted_lengths) - sorted_lengths) // max(chunk_chars, 1)
+    return np.split(order, np.flatnonzero(np.diff(slices)) + 1)
+
+
+def _merge_chunks(
+    note_results: Iterable[Tuple[np.ndarray, List[List[Dict[str, Any]]]]],
+    total_length: int,
+) -> List[Dict[str, Any]]:
+    """
+    Puts the results of each note, computed by length-aware chunks,
+    back in the order of the notes.
+    """
+    ordered = [[]] * total_length
+    for positions, results in note_results:
+        for position, result in zip(positions, results):
+            ordered[position] = result
+    return _flatten(ordered)
+
+
+def _process_chunk_by_note(note: pd.DataFrame, **pipe_kwargs):
+    return list(_pipe_generator(note, nlp, progress_bar=False, **pipe_kwargs))
+
+
+def _process_positions_with_kwargs(task):
+    positions, note, pipe_kwargs = task
+    return positions, _process_chunk_by_note(note, **pipe_kwargs)
+
+
 def _process_chunk(note: pd.DataFrame, **pipe_kwargs):
 
     list_results = []
@@ -44,6 +96,11 @@ def _process_chunk(note: pd.DataFrame, **pipe_kwargs):
     return list_results
 
 
+def _process_chunk_with_kwargs(task):
+    note, pipe_kwargs = task
+    return _process_chunk(note, **pipe_kwargs)
+
+
 def pipe(
     note: pd.DataFrame,
     nlp: Language,
@@ -54,6 +111,7 @@ def pipe(
     chunksize: int = 100,
     n_jobs: int = -2,
     progress_bar: bool = True,
+    chunk_chars: Optional[int] = None,
     **pipe_kwargs,
 ):
     """
@@ -89,6 +147,11 @@ def pipe(
         The default value uses the maximum number of available cores.
     progress_bar: bool, by default True
         Whether to display a progress bar or not
+    chunk_chars: Optional[int], by default None
+        If set, tasks are built by character budget instead of number of notes:
+        the notes are sorted by decreasing length and grouped into chunks of about
+        `chunk_chars` characters, that are handed out to the workers as soon as
+        they are available. The results keep the order of the notes.
     **pipe_kwargs:
         Arguments exposed in `processing.pipe_generator` are also available here
 
@@ -116,6 +179,19 @@ def pipe(
     pipe_kwargs["results_extractor"] = results_extractor
     pipe_kwargs["context"] = context
 
+    if chunk_chars is not None:
+        chunks = _length_chunker(note, chunk_chars)
+
+        if verbose:
+            executor.warn(f"{len(chunks)} tasks to complete")
+
+        do = delayed(_process_chunk_by_note)
+
+        tasks = (do(note.iloc[positions], **pipe_kwargs) for positions in chunks)
+        result = executor(tasks)
+
+        return pd.DataFrame(_merge_chunks(zip(chunks, result), len(note)))
+
     if verbose:
         executor.warn(f"{int(len(note)/chunksize)} tasks to complete")
 
@@ -130,3 +206,165 @@ def pipe(
     out = _flatten(result)
 
     return pd.DataFrame(out)
+
+
+def _effective_n_jobs(n_jobs: int) -> int:
+    """
+    Number of workers corresponding to `n_jobs`, following joblib's convention:
+    negative values mean "all cores minus `abs(n_jobs + 1)`".
+    """
+    if n_jobs < 0:
+        n_jobs = (os.cpu_count() or 1) + 1 + n_jobs
+    return max(n_jobs, 1)
+
+
+class ParallelProcessor:
+    """
+    A pool of worker processes that each load the pipeline once, and can then
+    process any number of DataFrames. Unlike `pipe`, which starts new workers
+    (and sends them the pipeline) on every call, the start-up cost is only paid
+    once, which suits repeated calls on small batches of notes.
+
+    The workers are forked from the current process, and share its memory
+    (for instance the patterns of the matchers) as long as they do not write to it.
+    Large read-only structures, such as the synonyms of the `SimstringMatcher`,
+    are memory-mapped and shared by every worker as well.
+
+    ```python
+    with ParallelProcessor(nlp, n_jobs=8) as processor:
+        for note in batches:
+            note_nlp = processor.pipe(note, extensions=["negation"])
+    ```
+
+    Parameters
+    ----------
+    nlp : Language
+        A spaCy pipe
+    n_jobs: int, by default -2
+        Number of worker processes.
+        The default value uses the maximum number of available cores minus one.
+    """
+
+    def __init__(
+        self,
+        nlp: Language,
+        n_jobs: int = -2,
+    ):
+        self.nlp = nlp
+        self.n_jobs = _effective_n_jobs(n_jobs)
+        self.pool = None
+
+    def start(self) -> "ParallelProcessor":
+        """
+        Starts the workers, and loads the pipeline in each one of them.
+        Called automatically by the first call to `pipe`.
+        """
+        if self.pool is None:
+            # The objects allocated so far (including the pipeline) are hidden
+            # from the garbage collector of the forked workers, which would
+            # otherwise write to them, and thus copy the memory pages they
+            # share with the parent process
+            gc.freeze()
+            try:
+                self.pool = multiprocessing.Pool(
+                    self.n_jobs,
+                    initializer=_define_nlp,
+                    initargs=(self.nlp,),
+                )
+            finally:
+                gc.unfreeze()
+        return self
+
+    def close(self) -> None:
+        """
+        Stops the workers.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def pipe(
+        self,
+        note: pd.DataFrame,
+        context: List[str] = [],
+        additional_spans: Union[List[str], str] = [],
+        extensions: ExtensionSchema = [],
+        results_extractor: Optional[Callable[[Doc], List[Dict[str, Any]]]] = None,
+        chunksize: int = 100,
+        progress_bar: bool = True,
+        chunk_chars: Optional[int] = None,
+        **pipe_kwargs,
+    ) -> pd.DataFrame:
+        """
+        Applies the pipeline to a pandas DataFrame note, using the workers
+        of the processor.
+
+        Parameters
+        ----------
+        note : DataFrame
+            A pandas DataFrame with a `note_id` and `note_text` column
+        context : List[str]
+            A list of column to add to the generated SpaCy document as an extension.
+        additional_spans : Union[List[str], str], by default [] (empty list)
+            A name (or list of names) of SpanGroup on which to apply the pipe too.
+        extensions : List[Tuple[str, T.DataType]], by default []
+            Spans extensions to add to the extracted results.
+        results_extractor : Optional[Callable[[Doc], List[Dict[str, Any]]]]
+            Arbitrary function that takes extract serialisable results from the
+            computed spaCy `Doc` object.
+        chunksize: int, by default 100
+            Batch size used to split tasks
+        progress_bar: bool, by default True
+            Whether to display a progress bar or not
+        chunk_chars: Optional[int], by default None
+            If set, tasks are built by character budget instead of number of notes
+            (longest notes first), and processed in the order in which the workers
+            complete them. The results keep the order of the notes.
+        **pipe_kwargs:
+            Arguments exposed in `processing.pipe_generator` are also available here
+
+        Returns
+        -------
+        DataFrame
+            A pandas DataFrame with one line per extraction
+        """
+        if context:
+            check_spacy_version_for_context()
+
+        self.start()
+
+        pipe_kwargs["additional_spans"] = additional_spans
+        pipe_kwargs["extensions"] = extensions
+        pipe_kwargs["results_extractor"] = results_extractor
+        pipe_kwargs["context"] = context
+
+        if chunk_chars is not None:
+            chunks = _length_chunker(note, chunk_chars)
+            results = self.pool.imap_unordered(
+                _process_positions_with_kwargs,
+                (
+                    (positions, note.iloc[positions], pipe_kwargs)
+                    for positions in chunks
+                ),
+            )
+            results = tqdm(results, total=len(chunks), disable=not progress_bar)
+            return pd.DataFrame(_merge_chunks(results, len(note)))
+
+        chunks = list(_chunker(note, len(note), chunksize=chunksize))
+        results = self.pool.imap(
+            _process_chunk_with_kwargs,
+            ((chunk, pipe_kwargs) for chunk in chunks),
+        )
+
+        out = []
+        for result in tqdm(results, total=len(chunks), disable=not progress_bar):
+            out.extend(result)
+
+        return pd.DataFrame(out)
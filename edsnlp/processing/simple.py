@@ -1,4 +1,4 @@
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import pandas as pd
 import spacy
@@ -70,6 +70,30 @@ def _flatten(list_of_lists: List[List[Any]]):
     return [item for sublist in list_of_lists for item in sublist]
 
 
+def _doc_generator(
+    note: pd.DataFrame,
+    nlp: Language,
+    context: List[str] = [],
+    batch_size: int = 50,
+    progress_bar: bool = True,
+) -> Iterator[Doc]:
+    """
+    Applies the pipeline to each note, with its context, and yields the documents.
+    """
+
+    if "note_id" not in context:
+        context.append("note_id")
+
+    if not nlp.has_pipe("eds.context"):
+        nlp.add_pipe("eds.context", first=True, config=dict(context=context))
+
+    gen = _df_to_spacy(note, nlp, context)
+    n_docs = len(note)
+    pipeline = nlp.pipe(gen, batch_size=batch_size)
+
+    yield from tqdm(pipeline, total=n_docs, disable=not progress_bar)
+
+
 def _pipe_generator(
     note: pd.DataFrame,
     nlp: Language,
@@ -90,17 +114,7 @@ def _pipe_generator(
     if type(additional_spans) == str:
         additional_spans = [additional_spans]
 
-    if "note_id" not in context:
-        context.append("note_id")
-
-    if not nlp.has_pipe("eds.context"):
-        nlp.add_pipe("eds.context", first=True, config=dict(context=context))
-
-    gen = _df_to_spacy(note, nlp, context)
-    n_docs = len(note)
-    pipeline = nlp.pipe(gen, batch_size=batch_size)
-
-    for doc in tqdm(pipeline, total=n_docs, disable=not progress_bar):
+    for doc in _doc_generator(note, nlp, context, batch_size, progress_bar):
 
         if results_extractor:
             yield results_extractor(doc)
@@ -236,3 +250,103 @@ def pipe(
             )
         )
     )
+
+
+def _chunk_notes(
+    notes: Iterable[Union[pd.DataFrame, Dict[str, Any], Tuple]],
+    columns: List[str],
+    chunk_size: int,
+) -> Iterator[pd.DataFrame]:
+    """
+    Groups the records of an iterable into DataFrames of at most `chunk_size` rows.
+    DataFrames found in the iterable are yielded as is.
+    """
+    records = []
+    for item in notes:
+        if isinstance(item, pd.DataFrame):
+            if records:
+                yield pd.DataFrame.from_records(records, columns=columns)
+                records = []
+            yield item
+            continue
+
+        records.append(item)
+        if len(records) >= chunk_size:
+            yield pd.DataFrame.from_records(records, columns=columns)
+            records = []
+
+    if records:
+        yield pd.DataFrame.from_records(records, columns=columns)
+
+
+def stream_pipe(
+    notes: Iterable[Union[pd.DataFrame, Dict[str, Any], Tuple]],
+    nlp: Language,
+    context: List[str] = [],
+    results_extractor: Optional[Callable[[Doc], List[Dict[str, Any]]]] = None,
+    additional_spans: Union[List[str], str] = [],
+    extensions: ExtensionSchema = [],
+    batch_size: int = 1000,
+    progress_bar: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """
+    Function to apply a spaCy pipe to a stream of notes, that lazily yields
+    the results chunk by chunk. Only one chunk of notes and its results are held
+    in memory at a time, which allows processing tables that do not fit in memory.
+
+    Parameters
+    ----------
+    notes : Iterable[Union[pd.DataFrame, Dict[str, Any], Tuple]]
+        An iterable of pandas DataFrames with a `note_id` and `note_text` column
+        (for instance read from the row groups of a Parquet file), or an iterable
+        of records. Records are either dictionaries or
+        `(note_id, note_text, *context)` tuples, and are grouped
+        in chunks of `batch_size` notes.
+    nlp : Language
+        A spaCy pipe
+    context : List[str]
+        A list of column to add to the generated SpaCy document as an extension.
+        For instance, if `context=["note_datetime"], the corresponding value found
+        in the `note_datetime` column will be stored in `doc._.note_datetime`,
+        which can be useful e.g. for the `dates` pipeline.
+    results_extractor : Optional[Callable[[Doc], List[Dict[str, Any]]]]
+        Arbitrary function that takes extract serialisable results from the computed
+        spaCy `Doc` object. The output of the function must be a list of dictionaries
+        containing the extracted spans or entities.
+    additional_spans : Union[List[str], str], by default [] (empty list)
+        A name (or list of names) of SpanGroup on which to apply the pipe too:
+        SpanGroup are available as `doc.spans[spangroup_name]` and can be generated
+        by some pipes. For instance, the `date` pipe populates doc.spans['dates']
+    extensions : List[Tuple[str, T.DataType]], by default []
+        Spans extensions to add to the extracted results:
+        For instance, if `extensions=["score_name"]`, the extracted result
+        will include, for each entity, `ent._.score_name`.
+    batch_size : int, by default 1000
+        Number of records per chunk, also used as batch size by spaCy's pipe
+    progress_bar: bool, by default True
+        Whether to display a progress bar or not
+
+    Yields
+    ------
+    DataFrame
+        A pandas DataFrame with one line per extraction, for each chunk of notes
+    """
+    columns = ["note_id", "note_text"] + [col for col in context if col != "note_id"]
+
+    with tqdm(disable=not progress_bar) as bar:
+        for chunk in _chunk_notes(notes, columns, chunk_size=batch_size):
+            yield pd.DataFrame(
+                _flatten(
+                    _pipe_generator(
+                        note=chunk,
+                        nlp=nlp,
+                        context=context,
+                        results_extractor=results_extractor,
+                        additional_spans=additional_spans,
+                        extensions=extensions,
+                        batch_size=batch_size,
+                        progress_bar=False,
+                    )
+                )
+            )
+            bar.update(len(chunk))
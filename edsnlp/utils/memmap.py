@@ -0,0 +1,168 @@
+import mmap
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Mapping, Tuple, Union
+
+import numpy as np
+
+# Version 2 terminates each string of the values, instead of separating them
+MAGIC = b"EDSMMAP2"
+SEPARATOR = b"\x00"
+HEADER_SIZE = len(MAGIC) + 3 * 8
+
+
+class _SortedKeys:
+    """
+    Sequence view of the (byte-encoded) keys of a `MemoryMappedDict`,
+    used to binary search them with `bisect`.
+    """
+
+    def __init__(self, buffer: mmap.mmap, start: int, offsets: np.ndarray):
+        self.buffer = buffer
+        self.start = start
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.start
+        return self.buffer[start + self.offsets[i] : start + self.offsets[i + 1]]
+
+
+class MemoryMappedDict(Mapping[str, Tuple[str, ...]]):
+    """
+    Read-only mapping from strings to tuples of strings, stored in a file that is
+    memory-mapped rather than loaded: every process that opens the same file
+    shares the same physical memory (the OS page cache), instead of holding its
+    own copy of a large dictionary.
+
+    Pickling the mapping only pickles its path, so that the processes
+    it is sent to attach to the same file.
+
+    Use [`MemoryMappedDict.write`][edsnlp.utils.memmap.MemoryMappedDict.write]
+    to create the file.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path to the file
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+        with open(self.path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.buffer[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a memory-mapped dictionary")
+
+        n, key_size, value_size = np.frombuffer(
+            self.buffer, dtype=np.int64, count=3, offset=len(MAGIC)
+        ).tolist()
+
+        offset = HEADER_SIZE
+        key_offsets = np.frombuffer(
+            self.buffer, dtype=np.int64, count=n + 1, offset=offset
+        )
+        offset += (n + 1) * 8
+        self.value_offsets = np.frombuffer(
+            self.buffer, dtype=np.int64, count=n + 1, offset=offset
+        )
+        offset += (n + 1) * 8
+        self.keys_start = offset
+        self.values_start = offset + key_size
+
+        self.sorted_keys = _SortedKeys(self.buffer, self.keys_start, key_offsets)
+
+    @classmethod
+    def write(
+        cls,
+        path: Union[str, Path],
+        data: Mapping[str, Iterable[str]],
+    ) -> "MemoryMappedDict":
+        """
+        Writes a dictionary to a file that can be memory-mapped,
+        and opens it.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Path to the file
+        data : Mapping[str, Iterable[str]]
+            The dictionary to write. Values must not contain null characters.
+
+        Returns
+        -------
+        MemoryMappedDict
+        """
+        items = sorted(
+            (
+                key.encode("utf-8"),
+                b"".join(v.encode("utf-8") + SEPARATOR for v in values),
+            )
+            for key, values in data.items()
+        )
+
+        keys = [key for key, _ in items]
+        values = [value for _, value in items]
+
+        key_offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        key_offsets[1:] = np.cumsum([len(key) for key in keys])
+        value_offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        value_offsets[1:] = np.cumsum([len(value) for value in values])
+
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(
+                np.array(
+                    [len(items), key_offsets[-1], value_offsets[-1]],
+                    dtype=np.int64,
+                ).tobytes()
+            )
+            f.write(key_offsets.tobytes())
+            f.write(value_offsets.tobytes())
+            f.write(b"".join(keys))
+            f.write(b"".join(values))
+
+        return cls(path)
+
+    def _find(self, key: str) -> int:
+        encoded = key.encode("utf-8")
+        i = bisect_left(self.sorted_keys, encoded)
+        if i < len(self.sorted_keys) and self.sorted_keys[i] == encoded:
+            return i
+        return -1
+
+    def __getitem__(self, key: str) -> Tuple[str, ...]:
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        start = self.values_start + int(self.value_offsets[i])
+        end = self.values_start + int(self.value_offsets[i + 1])
+        # Each string is followed by a separator, so that empty strings are kept
+        return tuple(self.buffer[start:end].decode("utf-8").split("\x00")[:-1])
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __len__(self) -> int:
+        return len(self.sorted_keys)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self.sorted_keys)):
+            yield self.sorted_keys[i].decode("utf-8")
+
+    def __reduce__(self):
+        return self.__class__, (str(self.path),)
+
+    def to_dict(self) -> Dict[str, Tuple[str, ...]]:
+        """
+        Loads the whole mapping in memory.
+
+        Returns
+        -------
+        Dict[str, Tuple[str, ...]]
+        """
+        return dict(self.items())
@@ -0,0 +1,404 @@
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from loguru import logger
+from spacy.language import Language
+from spacy.tokens import Doc
+
+Sink = Callable[[Dict[str, Dict[str, float]]], None]
+
+
+def count_matches(doc: Doc) -> int:
+    """
+    Number of entities and spans of all the span groups of a document.
+    """
+    return len(doc.ents) + sum(len(group) for group in doc.spans.values())
+
+
+class PipeStats:
+    """
+    Statistics of a pipeline component, accumulated over its calls.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.docs = 0
+        self.tokens = 0
+        self.seconds = 0.0
+        self.matches = 0
+
+    def record(self, doc: Doc, seconds: float, matches: int) -> None:
+        self.docs += 1
+        self.tokens += len(doc)
+        self.seconds += seconds
+        self.matches += matches
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(
+            calls=self.calls,
+            docs=self.docs,
+            tokens=self.tokens,
+            seconds=self.seconds,
+            matches=self.matches,
+            ms_per_doc=1000 * self.seconds / self.docs if self.docs else 0.0,
+        )
+
+
+class _TimedIterator:
+    """
+    Iterates over the documents given to a component, measuring the time spent
+    producing them upstream and counting their matches when they come in.
+    """
+
+    def __init__(self, docs: Iterable[Doc]):
+        self.docs = iter(docs)
+        self.seconds = 0.0
+        self.matches: Dict[int, int] = {}
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Doc:
+        start = time.perf_counter()
+        try:
+            doc = next(self.docs)
+        finally:
+            self.seconds += time.perf_counter() - start
+        self.matches[id(doc)] = count_matches(doc)
+        return doc
+
+
+class ProfiledPipe:
+    """
+    Proxy of a pipeline component that records its statistics, see
+    [`enable_profiling`][edsnlp.utils.profiling.enable_profiling].
+    Other attributes are looked up on the component.
+
+    Parameters
+    ----------
+    name : str
+        Name of the component
+    proc : Callable[[Doc], Doc]
+        The component
+    stats : PipeStats
+        Statistics of the component, updated in place
+    nlp : Language
+        The pipeline, whose default error handler is used
+        for components without a `pipe` method
+    """
+
+    def __init__(
+        self,
+        name: str,
+        proc: Callable[[Doc], Doc],
+        stats: PipeStats,
+        nlp: Language,
+    ):
+        self.name = name
+        self.proc = proc
+        self.stats = stats
+        self.nlp = nlp
+
+    def __getattr__(self, attr: str) -> Any:
+        # Only called for the attributes that the proxy does not have
+        if "proc" not in self.__dict__:
+            raise AttributeError(attr)
+        return getattr(self.__dict__["proc"], attr)
+
+    def __call__(self, doc: Doc, **kwargs) -> Doc:
+        self.stats.calls += 1
+        matches = count_matches(doc)
+        start = time.perf_counter()
+        doc = self.proc(doc, **kwargs)
+        seconds = time.perf_counter() - start
+        self.stats.record(doc, seconds, count_matches(doc) - matches)
+        return doc
+
+    def pipe(self, docs: Iterable[Doc], **kwargs) -> Iterator[Doc]:
+        """
+        Applies the component to a stream of documents, like `nlp.pipe` does.
+        The time spent by the upstream components to produce the documents
+        is not counted.
+        """
+        self.stats.calls += 1
+        inputs = _TimedIterator(docs)
+
+        if hasattr(self.proc, "pipe"):
+            outputs = self.proc.pipe(inputs, **kwargs)
+        else:
+            outputs = self._call_each(inputs, **kwargs)
+
+        while True:
+            upstream = inputs.seconds
+            start = time.perf_counter()
+            try:
+                doc = next(outputs)
+            except StopIteration:
+                return
+            seconds = time.perf_counter() - start - (inputs.seconds - upstream)
+            matches = count_matches(doc) - inputs.matches.pop(id(doc), 0)
+            self.stats.record(doc, seconds, matches)
+            yield doc
+
+    def _call_each(self, docs: Iterable[Doc], **kwargs) -> Iterator[Doc]:
+        # Same as spaCy does for the components without a `pipe` method
+        kwargs.pop("batch_size", None)
+        error_handler = self.nlp.default_error_handler
+        if hasattr(self.proc, "get_error_handler"):
+            error_handler = self.proc.get_error_handler()
+        for doc in docs:
+            try:
+                yield self.proc(doc, **kwargs)
+            except Exception as e:
+                error_handler(self.name, self.proc, [doc], e)
+
+
+class ProfiledTokenizer(ProfiledPipe):
+    """
+    Proxy of a tokenizer that records its statistics.
+    """
+
+    def __call__(self, text: str) -> Doc:
+        self.stats.calls += 1
+        start = time.perf_counter()
+        doc = self.proc(text)
+        self.stats.record(doc, time.perf_counter() - start, 0)
+        return doc
+
+    def pipe(self, texts: Iterable[str], **kwargs) -> Iterator[Doc]:
+        for text in texts:
+            yield self(text)
+
+
+class Profiler:
+    """
+    Statistics of the components of a pipeline, see
+    [`enable_profiling`][edsnlp.utils.profiling.enable_profiling].
+
+    Parameters
+    ----------
+    sinks : List[Sink]
+        Callables the statistics are emitted to
+    """
+
+    def __init__(self, sinks: Optional[List[Sink]] = None):
+        self.sinks = list(sinks or [])
+        self.stats: Dict[str, PipeStats] = {}
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the statistics of each component, in the order of the pipeline.
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            Number of calls, documents, tokens and matches (entities and spans
+            added to the documents), total duration in seconds and average
+            duration per document in milliseconds
+        """
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+    def emit(self) -> None:
+        """
+        Emits the statistics to the sinks.
+        """
+        stats = self.get_stats()
+        for sink in self.sinks:
+            sink(stats)
+
+    def reset(self) -> None:
+        """
+        Resets the statistics.
+        """
+        for stats in self.stats.values():
+            stats.reset()
+
+
+def enable_profiling(
+    nlp: Language,
+    sinks: Optional[List[Sink]] = None,
+) -> Profiler:
+    """
+    Instruments a pipeline, to record the number of calls, documents, tokens
+    and matches, and the duration, of the tokenizer and of each component.
+
+    The components (and the tokenizer) are replaced in the pipeline by proxies
+    that record their statistics, until `disable_profiling` is called: a
+    pipeline that is not profiled is not slowed down. The statistics are
+    available with `nlp.get_pipe_stats()`. Only the documents processed in the
+    current process are counted (not those of `nlp.pipe(..., n_process=n)`).
+
+    Only the components of the pipeline at the time of the call are profiled:
+    a component added afterwards (for instance with `nlp.add_pipe`) is not, and
+    is missing from the statistics. Call `enable_profiling` again once the
+    pipeline is complete (which resets the statistics).
+
+    Parameters
+    ----------
+    nlp : Language
+        The pipeline
+    sinks : Optional[List[Sink]]
+        Callables the statistics are emitted to by `Profiler.emit`, for instance
+        [`LoggingSink`][edsnlp.utils.profiling.LoggingSink],
+        [`JSONSink`][edsnlp.utils.profiling.JSONSink] or
+        [`PrometheusSink`][edsnlp.utils.profiling.PrometheusSink]
+
+    Returns
+    -------
+    Profiler
+    """
+    if getattr(nlp, "profiler", None) is not None:
+        disable_profiling(nlp, emit=False)
+
+    profiler = Profiler(sinks)
+
+    profiler.stats["tokenizer"] = PipeStats()
+    nlp.tokenizer = ProfiledTokenizer(
+        "tokenizer", nlp.tokenizer, profiler.stats["tokenizer"], nlp
+    )
+
+    for i, (name, proc) in enumerate(nlp._components):
+        profiler.stats[name] = PipeStats()
+        nlp._components[i] = (name, ProfiledPipe(name, proc, profiler.stats[name], nlp))
+
+    nlp.profiler = profiler
+    nlp.get_pipe_stats = profiler.get_stats
+    return profiler
+
+
+def disable_profiling(nlp: Language, emit: bool = True) -> Optional[Profiler]:
+    """
+    Restores the original components of a profiled pipeline.
+
+    Parameters
+    ----------
+    nlp : Language
+        The pipeline
+    emit : bool
+        Whether to emit the statistics to the sinks of the profiler
+
+    Returns
+    -------
+    Optional[Profiler]
+        The profiler of the pipeline, if it was profiled
+    """
+    profiler = getattr(nlp, "profiler", None)
+    if profiler is None:
+        return None
+
+    if isinstance(nlp.tokenizer, ProfiledPipe):
+        nlp.tokenizer = nlp.tokenizer.proc
+    for i, (name, proc) in enumerate(nlp._components):
+        if isinstance(proc, ProfiledPipe):
+            nlp._components[i] = (name, proc.proc)
+
+    if emit:
+        profiler.emit()
+
+    nlp.profiler = None
+    del nlp.get_pipe_stats
+    return profiler
+
+
+@contextmanager
+def profiling(
+    nlp: Language,
+    sinks: Optional[List[Sink]] = None,
+) -> Iterator[Profiler]:
+    """
+    Profiles a pipeline within a `with` block, and emits the statistics
+    when leaving it, see
+    [`enable_profiling`][edsnlp.utils.profiling.enable_profiling].
+
+    Parameters
+    ----------
+    nlp : Language
+        The pipeline
+    sinks : Optional[List[Sink]]
+        Callables the statistics are emitted to
+
+    Yields
+    ------
+    Profiler
+    """
+    profiler = enable_profiling(nlp, sinks)
+    try:
+        yield profiler
+    finally:
+        disable_profiling(nlp)
+
+
+class LoggingSink:
+    """
+    Logs the statistics of the components, one line per component.
+
+    Parameters
+    ----------
+    level : str
+        Logging level
+    """
+
+    def __init__(self, level: str = "INFO"):
+        self.level = level
+
+    def __call__(self, stats: Dict[str, Dict[str, float]]) -> None:
+        for name, values in stats.items():
+            logger.log(
+                self.level,
+                f"{name}: {values['docs']} docs, {values['tokens']} tokens, "
+                f"{values['matches']} matches, {values['seconds']:.3f}s "
+                f"({values['ms_per_doc']:.2f} ms/doc)",
+            )
+
+
+class JSONSink:
+    """
+    Writes the statistics of the components to a JSON file.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path of the file, overwritten at each emission
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    def __call__(self, stats: Dict[str, Dict[str, float]]) -> None:
+        self.path.write_text(json.dumps(stats, indent=2))
+
+
+class PrometheusSink:
+    """
+    Writes the statistics of the components to a file in the Prometheus
+    text format, to be collected by the textfile collector of node exporter.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path of the file, overwritten at each emission
+    prefix : str
+        Prefix of the metric names
+    """
+
+    def __init__(self, path: Union[str, Path], prefix: str = "edsnlp_pipe"):
+        self.path = Path(path)
+        self.prefix = prefix
+
+    def __call__(self, stats: Dict[str, Dict[str, float]]) -> None:
+        lines = []
+        for metric in ["calls", "docs", "tokens", "matches", "seconds"]:
+            name = f"{self.prefix}_{metric}_total"
+            lines.append(f"# TYPE {name} counter")
+            for component, values in stats.items():
+                lines.append(f'{name}{{component="{component}"}} {values[metric]}')
+        # Write then rename, so that the collector never reads a partial file
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n")
+        tmp.replace(self.path)
@@ -1,8 +1,16 @@
 import re
-from typing import List, Optional
+import warnings
+from typing import FrozenSet, List, Optional, Tuple, Union
 
 import regex
 
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_constants
+    import sre_parse
+
 
 def make_pattern(
     patterns: List[str],
@@ -63,3 +71,225 @@ def compile_regex(reg: str, flags: re.RegexFlag):
             return regex.compile(reg, flags=flags)
         except regex.error:
             raise Exception("Could not compile: {}".format(repr(reg)))
+
+
+# Constructs that cannot be moved inside a larger alternation without
+# changing their meaning: numbered/named back-references and conditionals
+UNMERGEABLE_PATTERN = re.compile(r"\\[1-9]|\\g<|\(\?P=|\(\?\(")
+NAMED_GROUP_PATTERN = re.compile(r"\(\?P<\w+>")
+GLOBAL_FLAGS_PATTERN = re.compile(r"^\(\?[aiLmsux]+\)")
+
+
+def get_mergeable_source(pattern: Union[re.Pattern, regex.Pattern]) -> Optional[str]:
+    """
+    Returns the source of a compiled pattern, rewritten so that it can be
+    used as one branch of a larger alternation (named groups are anonymized
+    and leading global flags, already stored in `pattern.flags`, are removed).
+
+    Parameters
+    ----------
+    pattern: Union[re.Pattern, regex.Pattern]
+        The compiled pattern
+
+    Returns
+    -------
+    Optional[str]
+        The rewritten source, or None if the pattern cannot be merged
+    """
+    if not isinstance(pattern, re.Pattern) or not isinstance(pattern.pattern, str):
+        return None
+
+    source = pattern.pattern
+
+    if UNMERGEABLE_PATTERN.search(source):
+        return None
+
+    source = GLOBAL_FLAGS_PATTERN.sub("", source)
+    source = NAMED_GROUP_PATTERN.sub("(?:", source)
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            re.compile(f"(?:{source})", flags=pattern.flags)
+    except (re.error, Warning):
+        return None
+
+    return source
+
+
+def make_lookahead_union(sources: List[str], flags: Union[re.RegexFlag, int] = 0):
+    """
+    Merges several patterns in a single zero-width pattern, matching at every
+    position where at least one of the patterns can start a match.
+
+    Parameters
+    ----------
+    sources: List[str]
+        Sources of the patterns to merge, as returned by `get_mergeable_source`
+    flags: Union[re.RegexFlag, int]
+        Flags shared by every pattern
+
+    Returns
+    -------
+    re.Pattern
+    """
+    return re.compile(
+        "(?=" + "|".join(f"(?:{source})" for source in sources) + ")",
+        flags=flags,
+    )
+
+
+Literal = Tuple[str, bool]
+
+# Maximum number of variants of a literal, when expanding small character classes
+MAX_LITERAL_VARIANTS = 16
+
+REPEAT_OPCODES = tuple(
+    getattr(sre_constants, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_constants, name)
+)
+
+
+def _literal_chars(op, av, ignorecase: bool) -> Optional[List[str]]:
+    """
+    Returns the characters that a single-character item can match, or None if
+    it can match too many characters to be used in a literal.
+    Under IGNORECASE, characters are lowercased, and characters whose case
+    folding is not handled identically by `str.lower` and the `re` module
+    (non-ASCII characters, "i" and "s") are rejected.
+    """
+    if op is sre_constants.LITERAL:
+        chars = [chr(av)]
+    elif (
+        op is sre_constants.IN
+        and len(av) <= 4
+        and all(item_op is sre_constants.LITERAL for item_op, _ in av)
+    ):
+        chars = [chr(item_av) for _, item_av in av]
+    else:
+        return None
+
+    if ignorecase:
+        chars = [c.lower() for c in chars]
+        if any(not c.isascii() or c in "is" for c in chars):
+            return None
+
+    return chars
+
+
+def _select_literals(
+    candidates: List[FrozenSet[Literal]],
+) -> Optional[FrozenSet[Literal]]:
+    """
+    Selects the most selective set of literals: the one whose shortest literal
+    is the longest, and then the one with the fewest literals.
+    """
+    if not candidates:
+        return None
+    return max(
+        candidates,
+        key=lambda literals: (
+            min(len(literal) for literal, _ in literals),
+            -len(literals),
+        ),
+    )
+
+
+def _required_literals(items, ignorecase: bool) -> Optional[FrozenSet[Literal]]:
+    """
+    Recursively computes a set of literals such that every match of the
+    parsed sequence `items` contains at least one of them.
+    """
+    candidates = []
+    run = [""]
+
+    def flush_run():
+        if run[0]:
+            candidates.append(frozenset((literal, ignorecase) for literal in run))
+        run[:] = [""]
+
+    for op, av in items:
+        chars = _literal_chars(op, av, ignorecase)
+        if chars is not None:
+            if len(run) * len(chars) > MAX_LITERAL_VARIANTS:
+                flush_run()
+            run[:] = [literal + c for literal in run for c in chars]
+            continue
+
+        flush_run()
+
+        literals = None
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            sub_ignorecase = (ignorecase or bool(add_flags & re.IGNORECASE)) and not (
+                del_flags & re.IGNORECASE
+            )
+            literals = _required_literals(sub, sub_ignorecase)
+        elif op is sre_constants.BRANCH:
+            branches = [_required_literals(branch, ignorecase) for branch in av[1]]
+            if all(branches):
+                literals = frozenset().union(*branches)
+        elif op in REPEAT_OPCODES:
+            min_count, _, sub = av
+            if min_count >= 1:
+                literals = _required_literals(sub, ignorecase)
+        elif op is sre_constants.ASSERT:
+            literals = _required_literals(av[1], ignorecase)
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            literals = _required_literals(av, ignorecase)
+
+        if literals:
+            candidates.append(literals)
+
+    flush_run()
+
+    return _select_literals(candidates)
+
+
+def get_required_literals(
+    pattern: Union[re.Pattern, regex.Pattern],
+    min_length: int = 2,
+) -> Optional[FrozenSet[Literal]]:
+    """
+    Analyses a compiled pattern to find literals that must occur in the text for
+    the pattern to match: if none of the returned literals is found in a text,
+    the pattern cannot match anywhere in this text.
+
+    Parameters
+    ----------
+    pattern: Union[re.Pattern, regex.Pattern]
+        The compiled pattern
+    min_length: int
+        Minimum length of the literals, shorter literals are not selective
+        enough to be worth checking
+
+    Returns
+    -------
+    Optional[FrozenSet[Tuple[str, bool]]]
+        The literals, with a boolean telling whether the literal is lowercased
+        and must be looked up in the lowercased text, or None if no
+        such literals could be found.
+    """
+    if not isinstance(pattern.pattern, str):
+        return None
+
+    ignorecase = bool(pattern.flags & re.IGNORECASE)
+
+    # The regex module handles case folding differently
+    if isinstance(pattern, regex.Pattern) and ignorecase:
+        return None
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+
+    literals = _required_literals(parsed, ignorecase)
+
+    if not literals or min(len(literal) for literal, _ in literals) < min_length:
+        return None
+
+    return literals
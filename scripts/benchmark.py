@@ -0,0 +1,75 @@
+"""
+Benchmarks the reference pipelines of EDS-NLP, and writes the results to JSON.
+
+```
+python scripts/benchmark.py --output benchmark.json
+python scripts/benchmark.py --pipeline core --compare previous.json
+```
+"""
+
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from edsnlp.benchmarks import (
+    compare_results,
+    generate_notes,
+    read_notes,
+    run_benchmarks,
+)
+
+
+def run(
+    output: Path = typer.Option("benchmark.json", help="Path to the JSON results."),
+    pipeline: Optional[List[str]] = typer.Option(
+        None, help="Pipelines to benchmark, all of them by default."
+    ),
+    n_notes: int = typer.Option(200, help="Number of synthetic notes."),
+    n_chars: int = typer.Option(3000, help="Length of the synthetic notes."),
+    notes: Optional[Path] = typer.Option(
+        None, help="Directory of text files to use instead of synthetic notes."
+    ),
+    n_repeats: int = typer.Option(3, help="Number of runs of each pipeline."),
+    batch_size: int = typer.Option(32, help="Batch size of `nlp.pipe`."),
+    seed: int = typer.Option(0, help="Seed of the synthetic notes."),
+    compare: Optional[Path] = typer.Option(
+        None, help="Previous JSON results to compare the new ones with."
+    ),
+) -> None:
+    """
+    Benchmarks the reference pipelines on synthetic or real notes.
+    """
+    if notes is not None:
+        texts = read_notes(notes, limit=n_notes)
+    else:
+        texts = generate_notes(n_notes=n_notes, n_chars=n_chars, seed=seed)
+
+    report = run_benchmarks(
+        texts,
+        pipelines=pipeline or None,
+        n_repeats=n_repeats,
+        batch_size=batch_size,
+        output=output,
+    )
+
+    for name, results in report["pipelines"].items():
+        typer.echo(
+            f"{name}: {results['docs_per_sec']:.1f} docs/s, "
+            f"{results['tokens_per_sec']:.0f} tokens/s, "
+            f"peak RSS {results['peak_rss_mb']:.0f} MB"
+        )
+
+    if compare is not None:
+        reference = json.loads(compare.read_text())
+        for name, ratios in compare_results(reference, report).items():
+            typer.echo(f"{name} (new / reference):")
+            for key, ratio in ratios.items():
+                typer.echo(f"  {key}: {ratio:.2f}")
+
+    typer.echo(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    typer.run(run)
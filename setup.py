@@ -20,7 +20,9 @@ else:
         "language_level": "3",
     }
     MOD_NAMES = [
+        "edsnlp.lexemes",
         "edsnlp.matchers.phrase",
+        "edsnlp.pipelines.core.normalizer.fused",
         "edsnlp.pipelines.core.sentences.sentences",
     ]
 
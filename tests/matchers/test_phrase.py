@@ -1,6 +1,10 @@
+import pickle
+
+import numpy as np
 import pytest
 
 from edsnlp.matchers.phrase import EDSPhraseMatcher
+from edsnlp.matchers.utils.terms import get_token_pipelines
 
 
 def test_eds_phrase_matcher(doc, nlp):
@@ -62,3 +66,81 @@ def test_remove(blank_nlp):
     matcher.remove("test")
 
     assert len(matcher) == 0
+
+
+def test_compiled_patterns_cache(blank_nlp, tmp_path):
+    terms = dict(patient=["patient", "malade"], test=["test de matching"])
+    doc = blank_nlp("Le patient fait un test de matching.")
+
+    matchers = []
+    for _ in range(2):
+        matcher = EDSPhraseMatcher(blank_nlp.vocab, attr="TEXT", cache=tmp_path)
+        matcher.build_patterns(blank_nlp, terms)
+        matchers.append(matcher)
+
+    assert len(list(tmp_path.iterdir())) == 1
+
+    for matcher in matchers:
+        assert [span.text for span in matcher(doc, as_spans=True)] == [
+            "patient",
+            "test de matching",
+        ]
+
+    # The keywords of the memory-mapped patterns are not copied
+    _, _, _, _, _, _, docs, _, compiled = matchers[1].__reduce__()[1]
+    assert docs == {}
+    assert isinstance(compiled[0][1], np.memmap)
+
+    matchers[1].remove("test")
+    assert [span.text for span in matchers[1](doc, as_spans=True)] == ["patient"]
+
+    other = EDSPhraseMatcher(blank_nlp.vocab, attr="LOWER", cache=tmp_path)
+    other.build_patterns(blank_nlp, terms)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_token_pipelines(blank_nlp):
+    blank_nlp.add_pipe("eds.normalizer")
+
+    assert "eds.normalizer" in get_token_pipelines(blank_nlp)
+    assert get_token_pipelines(blank_nlp, ["NORM"]) == ["eds.normalizer"]
+    assert get_token_pipelines(blank_nlp, ["TEXT"]) == []
+
+
+def test_duplicate_terms(blank_nlp):
+    blank_nlp.add_pipe("eds.normalizer")
+    doc = blank_nlp("Le patient est malade.")
+
+    matcher = EDSPhraseMatcher(blank_nlp.vocab, attr="NORM")
+    matcher.build_patterns(
+        blank_nlp,
+        dict(
+            patient=["patient", "Patient", "patient"],
+            malade=["Malade", "patient"],
+        ),
+    )
+
+    assert sorted((span.text, span.label_) for span in matcher(doc, as_spans=True)) == [
+        ("malade", "malade"),
+        ("patient", "malade"),
+        ("patient", "patient"),
+    ]
+
+
+def test_pickle(blank_nlp):
+    blank_nlp.add_pipe("eds.normalizer")
+    doc = blank_nlp("Le NBNbWbWbNbWbNBNbNbWbW patient est malade.")
+
+    matcher = EDSPhraseMatcher(blank_nlp.vocab, attr="NORM", ignore_excluded=True)
+    matcher.build_patterns(blank_nlp, dict(patient=["le patient"]))
+    matcher.add("malade", [blank_nlp("malade")])
+
+    loaded = pickle.loads(pickle.dumps(matcher))
+    assert isinstance(loaded, EDSPhraseMatcher)
+    assert sorted(span.text for span in loaded(doc, as_spans=True)) == [
+        "Le NBNbWbWbNbWbNBNbNbWbW patient",
+        "malade",
+    ]
+
+    loaded.remove("patient")
+    assert [span.text for span in loaded(doc, as_spans=True)] == ["malade"]
@@ -1,8 +1,9 @@
 import pytest
 from pytest import mark
 
-from edsnlp.matchers.regex import RegexMatcher
+from edsnlp.matchers.regex import RegexMatcher, create_span, create_spans
 from edsnlp.matchers.utils import get_text
+from edsnlp.utils.regex import compile_regex, get_required_literals
 
 
 def test_regex(doc):
@@ -250,3 +251,155 @@ def test_regex_with_space(blank_nlp):
     match = list(matcher(doc, as_spans=True))[0]
     assert match.text == text
     assert match._.normalized_variant == "pneumopathie à coronavirus"
+
+
+@mark.parametrize(
+    "patterns",
+    [
+        [r"patient", r"douleurs?", r"\bbras\b"],
+        [r"(?i)PATIENT", r"(?P<side>droit|gauche)", r"a*", r"(d)\1"],
+        [r"(?<=le )patient", r"^le", r"(?m)^pas", r"n.?a pas"],
+    ],
+)
+def test_combined_matches(doc, patterns):
+    matcher = RegexMatcher(attr="NORM", ignore_excluded=True)
+    combined = RegexMatcher(attr="NORM", ignore_excluded=True, combine=True)
+
+    for m in (matcher, combined):
+        m.add("first", patterns[:1])
+        m.add("others", patterns[1:])
+        m.add("text", patterns, attr="TEXT")
+
+    for doclike in (doc, doc[10:40]):
+        expected = [
+            (span.start, span.end, span.label_, match.span(), match.groupdict())
+            for span, match in matcher.match(doclike)
+        ]
+        actual = [
+            (span.start, span.end, span.label_, match.span(), match.groupdict())
+            for span, match in combined.match(doclike)
+        ]
+        assert actual == expected
+
+    # Patterns matching on different attributes cannot share a union
+    unions, union_index = combined.compile()
+    assert union_index[(0, 0)] != union_index[(2, 0)]
+
+
+def test_combined_matches_groupdict(doc):
+    matcher = RegexMatcher(combine=True)
+
+    matcher.add("test", [r"patient(?i:(?=.*(?P<cause>douleurs))?)"])
+
+    [(span0, gd0), (span1, gd1)] = list(matcher.match_with_groupdict_as_spans(doc))
+    assert span0.text == "patient"
+    assert span1.text == "patient"
+    assert len(gd0) == 1 and gd0["cause"].text == "douleurs"
+    assert len(gd1) == 0
+
+
+@mark.parametrize(
+    "pattern, literals",
+    [
+        (r"\bdiabet[^o]", {("diabet", False)}),
+        (r"dialys(e|é)", {("dialys", False)}),
+        (r"(mal|maux).perforants?", {("perforant", False)}),
+        (r"(?i)l[’']arrêt\s*du\s*tabac", {("tabac", True)}),
+        (r"L[’']AP-HP", {("L’AP-HP", False), ("L'AP-HP", False)}),
+        (
+            r"(?<!sans )compli|symptomatique",
+            {("compli", False), ("symptomatique", False)},
+        ),
+        (r"\b\d+ ?mg\b", {("mg", False)}),
+        (r"(?i)insipide", {("de", True)}),
+        (r"a*bc|d", None),
+    ],
+)
+def test_required_literals(pattern, literals):
+    literals = frozenset(literals) if literals is not None else None
+    assert get_required_literals(compile_regex(pattern, 0)) == literals
+
+
+def test_prefilter_matches(doc):
+    patterns = dict(
+        douleurs=[r"douleurs?", r"(?i)ANOMALIE", r"bras (droit|gauche)"],
+        absent=[r"diabete", r"\bcoronavirus\b", r"(?i)PNEUMOPATHIE"],
+        unfiltered=[r"\w+ée\b", r"^\w+"],
+    )
+
+    matcher = RegexMatcher(attr="NORM", ignore_excluded=True, prefilter=False)
+    prefiltered = RegexMatcher(attr="NORM", ignore_excluded=True)
+
+    matcher.build_patterns(patterns)
+    prefiltered.build_patterns(patterns)
+
+    assert matcher.regex[0][-1] == [None, None, None]
+    assert prefiltered.regex[0][-1][0] == {("douleur", False)}
+
+    for doclike in (doc, doc[10:40]):
+        expected = [
+            (span.start, span.end, span.label_)
+            for span in matcher(doclike, as_spans=True)
+        ]
+        actual = [
+            (span.start, span.end, span.label_)
+            for span in prefiltered(doclike, as_spans=True)
+        ]
+        assert actual == expected
+
+
+@mark.parametrize("alignment_mode", ["strict", "contract", "expand"])
+def test_create_spans(blank_nlp, alignment_mode):
+    text = "Le  patient est   admis pour un ÉPISODE de toux."
+    doc = blank_nlp(text)
+
+    offsets = [
+        (start, end)
+        for start in range(len(text))
+        for end in range(start + 1, len(text) + 1)
+    ]
+
+    spans = create_spans(
+        doc,
+        starts=[start for start, _ in offsets],
+        ends=[end for _, end in offsets],
+        key="test",
+        attr="TEXT",
+        alignment_mode=alignment_mode,
+        ignore_excluded=False,
+        ignore_space_tokens=False,
+    )
+
+    assert len(spans) == len(offsets)
+    for (start, end), span in zip(offsets, spans):
+        assert span == doc.char_span(
+            start, end, label="test", alignment_mode=alignment_mode
+        )
+
+
+def test_create_spans_on_span(blank_nlp):
+    doc = blank_nlp("Le patient XX est admis pour un ÉPISODE de toux.")
+    doc[2].tag_ = "EXCLUDED"
+
+    span = doc[1:7]
+    assert get_text(span, "NORM", ignore_excluded=True) == "patient est admis pour un"
+
+    spans = create_spans(
+        span,
+        starts=[0, 8, 12, 2],
+        ends=[11, 11, 25, 13],
+        key=["a", "b", "c", "d"],
+        attr="NORM",
+        alignment_mode="strict",
+        ignore_excluded=True,
+        ignore_space_tokens=False,
+    )
+
+    assert [s.text if s else None for s in spans] == [
+        "patient XX est",
+        "est",
+        "admis pour un",
+        None,
+    ]
+    assert [s.label_ for s in spans[:3]] == ["a", "b", "c"]
+    assert spans[2] == create_span(span, 12, 25, "c", "NORM", "strict", True, False)
@@ -1,6 +1,8 @@
-from pytest import mark
+import pickle
 
-from edsnlp.matchers.simstring import SimstringMatcher
+from pytest import mark, raises
+
+from edsnlp.matchers.simstring import SimstringMatcher, _similarity
 
 
 def test_simstring_matcher(doc, nlp):
@@ -98,3 +100,87 @@ def test_without_normalizer(blank_nlp, measure):
 
         assert sorted([m.text for m in matcher(doc, as_spans=True)]) == ents
         assert sorted([doc[s:e].text for _, s, e in matcher(doc)]) == ents
+
+
+def test_batch_and_cache(blank_nlp):
+    blank_nlp.add_pipe("eds.normalizer")
+    terms = {
+        "C220": ["carcinome hépatocellulaire"],
+        "N02BE01": ["paracetamol"],
+    }
+    matcher = SimstringMatcher(blank_nlp.vocab, attr="NORM", cache_size=2)
+    matcher.build_patterns(blank_nlp, terms)
+    uncached = SimstringMatcher(blank_nlp.vocab, attr="NORM", cache_size=0)
+    uncached.build_patterns(blank_nlp, terms)
+
+    docs = [
+        blank_nlp("Un carcinome hépatacellulaire, traité par paracétomol."),
+        blank_nlp("Pas de paracétomol."),
+        blank_nlp("Pas de carcinome hépatacellulaire."),
+    ]
+
+    batch = matcher.match_batch(docs)
+    assert batch == [matcher(doc) for doc in docs]
+    assert batch == [uncached(doc) for doc in docs]
+    assert [
+        [doc[s:e].text for _, s, e in matches] for doc, matches in zip(docs, batch)
+    ] == [
+        ["carcinome hépatacellulaire", "paracétomol"],
+        ["paracétomol"],
+        ["carcinome hépatacellulaire"],
+    ]
+
+    assert len(matcher.cache) == 2
+    assert len(uncached.cache) == 0
+
+    results = matcher.lookup(["##paracetomol##", "##paracetomol##"])
+    assert list(results) == ["##paracetomol##"]
+    ((synonym, similarity),) = results["##paracetomol##"]
+    assert synonym == "##paracetamol##"
+    assert similarity == _similarity("##paracetomol##", synonym)
+
+
+@mark.parametrize("measure", ["dice", "cosine", "jaccard", "overlap"])
+def test_numpy_backend(blank_nlp, measure):
+    blank_nlp.add_pipe("eds.normalizer")
+    terms = {
+        "C220": ["carcinome hépatocellulaire", "carc. hépatocellulaire"],
+        "N02BE01": ["paracetamol", "paracetamol codeine"],
+        "A": ["aaaa", "abcabc"],
+    }
+    matchers = {}
+    for backend in ["simstring", "numpy"]:
+        matchers[backend] = SimstringMatcher(
+            blank_nlp.vocab, attr="NORM", measure=measure, backend=backend
+        )
+        matchers[backend].build_patterns(blank_nlp, terms)
+        matchers[backend].load()
+
+    # Repeated n-grams are counted as pysimstring does
+    for query in [
+        "##paracetamol##",
+        "##paracetamol cafeine codeine##",
+        "##carcinome hepatacellulaire##",
+        "##aaaaaa##",
+        "##abcabcabc##",
+        "##abc##",
+        "##zzz##",
+    ]:
+        assert sorted(matchers["numpy"].ss_reader.retrieve(query)) == sorted(
+            matchers["simstring"].ss_reader.retrieve(query)
+        )
+
+    doc = blank_nlp("Un carcinome hépatacellulaire, traité par paracétomol.")
+    assert matchers["numpy"](doc) == matchers["simstring"](doc)
+
+    # The index is memory-mapped: pickling it only pickles its path
+    index = pickle.loads(pickle.dumps(matchers["numpy"].ss_reader))
+    assert index.path == matchers["numpy"].ss_reader.path
+    assert index.retrieve("##paracetamol##") == matchers["numpy"].ss_reader.retrieve(
+        "##paracetamol##"
+    )
+
+
+def test_unknown_backend(blank_nlp):
+    with raises(ValueError):
+        SimstringMatcher(blank_nlp.vocab, backend="unknown")
@@ -0,0 +1,99 @@
+import gc
+import weakref
+
+import spacy
+
+from edsnlp.matchers.utils import alignment, get_text
+from edsnlp.matchers.utils.views import (
+    _caches,
+    clear_cache,
+    get_raw_text,
+    get_text_view,
+    make_text_view,
+)
+
+
+def test_views_are_shared(blank_nlp):
+    doc = blank_nlp("Le patient a mal.")
+
+    view = get_text_view(doc, "NORM", ignore_excluded=True, ignore_space_tokens=True)
+    assert get_text_view(doc, "norm", True, True) is view
+    original, clean = alignment(doc, "NORM", True, True)
+    assert original is view.original and clean is view.starts
+
+
+def test_views_invalidation(blank_nlp):
+    doc = blank_nlp("Le patient a mal.")
+
+    assert get_text(doc, "NORM", ignore_excluded=True) == "le patient a mal."
+    assert get_text(doc[1:3], "NORM", ignore_excluded=True) == "patient a"
+
+    # A component modifies the norms and tags after the views were computed
+    doc[1].norm_ = "malade"
+    doc[2].tag_ = "EXCLUDED"
+    clear_cache(doc)
+
+    assert get_text(doc, "NORM", ignore_excluded=True) == "le malade mal."
+    assert get_text(doc[1:3], "NORM", ignore_excluded=True) == "malade"
+    assert get_text(doc[1:3], "NORM", ignore_excluded=False) == "malade a"
+
+
+def test_normalizer_clears_views(blank_nlp):
+    doc = blank_nlp("Le patient a mal.")
+    assert get_text(doc, "NORM", ignore_excluded=True) == "le patient a mal."
+
+    blank_nlp.add_pipe("eds.normalizer", config=dict(lowercase=False))
+    doc = blank_nlp.get_pipe("eds.normalizer")(doc)
+
+    assert get_text(doc, "NORM", ignore_excluded=True) == "Le patient a mal."
+
+
+def test_views_are_freed(blank_nlp):
+    doc = blank_nlp("Le patient a mal.")
+    get_text(doc, "NORM", ignore_excluded=True)
+    assert doc in _caches
+
+    ref = weakref.ref(doc)
+    del doc
+    gc.collect()
+
+    assert ref() is None
+
+
+def test_raw_text_view(blank_nlp):
+    doc = blank_nlp("Le patient   a\n\nmal ===== à la tête.")
+    doc[3].tag_ = "SPACE"
+    doc[6].tag_ = "EXCLUDED"
+    doc[7].tag_ = "EXCLUDED"
+    clear_cache(doc)
+
+    for ignore_excluded in (False, True):
+        for ignore_space_tokens in (False, True):
+            view = get_text_view(doc, "TEXT", ignore_excluded, ignore_space_tokens)
+            # The `orth_` view is computed token by token
+            expected = make_text_view(
+                doc, "orth_", ignore_excluded, ignore_space_tokens
+            )
+            assert view.text == expected.text
+            for array, expected_array in zip(view[1:], expected[1:]):
+                assert (array == expected_array).all()
+
+
+def test_raw_text_is_kept():
+    # The EDS tokenizer registers the text it was given
+    text = "Le patient a mal."
+    doc = spacy.blank("eds").make_doc(text)
+    assert get_raw_text(doc) is text
+
+    clear_cache(doc)
+    assert get_raw_text(doc) is text
+
+
+def test_lower_span_text(blank_nlp):
+    # "İ" is lowercased to two characters, which shifts the rest of the text
+    doc = blank_nlp("İİİ Le patient a de la Fièvre")
+    span = doc[2:]
+
+    assert get_text(span, "LOWER", False) == "patient a de la fièvre"
+    assert get_text(span, "LOWER", False) == get_text(span, "LOWER", True)
+    assert get_text(doc, "LOWER", False) == doc.text.lower()
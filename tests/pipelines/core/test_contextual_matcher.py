@@ -231,3 +231,23 @@ def test_contextual(blank_nlp, params, example):
             assert (
                 rgetattr(ent, modifier.key) == modifier.value
             ), f"{modifier.key} labels don't match."
+
+
+def test_build_with_disabled_pipes(blank_nlp):
+    blank_nlp.add_pipe("eds.normalizer")
+    blank_nlp.add_pipe(
+        "eds.contextual-matcher",
+        name="Drug",
+        config=dict(
+            patterns=dict(source="ibuprofene", terms=["ibuprofène"]),
+            attr="NORM",
+            label="drug",
+        ),
+    )
+
+    # The anchors are normalized even if the normalizer is disabled
+    # when the matcher is built
+    with blank_nlp.select_pipes(disable=["eds.normalizer"]):
+        blank_nlp("rien")
+
+    assert [ent.text for ent in blank_nlp("ibuprofene").ents] == ["ibuprofene"]
@@ -1,8 +1,12 @@
 import spacy
 from pytest import fixture
 
+from edsnlp.pipelines.core.endlines.endlines import EndLinesMatcher
 from edsnlp.pipelines.core.endlines.functional import build_path
 from edsnlp.pipelines.core.endlines.model import EndLinesModel
+from edsnlp.pipelines.core.endlines.predictor import EndLinesPredictor
+from edsnlp.pipelines.core.endlines.trainer import EndLinesTrainer
+from edsnlp.utils.filter import get_spans
 
 texts = [
     """Le patient est arrivé hier soir.
@@ -65,3 +69,64 @@ def test_normalizer_endlines(blank_nlp, model_path):
     docs = list(blank_nlp.pipe(texts))
 
     assert [i for i, t in enumerate(docs[1]) if t.tag_ == "EXCLUDED"] == [3, 8]
+
+
+def test_predictor(model_path):
+    blank_nlp = spacy.blank("eds")
+    endlines = blank_nlp.add_pipe("endlines", config=dict(model_path=model_path))
+
+    docs = [blank_nlp.make_doc(text) for text in texts + ["Rien.", "A\n\nB\nC."]]
+    new_lines = [get_spans(endlines.process(doc), "new_line") for doc in docs]
+
+    predictions = endlines.predictor.predict(docs, new_lines)
+    assert [len(p) for p in predictions] == [len(spans) for spans in new_lines]
+
+    for doc, spans, prediction in zip(docs, new_lines, predictions):
+        if spans:
+            df = endlines.model.predict(endlines._get_df(doc, spans))
+            assert df.PREDICTED_END_LINE.tolist() == prediction.tolist()
+
+
+def test_endlines_pipe(model_path):
+    blank_nlp = spacy.blank("eds")
+    blank_nlp.add_pipe("endlines", config=dict(model_path=model_path))
+
+    batch = texts * 3 + ["Rien.", "A\n\nB\nC."]
+    expected = [[t.tag_ for t in blank_nlp(text)] for text in batch]
+
+    docs = list(blank_nlp.pipe(batch, batch_size=4))
+    assert [[t.tag_ for t in doc] for doc in docs] == expected
+
+
+def test_trainer():
+    blank_nlp = spacy.blank("eds")
+    docs = list(blank_nlp.pipe(texts * 2 + ["Rien.", "A\n\nB\nC."]))
+
+    reference = EndLinesModel(nlp=blank_nlp)
+    reference.fit_and_predict(docs)
+
+    model = EndLinesTrainer(batch_size=3).fit(iter(docs))
+    assert model.vocabulary["B1"] == reference.vocabulary["B1"]
+    assert model.vocabulary["B2"] == reference.vocabulary["B2"]
+    assert (model.m1.class_count_ == reference.m1.class_count_).all()
+    assert (model.m2.feature_count_ == reference.m2.feature_count_).all()
+
+    # Trainers fitted on shards of the corpus can be merged
+    merged = (
+        EndLinesTrainer()
+        .partial_fit(docs[:3])
+        .merge(EndLinesTrainer().partial_fit(docs[3:]))
+        .finalize()
+    )
+
+    endlines = EndLinesMatcher(blank_nlp, model_path=reference)
+    new_lines = [get_spans(endlines.process(doc), "new_line") for doc in docs]
+
+    expected = EndLinesPredictor(reference).predict(docs, new_lines)
+    for trained in (model, merged):
+        predictions = EndLinesPredictor(trained).predict(docs, new_lines)
+        assert all((p == e).all() for p, e in zip(predictions, expected))
+
+    # The pandas inference path hashes the orths too
+    df = model.predict(endlines._get_df(docs[0], new_lines[0]))
+    assert df.PREDICTED_END_LINE.tolist() == expected[0].tolist()
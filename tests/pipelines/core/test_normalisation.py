@@ -1,4 +1,7 @@
-from pytest import fixture
+import pickle
+
+import spacy
+from pytest import fixture, mark
 
 from edsnlp.matchers.utils import get_text
 from edsnlp.pipelines.core.normalizer.accents.patterns import accents
@@ -97,6 +100,11 @@ def test_normalization_pollution(nlp_factory, text):
 
     assert norm == "L'aïeul ʺnˊest pas malade”, écrit-il. Fièvre jaune."
 
+    # The polluted tokens are excluded through their tag
+    assert [t.text for t in doc if t._.excluded] == ["NBNbWbWbNbWbNB"]
+    doc[0]._.excluded = True
+    assert doc[0]._.excluded and doc[0].tag_ == ""
+
     text2 = "Le jour de \n"
     text2 += "2/2Pat : <NOM> <Prenom> le <date> IPP <ipp> Intitulé RCP"
     text2 += " : Urologie HMN le <date>\nRéunion de Concertation"
@@ -117,3 +125,74 @@ def test_normalization_pollution(nlp_factory, text):
         doc = nlp(example)
         norm = get_text(doc, attr="NORM", ignore_excluded=True)
         assert norm == expected
+
+
+@mark.parametrize("lc", [False, True])
+def test_fused_normalization(nlp_factory, text, lc):
+    nlp = nlp_factory(a=True, lc=lc, q=True)
+    normalizer = nlp.get_pipe("normalizer")
+    assert normalizer.fused is not None
+
+    texts = [text, text.upper(), "Un  espace insécable\n\n», «"]
+    fused = [[(t.norm_, t.tag_) for t in nlp(t)] for t in texts]
+
+    # Sequential application of the steps
+    normalizer.fused = None
+    expected = [[(t.norm_, t.tag_) for t in nlp(t)] for t in texts]
+
+    assert fused == expected
+
+
+def test_norm_cache_serialization(lang, text, tmp_path):
+    nlp = spacy.blank(lang)
+    nlp.add_pipe(
+        "eds.normalizer",
+        name="normalizer",
+        config=dict(lowercase=True, save_cache=True),
+    )
+    nlp.add_pipe("eds.accents", name="accents", config=dict(save_cache=True))
+    norms = [t.norm_ for t in nlp(text)]
+
+    normalizer = nlp.get_pipe("normalizer")
+    assert normalizer.fused.to_dict()["écrit"] == "ecrit"
+
+    nlp.to_disk(tmp_path)
+    loaded = spacy.load(tmp_path)
+
+    assert len(loaded.get_pipe("accents").cache) > 0
+    assert loaded.get_pipe("normalizer").fused.to_dict() == normalizer.fused.to_dict()
+    assert [t.norm_ for t in loaded(text)] == norms
+
+    # The cache is kept when the pipeline is sent to other processes
+    fused = pickle.loads(pickle.dumps(normalizer.fused))
+    assert fused.to_dict() == normalizer.fused.to_dict()
+
+
+def test_norm_cache_not_saved(lang, text, tmp_path):
+    nlp = spacy.blank(lang)
+    nlp.add_pipe("eds.normalizer", name="normalizer")
+    nlp.add_pipe("eds.accents", name="accents")
+    nlp(text)
+    assert len(nlp.get_pipe("normalizer").fused) > 0
+
+    # The words of the processed texts are not saved with the pipeline
+    nlp.to_disk(tmp_path)
+    assert not list(tmp_path.glob("*/norms.msgpack"))
+    loaded = spacy.load(tmp_path)
+    assert len(loaded.get_pipe("normalizer").fused) == 0
+    assert len(loaded.get_pipe("accents").cache) == 0
+
+
+def test_norm_cache_size(lang, text):
+    nlp = spacy.blank(lang)
+    nlp.add_pipe("eds.normalizer", name="normalizer", config=dict(cache_size=5))
+    nlp.add_pipe("eds.accents", name="accents", config=dict(cache_size=5))
+    expected = [t.norm_ for t in nlp(text)]
+
+    normalizer = nlp.get_pipe("normalizer")
+    assert len(normalizer.fused) == 5
+    assert len(nlp.get_pipe("accents").cache) == 5
+
+    # The strings that are not cached are still normalised
+    normalizer.fused = None
+    assert [t.norm_ for t in nlp(text)] == expected
@@ -1,13 +1,17 @@
 import pytest
 from spacy.language import Language
 
+from edsnlp.language import warmup
 from edsnlp.utils.examples import parse_example
 
 example = "1g de <ent kb_id=paracetamol>doliprane</ent>"
 
 
-@pytest.mark.parametrize("term_matcher", ["exact", "simstring"])
-def test_terminology(blank_nlp: Language, term_matcher: str):
+@pytest.mark.parametrize(
+    "term_matcher,term_matcher_config",
+    [("exact", {}), ("simstring", {}), ("simstring", {"backend": "numpy"})],
+)
+def test_terminology(blank_nlp: Language, term_matcher: str, term_matcher_config):
     blank_nlp.add_pipe(
         "eds.terminology",
         config=dict(
@@ -15,6 +19,7 @@ def test_terminology(blank_nlp: Language, term_matcher: str):
             terms=dict(paracetamol=["doliprane", "tylenol", "paracetamol"]),
             attr="NORM",
             term_matcher=term_matcher,
+            term_matcher_config=term_matcher_config,
         ),
     )
 
@@ -27,3 +32,70 @@ def test_terminology(blank_nlp: Language, term_matcher: str):
     for ent, entity in zip(doc.ents, entities):
         assert ent.text == text[entity.start_char : entity.end_char]
         assert ent.kb_id_ == entity.modifiers[0].value
+
+    docs = list(blank_nlp.pipe([text, "pas de doliprane", text], batch_size=2))
+    assert [[ent.text for ent in doc.ents] for doc in docs] == [
+        ["doliprane"],
+        ["doliprane"],
+        ["doliprane"],
+    ]
+
+
+def test_lazy_terminology(blank_nlp: Language):
+    matcher = blank_nlp.add_pipe(
+        "eds.terminology",
+        config=dict(
+            label="drugs",
+            terms=dict(paracetamol=["doliprane", "tylenol", "paracetamol"]),
+        ),
+    )
+    assert "phrase_matcher" not in matcher.__dict__
+
+    # The terms are added to the matcher by the first call to the component
+    doc = blank_nlp("1g de doliprane")
+    assert [ent.kb_id_ for ent in doc.ents] == ["paracetamol"]
+    assert "phrase_matcher" in matcher.__dict__
+
+
+def test_warmup(blank_nlp: Language):
+    matcher = blank_nlp.add_pipe(
+        "eds.terminology",
+        config=dict(label="drugs", terms=dict(paracetamol=["doliprane"])),
+    )
+
+    assert warmup(blank_nlp) is blank_nlp
+    assert len(matcher.__dict__["phrase_matcher"]) == 1
+
+
+def test_build_with_disabled_pipes(blank_nlp: Language):
+    blank_nlp.add_pipe("eds.normalizer")
+    blank_nlp.add_pipe(
+        "eds.terminology",
+        config=dict(
+            label="drugs",
+            terms=dict(ibuprofene=["ibuprofène"]),
+            attr="NORM",
+        ),
+    )
+
+    # The terms are normalized even if the normalizer is disabled
+    # when the matcher is built
+    with blank_nlp.select_pipes(disable=["eds.normalizer"]):
+        blank_nlp("rien")
+        assert "eds.normalizer" in blank_nlp.disabled
+    assert "eds.normalizer" not in blank_nlp.disabled
+
+    assert [ent.kb_id_ for ent in blank_nlp("ibuprofene").ents] == ["ibuprofene"]
+
+
+def test_build_error(blank_nlp: Language):
+    matcher = blank_nlp.add_pipe(
+        "eds.terminology",
+        config=dict(label="drugs", terms=dict(paracetamol=["doliprane"])),
+    )
+    # Simulates a bug in the build of the matcher
+    del matcher._terms
+
+    with pytest.raises(RuntimeError, match="phrase_matcher") as error:
+        blank_nlp("1g de doliprane")
+    assert isinstance(error.value.__cause__, AttributeError)
@@ -136,16 +136,17 @@ def test_measure_repr(blank_nlp: Language, matcher: MeasurementsMatcher):
 
 
 def test_compare(blank_nlp: Language, matcher: MeasurementsMatcher):
-    m1, m2 = "1m0", "120cm"
-    m1 = matcher(blank_nlp(m1)).spans["measurements"][0]
-    m2 = matcher(blank_nlp(m2)).spans["measurements"][0]
+    # Keep references to the docs, since spans do not keep them alive
+    d1, d2 = blank_nlp("1m0"), blank_nlp("120cm")
+    m1 = matcher(d1).spans["measurements"][0]
+    m2 = matcher(d2).spans["measurements"][0]
     assert m1._.value <= m2._.value
     assert m2._.value > m1._.value
 
-    m3 = "Entre deux et trois metres"
-    m4 = "De 2 à 3 metres"
-    m3 = matcher(blank_nlp(m3)).spans["measurements"][0]
-    m4 = matcher(blank_nlp(m4)).spans["measurements"][0]
+    d3 = blank_nlp("Entre deux et trois metres")
+    d4 = blank_nlp("De 2 à 3 metres")
+    m3 = matcher(d3).spans["measurements"][0]
+    m4 = matcher(d4).spans["measurements"][0]
     print(blank_nlp("Entre deux et trois metres"))
     assert str(m3._.value) == "2-3 m"
     assert str(m4._.value) == "2-3 m"
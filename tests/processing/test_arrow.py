@@ -0,0 +1,148 @@
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import spacy
+
+from edsnlp.processing.arrow import pipe, pipe_batches
+from edsnlp.processing.simple import pipe as simple_pipe
+from edsnlp.processing.utils import dummy_extractor
+
+text = """
+Le patient est admis le 29 août 2020 pour des difficultés respiratoires.
+Le père est asthmatique, sans traitement particulier.
+Le patient dit avoir de la toux.
+"""
+
+
+@pytest.fixture
+def note():
+    data = [(i, text if i % 3 else "Rien.", datetime(2021, 1, 1)) for i in range(20)]
+    return pd.DataFrame(data=data, columns=["note_id", "note_text", "note_datetime"])
+
+
+@pytest.fixture
+def model(lang):
+    nlp = spacy.blank(lang)
+    nlp.add_pipe("eds.normalizer")
+    nlp.add_pipe("eds.sentences")
+    nlp.add_pipe(
+        "eds.matcher",
+        config=dict(
+            terms=dict(respiratoire=["difficultes respiratoires", "toux"]),
+            attr="NORM",
+        ),
+    )
+    nlp.add_pipe("eds.negation")
+    nlp.add_pipe("eds.dates")
+    return nlp
+
+
+def test_record_batches(note, model):
+    batches = list(
+        pipe_batches(
+            note,
+            nlp=model,
+            context=["note_datetime"],
+            additional_spans=["dates"],
+            extensions={"negation": pa.bool_(), "date.year": pa.int64()},
+            batch_size=8,
+            progress_bar=False,
+        )
+    )
+
+    assert len(batches) == 3
+    assert all(batch.schema == batches[0].schema for batch in batches)
+    assert batches[0].schema.field("negation").type == pa.bool_()
+
+    table = pa.Table.from_batches(batches).to_pandas()
+    expected = simple_pipe(
+        note,
+        nlp=model,
+        context=["note_datetime"],
+        additional_spans=["dates"],
+        extensions=["negation", "date.year"],
+        progress_bar=False,
+    )
+
+    assert len(table) == 39
+    pd.testing.assert_frame_equal(table, expected, check_dtype=False)
+
+
+def test_parquet_output(note, model, tmp_path):
+    path = tmp_path / "note_nlp.parquet"
+
+    assert (
+        pipe(
+            note,
+            nlp=model,
+            extensions={"negation": pa.bool_()},
+            dtypes={"note_id": pa.int64()},
+            batch_size=5,
+            progress_bar=False,
+            path=path,
+        )
+        is None
+    )
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_rows == 26
+    assert parquet.metadata.num_row_groups == 4
+
+    table = pipe(note, nlp=model, extensions=["negation"], progress_bar=False)
+    assert pq.read_table(path).to_pandas().equals(table.to_pandas())
+
+
+def test_results_extractor(note, model):
+    table = pipe(
+        note,
+        nlp=model,
+        context=["note_datetime"],
+        results_extractor=dummy_extractor,
+        progress_bar=False,
+    )
+
+    assert table.column_names == ["snippet", "length", "note_datetime"]
+    assert table.num_rows == 26
+
+
+def test_empty_output(model):
+    note = pd.DataFrame(dict(note_id=[0, 1], note_text=["Rien.", "Rien."]))
+
+    table = pipe(note, nlp=model, progress_bar=False)
+    assert table.num_rows == 0
+    assert "lexical_variant" in table.column_names
+
+
+@pytest.mark.parametrize("to_parquet", [False, True])
+def test_null_first_batch(model, tmp_path, to_parquet):
+    note = pd.DataFrame(
+        dict(
+            note_id=list(range(6)),
+            note_text=["Rien."] * 3 + ["Le patient a de la toux."] * 3,
+            score=pd.Series([None] * 3 + [0.5] * 3, dtype=object),
+        )
+    )
+
+    def extractor(doc):
+        return [dict(score=doc._.score)]
+
+    path = tmp_path / "results.parquet" if to_parquet else None
+    table = pipe(
+        note,
+        nlp=model,
+        context=["score"],
+        results_extractor=extractor,
+        batch_size=2,
+        progress_bar=False,
+        path=path,
+    )
+    if to_parquet:
+        assert pq.ParquetFile(path).metadata.num_row_groups == 3
+        table = pq.read_table(path)
+
+    # The column is null in the first batch only
+    assert table.schema.field("score").type == pa.float64()
+    assert table.column("score").to_pylist() == [None] * 3 + [0.5] * 3
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+import spacy
+
+from edsnlp.processing.parallel import ParallelProcessor, _length_chunker
+from edsnlp.processing.parallel import pipe as parallel_pipe
+from edsnlp.processing.simple import pipe as simple_pipe
+
+text = """
+Le patient est admis le 29 août 2020 pour des difficultés respiratoires.
+Le patient dit avoir de la toux.
+"""
+
+
+@pytest.fixture
+def model(lang):
+    nlp = spacy.blank(lang)
+    nlp.add_pipe("eds.normalizer")
+    nlp.add_pipe("eds.sentences")
+    nlp.add_pipe(
+        "eds.matcher",
+        config=dict(
+            terms=dict(respiratoire=["difficultes respiratoires", "toux"]),
+            attr="NORM",
+        ),
+    )
+    nlp.add_pipe("eds.negation")
+    nlp.add_pipe("eds.dates")
+    return nlp
+
+
+def note(start: int, size: int):
+    return pd.DataFrame(
+        [(i, text, datetime(2021, 1, 1)) for i in range(start, start + size)],
+        columns=["note_id", "note_text", "note_datetime"],
+    )
+
+
+def test_parallel_processor(model):
+    with ParallelProcessor(model, n_jobs=2) as processor:
+        pool = processor.pool
+        workers = {process.pid for process in pool._pool}
+
+        for start in range(0, 30, 10):
+            result = processor.pipe(
+                note(start, 10),
+                context=["note_datetime"],
+                additional_spans=["dates"],
+                extensions=["negation"],
+                chunksize=3,
+                progress_bar=False,
+            )
+            expected = simple_pipe(
+                note(start, 10),
+                nlp=model,
+                context=["note_datetime"],
+                additional_spans=["dates"],
+                extensions=["negation"],
+                progress_bar=False,
+            )
+            pd.testing.assert_frame_equal(result, expected)
+
+        # The same workers were used for every call
+        assert processor.pool is pool
+        assert {process.pid for process in pool._pool} == workers
+
+    assert processor.pool is None
+
+
+def test_length_chunker():
+    note = pd.DataFrame(dict(note_text=["a" * 10, "a" * 100, "a" * 30, "a" * 40, "a"]))
+
+    chunks = _length_chunker(note, chunk_chars=50)
+
+    assert [list(chunk) for chunk in chunks] == [[1], [3, 2], [0, 4]]
+
+
+def test_length_aware_chunks(model):
+    note = pd.DataFrame(
+        [(i, text * (1 + i % 4)) for i in range(20)],
+        columns=["note_id", "note_text"],
+    )
+    expected = simple_pipe(note, nlp=model, extensions=["negation"], progress_bar=False)
+
+    result = parallel_pipe(
+        note,
+        nlp=model,
+        extensions=["negation"],
+        n_jobs=2,
+        chunk_chars=500,
+        progress_bar=False,
+    )
+    pd.testing.assert_frame_equal(result, expected)
+
+    with ParallelProcessor(model, n_jobs=2) as processor:
+        result = processor.pipe(
+            note,
+            extensions=["negation"],
+            chunk_chars=500,
+            progress_bar=False,
+        )
+    pd.testing.assert_frame_equal(result, expected)
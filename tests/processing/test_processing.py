@@ -153,6 +153,93 @@ def test_pipelines(param, model):
     )
 
 
+@pytest.mark.parametrize("module", [DataFrameModules.PYSPARK, DataFrameModules.KOALAS])
+def test_spark_partitions_mode(module, model):
+
+    note_nlp = pipe(
+        note(module=module),
+        nlp=model,
+        context=["note_datetime"],
+        extensions={
+            "negation": T.BooleanType(),
+            "date.year": T.IntegerType(),
+        },
+        additional_spans=["dates"],
+        mode="partitions",
+    )
+
+    if module == DataFrameModules.PYSPARK:
+        note_nlp = note_nlp.toPandas()
+    elif module == DataFrameModules.KOALAS:
+        note_nlp = note_nlp.to_pandas()
+
+    expected = pipe(
+        note(module=DataFrameModules.PANDAS),
+        nlp=model,
+        n_jobs=1,
+        context=["note_datetime"],
+        extensions=["negation", "date.year"],
+        additional_spans=["dates"],
+    )
+
+    assert len(note_nlp) == 140
+    columns = ["note_id", "span_type", "start", "end", "label", "negation"]
+    assert (
+        note_nlp[columns].sort_values(columns).values.tolist()
+        == expected[columns].sort_values(columns).values.tolist()
+    )
+
+
+@pytest.mark.parametrize("mode", ["udf", "partitions"])
+@pytest.mark.parametrize("partitioning", [None, 3, "size", "count"])
+def test_spark_partitioning(mode, partitioning, model):
+    from edsnlp.processing.distributed import partition_timings
+
+    timings = partition_timings() if mode == "partitions" else None
+
+    note_nlp = pipe(
+        note(module=DataFrameModules.PYSPARK),
+        nlp=model,
+        extensions={"negation": T.BooleanType()},
+        mode=mode,
+        partitioning=partitioning,
+        partition_size=10,
+        timings=timings,
+    )
+
+    if partitioning == 3:
+        assert note_nlp.rdd.getNumPartitions() == 3
+
+    assert len(note_nlp.toPandas()) == 120
+
+    if timings is not None:
+        n_notes = sum(n for n, _, _ in timings.value.values())
+        n_chars = sum(n for _, n, _ in timings.value.values())
+        assert n_notes == 20
+        assert n_chars == 20 * len(text)
+
+
+def test_spark_udf_timings(model):
+    from edsnlp.processing.distributed import partition_timings
+
+    with pytest.raises(ValueError):
+        pipe(
+            note(module=DataFrameModules.PYSPARK),
+            nlp=model,
+            mode="udf",
+            timings=partition_timings(),
+        )
+
+
+def test_spark_unknown_partitioning(model):
+    with pytest.raises(ValueError):
+        pipe(
+            note(module=DataFrameModules.PYSPARK),
+            nlp=model,
+            partitioning="unknown",
+        )
+
+
 def test_spark_missing_types(model):
 
     with pytest.raises(ValueError):
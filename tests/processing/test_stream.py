@@ -0,0 +1,89 @@
+from datetime import datetime
+from types import GeneratorType
+
+import pandas as pd
+import pytest
+import spacy
+
+from edsnlp.processing import stream_pipe
+from edsnlp.processing.simple import pipe as simple_pipe
+
+text = """
+Le patient est admis le 29 août 2020 pour des difficultés respiratoires.
+Le patient dit avoir de la toux.
+"""
+
+
+@pytest.fixture
+def model(lang):
+    nlp = spacy.blank(lang)
+    nlp.add_pipe("eds.normalizer")
+    nlp.add_pipe("eds.sentences")
+    nlp.add_pipe(
+        "eds.matcher",
+        config=dict(
+            terms=dict(respiratoire=["difficultes respiratoires", "toux"]),
+            attr="NORM",
+        ),
+    )
+    nlp.add_pipe("eds.negation")
+    nlp.add_pipe("eds.dates")
+    return nlp
+
+
+def records():
+    for i in range(10):
+        yield (i, text, datetime(2021, 1, 1))
+
+
+def test_stream_records(model):
+    chunks = stream_pipe(
+        records(),
+        nlp=model,
+        context=["note_datetime"],
+        additional_spans=["dates"],
+        extensions=["negation"],
+        batch_size=4,
+        progress_bar=False,
+    )
+
+    assert isinstance(chunks, GeneratorType)
+    chunks = list(chunks)
+    assert [len(chunk) for chunk in chunks] == [12, 12, 6]
+
+    note = pd.DataFrame(
+        list(records()), columns=["note_id", "note_text", "note_datetime"]
+    )
+    expected = simple_pipe(
+        note,
+        nlp=model,
+        context=["note_datetime"],
+        additional_spans=["dates"],
+        extensions=["negation"],
+        progress_bar=False,
+    )
+    result = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_stream_dataframes(model):
+    def chunks():
+        for start in range(0, 10, 5):
+            yield pd.DataFrame(
+                [dict(note_id=i, note_text=text) for i in range(start, start + 5)]
+            )
+
+    results = list(stream_pipe(chunks(), nlp=model, progress_bar=False))
+
+    assert len(results) == 2
+    assert list(results[1].note_id.unique()) == [5, 6, 7, 8, 9]
+
+
+def test_stream_dict_records(model):
+    notes = [
+        dict(note_id=0, note_text=text, other="ignored"),
+        dict(note_text="Rien.", note_id=1),
+    ]
+
+    (result,) = stream_pipe(notes, nlp=model, progress_bar=False)
+    assert set(result.note_id) == {0}
@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+import spacy
+
+from edsnlp.benchmarks import (
+    benchmark,
+    compare_results,
+    generate_notes,
+    make_pipeline,
+    read_notes,
+    run_benchmarks,
+)
+
+
+def test_generate_notes():
+    notes = generate_notes(n_notes=5, n_chars=500, seed=1)
+
+    assert len(notes) == 5
+    assert all(len(note) >= 450 for note in notes)
+    assert notes == generate_notes(n_notes=5, n_chars=500, seed=1)
+    assert notes != generate_notes(n_notes=5, n_chars=500, seed=2)
+
+
+def test_read_notes():
+    notes = read_notes(Path(__file__).parent / "resources" / "brat_data")
+    assert notes and all(isinstance(note, str) for note in notes)
+
+
+def test_benchmark():
+    nlp = spacy.blank("eds")
+    nlp.add_pipe("eds.sentences")
+    nlp.add_pipe("eds.normalizer")
+
+    results = benchmark(nlp, generate_notes(n_notes=4, n_chars=300), n_repeats=1)
+
+    assert results["n_docs"] == 4
+    assert results["docs_per_sec"] > 0
+    assert results["tokens_per_sec"] > results["docs_per_sec"]
+    assert list(results["components"]) == [
+        "tokenizer",
+        "eds.sentences",
+        "eds.normalizer",
+    ]
+
+
+def test_run_benchmarks(tmp_path):
+    path = tmp_path / "benchmark.json"
+    report = run_benchmarks(
+        generate_notes(n_notes=3, n_chars=300),
+        pipelines=["core"],
+        n_repeats=1,
+        isolate=False,
+        output=path,
+    )
+
+    assert json.loads(path.read_text()) == report
+    assert report["pipelines"]["core"]["load_seconds"] > 0
+
+    ratios = compare_results(report, report)
+    assert ratios["core"]["docs_per_sec"] == 1
+    assert ratios["core"]["eds.negation"] == 1
+
+
+def test_unknown_pipeline():
+    with pytest.raises(ValueError):
+        make_pipeline("unknown")
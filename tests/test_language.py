@@ -1,6 +1,8 @@
 import pytest
+import regex
 import spacy
 from spacy.lang.fr.lex_attrs import like_num
+from spacy.tokens import Doc
 
 
 def test_eds_tokenizer_handles_long_text():
@@ -91,3 +93,67 @@ def test_eds_tokenizer_exceptions():
         ("A", ""),
         ("0", ""),
     ]
+
+
+def baseline_tokenize(tokenizer, text):
+    # Tokenization of the texts by building the `Doc` from its words and spaces
+    words = []
+    spaces = []
+    for match in tokenizer.word_regex.finditer(text):
+        words.append(match.group(1))
+        spaces.append(bool(match.group(2)))
+    return Doc(tokenizer.vocab, words=words, spaces=spaces)
+
+
+def test_eds_tokenizer_pipe():
+    nlp = spacy.blank("eds")
+    texts = [
+        "Le patient a mal.",
+        "",
+        "Lorem\xA0Ipsum\tDolor\xA0\xA0Sit\t\tAmet\xA0",
+        "\n\nLe patient\n\n\n  \n \nva bien.\r\n\n",
+        "Le patient va bien.",
+    ]
+
+    docs = list(nlp.tokenizer.pipe(texts))
+    expected = [baseline_tokenize(nlp.tokenizer, text) for text in texts]
+
+    # Trailing spaces are stored as regular spaces
+    assert [doc.text for doc in docs] == [doc.text for doc in expected]
+    assert [[(t.orth, t.whitespace_) for t in doc] for doc in docs] == [
+        [(t.orth, t.whitespace_) for t in doc] for doc in expected
+    ]
+    assert [[t.text for t in doc] for doc in docs] == [
+        [t.text for t in nlp(text)] for text in texts
+    ]
+    # Lexemes are looked up once per distinct word
+    assert docs[0][0].orth == docs[4][0].orth
+    assert len(nlp.tokenizer.lexemes) == len({t.text for doc in docs for t in doc})
+
+
+def test_eds_tokenizer_cache_size():
+    nlp = spacy.blank("eds", config={"nlp": {"tokenizer": {"cache_size": 3}}})
+    docs = list(nlp.tokenizer.pipe(["Le patient va bien.", "Le patient est venu."]))
+
+    assert nlp.tokenizer.lexemes.max_size == 3
+    assert len(nlp.tokenizer.lexemes) == 3
+    assert [[t.text for t in doc] for doc in docs] == [
+        ["Le", "patient", "va", "bien", "."],
+        ["Le", "patient", "est", "venu", "."],
+    ]
+
+
+def test_eds_tokenizer_missed_characters():
+    nlp = spacy.blank("eds")
+    # Only letters and the following space are matched
+    nlp.tokenizer.word_regex = regex.compile(r"([[:alpha:]]+)( )?")
+    text = "Le patient (72 ans) va bien."
+
+    doc = nlp(text)
+    expected = baseline_tokenize(nlp.tokenizer, text)
+
+    assert [t.text for t in doc] == ["Le", "patient", "ans", "va", "bien"]
+    assert doc.text == expected.text
+    assert [(t.orth, t.whitespace_) for t in doc] == [
+        (t.orth, t.whitespace_) for t in expected
+    ]
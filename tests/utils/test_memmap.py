@@ -0,0 +1,42 @@
+import pickle
+
+import pytest
+
+from edsnlp.utils.memmap import MemoryMappedDict
+
+
+def test_memory_mapped_dict(tmp_path):
+    data = {"##toux##": ["C01", "C02"], "##fièvre##": ["C03"], "##rien##": []}
+
+    mapping = MemoryMappedDict.write(tmp_path / "db.bin", data)
+
+    assert len(mapping) == 3
+    assert mapping["##toux##"] == ("C01", "C02")
+    assert mapping["##fièvre##"] == ("C03",)
+    assert mapping["##rien##"] == ()
+    assert "##toux##" in mapping
+    assert "##tou##" not in mapping
+    assert mapping.get("##tou##") is None
+    assert mapping.to_dict() == {key: tuple(value) for key, value in data.items()}
+
+    with pytest.raises(KeyError):
+        mapping["##absent##"]
+
+    # Only the path is pickled
+    assert len(pickle.dumps(mapping)) < 200
+    assert pickle.loads(pickle.dumps(mapping))["##toux##"] == ("C01", "C02")
+
+
+def test_not_a_memory_mapped_dict(tmp_path):
+    (tmp_path / "db.bin").write_bytes(b"not a dictionary")
+
+    with pytest.raises(ValueError):
+        MemoryMappedDict(tmp_path / "db.bin")
+
+
+def test_empty_strings(tmp_path):
+    data = {"a": [""], "b": ["", "x"], "c": ["x", ""], "d": [], "e": ["", ""]}
+
+    mapping = MemoryMappedDict.write(tmp_path / "db.bin", data)
+
+    assert mapping.to_dict() == {key: tuple(value) for key, value in data.items()}
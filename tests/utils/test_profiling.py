@@ -0,0 +1,68 @@
+import json
+
+import pytest
+import spacy
+
+from edsnlp.utils.profiling import (
+    JSONSink,
+    PrometheusSink,
+    disable_profiling,
+    enable_profiling,
+    profiling,
+)
+
+
+@pytest.fixture
+def nlp():
+    model = spacy.blank("eds")
+    model.add_pipe("eds.sentences")
+    model.add_pipe("eds.normalizer")
+    model.add_pipe("eds.matcher", config=dict(terms=dict(patient="patient")))
+    model.add_pipe("eds.negation")
+    return model
+
+
+texts = ["Le patient n'a pas de fièvre.", "Le patient est admis.", "Rien."]
+
+
+def test_pipe_stats(nlp):
+    expected = [[(e.text, e._.negation) for e in nlp(text).ents] for text in texts]
+
+    profiler = enable_profiling(nlp)
+    docs = [nlp(texts[0])] + list(nlp.pipe(texts[1:]))
+    assert [[(e.text, e._.negation) for e in doc.ents] for doc in docs] == expected
+
+    stats = nlp.get_pipe_stats()
+    assert list(stats) == [
+        "tokenizer",
+        "eds.sentences",
+        "eds.normalizer",
+        "eds.matcher",
+        "eds.negation",
+    ]
+    assert all(s["docs"] == 3 for s in stats.values())
+    assert stats["eds.matcher"]["calls"] == 2
+    assert stats["eds.matcher"]["matches"] == 2
+    assert stats["eds.negation"]["matches"] == 0
+    assert stats["tokenizer"]["tokens"] == sum(len(doc) for doc in docs)
+
+    profiler.reset()
+    assert nlp.get_pipe_stats()["eds.matcher"]["docs"] == 0
+
+    assert disable_profiling(nlp, emit=False) is profiler
+    assert not hasattr(nlp, "get_pipe_stats")
+    assert type(nlp.get_pipe("eds.matcher")).__name__ == "GenericMatcher"
+
+
+def test_sinks(nlp, tmp_path):
+    json_path = tmp_path / "stats.json"
+    prometheus_path = tmp_path / "stats.prom"
+
+    with profiling(nlp, sinks=[JSONSink(json_path), PrometheusSink(prometheus_path)]):
+        list(nlp.pipe(texts))
+
+    stats = json.loads(json_path.read_text())
+    assert stats["eds.matcher"]["docs"] == 3
+    assert 'edsnlp_pipe_docs_total{component="eds.matcher"} 3' in (
+        prometheus_path.read_text()
+    )